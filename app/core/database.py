@@ -1,4 +1,5 @@
-from sqlmodel import SQLModel, Session, create_engine
+from sqlalchemy import text
+from sqlmodel import SQLModel, Session, create_engine, select
 from app.core.config import settings
 
 # 1. Tạo engine (kết nối DB)
@@ -8,9 +9,70 @@ engine = create_engine(
     pool_pre_ping=True # check connection trước khi dùng
 )
 
+# Giá trị enum thêm sau khi type đã được tạo trên DB đang chạy
+ADDED_ENUM_VALUES = [
+    ("bookingstatus", "COMPLETED"),
+]
+
+# Cột, index và ràng buộc thêm sau khi bảng đã được tạo: create_all không sửa
+# bảng có sẵn, nên DB cũ được bổ sung bằng các lệnh idempotent dưới đây.
+ADDED_SCHEMA = [
+    "ALTER TABLE bookings ADD COLUMN IF NOT EXISTS room_id UUID REFERENCES rooms (id)",
+    "ALTER TABLE bookings ADD COLUMN IF NOT EXISTS rate_plan_id UUID REFERENCES rate_plans (id)",
+    "ALTER TABLE bookings ADD COLUMN IF NOT EXISTS special_requests VARCHAR",
+    "ALTER TABLE bookings ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1",
+    "ALTER TABLE inventory ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1",
+    "ALTER TABLE properties ADD COLUMN IF NOT EXISTS geohash VARCHAR(12)",
+    "CREATE INDEX IF NOT EXISTS ix_bookings_room_type_stay ON bookings "
+    "USING gist (room_type_id, daterange(check_in, check_out, '[)'))",
+    "CREATE INDEX IF NOT EXISTS ix_properties_geohash ON properties (geohash text_pattern_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_properties_name_id ON properties (name, id)",
+    # Fails if the DB already holds overlapping active bookings of one room
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'ex_bookings_room_stay') THEN
+            ALTER TABLE bookings ADD CONSTRAINT ex_bookings_room_stay EXCLUDE USING gist (
+                room_id WITH =, daterange(check_in, check_out, '[)') WITH &&
+            ) WHERE (status IN ('CONFIRMED', 'PENDING'));
+        END IF;
+    END $$
+    """,
+]
+
 # 2. Hàm tạo DB schema (migration cơ bản)
 def init_db() -> None:
+    # btree_gist: cho phép ràng buộc EXCLUDE kết hợp "=" (room_id) với "&&" (daterange)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
     SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for statement in ADDED_SCHEMA:
+            connection.execute(text(statement))
+    _backfill_geohash()
+    # create_all không sửa enum type đã có: thêm các giá trị enum mới cho DB cũ.
+    # ADD VALUE phải chạy ngoài transaction (AUTOCOMMIT).
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for type_name, value in ADDED_ENUM_VALUES:
+            connection.execute(text(f"ALTER TYPE {type_name} ADD VALUE IF NOT EXISTS '{value}'"))
+
+def _backfill_geohash() -> None:
+    """Tính geohash cho property có toạ độ nhưng tạo trước khi có cột geohash."""
+    from app.models.property import Property
+    from app.utils.geo import encode_geohash
+
+    with Session(engine) as session:
+        properties = session.exec(
+            select(Property).where(
+                Property.geohash == None,
+                Property.latitude != None,
+                Property.longitude != None,
+            )
+        ).all()
+        for property in properties:
+            property.geohash = encode_geohash(property.latitude, property.longitude)
+            session.add(property)
+        session.commit()
 
 # 3. Dependency cho FastAPI
 def get_session():
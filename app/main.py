@@ -18,12 +18,19 @@ superuser can be used to perform administrative tasks via the API.
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from kombu.exceptions import OperationalError
+from redis.exceptions import RedisError
 from sqlmodel import Session, select
 
 from app.core.config import settings
 from app.core.database import init_db, engine
 from app.core.logger import logger
 from app.models.user import User
+from app.services.availability_summary import summary_built_through
+from app.services.destination_index import rebuild_destination_index
+from app.services.geohash_backfill import backfill_geohashes
+from app.services.pricing_rules import seed_peak_season_rules
+from app.services.task_queue import enqueue_summary_rebuild
 from app.utils.security import hash_password
 from app.utils.enums import UserRole
 
@@ -32,6 +39,14 @@ from app.utils.enums import UserRole
 # modules when `SQLModel.metadata.create_all()` is called.
 import app.models  # noqa: F401
 
+# Register session listeners that invalidate cached search results and
+# queue availability summary refreshes when bookings, inventory or prices
+# change, and keep the destination autocomplete index in step with
+# property writes.
+import app.services.search_cache  # noqa: F401
+import app.services.availability_summary  # noqa: F401
+import app.services.destination_index  # noqa: F401
+
 # Import routers from their respective modules. Grouping routers this way
 # keeps the API organized and makes it easy to add new functionality.
 from app.routers import (
@@ -55,6 +70,7 @@ from app.routers import (
     experiences,
     customers,
     inventory,
+    pricing_rules,
 )
 
 
@@ -102,6 +118,7 @@ def create_app() -> FastAPI:
     application.include_router(experiences.router)    # Experience management
     application.include_router(availability.router)
     application.include_router(inventory.router)      # Inventory management
+    application.include_router(pricing_rules.router)  # Pricing rules (seasonal, LOS, ...)
     application.include_router(staff.router)
 
     @application.on_event("startup")
@@ -135,6 +152,26 @@ def create_app() -> FastAPI:
             else:
                 logger.info("✅ Superuser already exists, skip seeding.")
 
+            # Geo search relies on geohash; fill it for properties saved before it existed
+            backfill_geohashes(session)
+
+            # Peak-season surcharge is data (PricingRule), seed the defaults
+            seed_peak_season_rules(session)
+
+            # Build the destination autocomplete index
+            try:
+                rebuild_destination_index(session)
+            except RedisError as exc:
+                logger.warning(f"⚠️ Destination index not built: {exc}")
+
+        # Build the availability summary on a fresh deploy; search skips the
+        # summary prefilter until the build has been recorded
+        if summary_built_through() is None:
+            try:
+                enqueue_summary_rebuild()
+            except OperationalError as exc:
+                logger.warning(f"⚠️ Availability summary build not queued: {exc}")
+
         logger.info("✅ App started and DB initialized")
 
     return application
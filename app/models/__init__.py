@@ -23,8 +23,11 @@ from .room_type import RoomType
 from .room import Room
 from .rate_plan import RatePlan
 from .daily_price import DailyPrice
+from .pricing_rule import PricingRule
 from .booking import Booking
 from .inventory import Inventory
+from .availability_summary import RoomTypeDailySummary
+from .outbox import OutboxEvent
 
 # Property extras
 from .experience import Experience
@@ -65,8 +68,11 @@ __all__ = [
     "Room",
     "RatePlan",
     "DailyPrice",
+    "PricingRule",
     "Booking",
     "Inventory",
+    "RoomTypeDailySummary",
+    "OutboxEvent",
     
     # Property extras
     "PropertyImage",
@@ -0,0 +1,30 @@
+from __future__ import annotations
+import uuid
+from datetime import date as date_type, datetime
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+
+
+class RoomTypeDailySummary(SQLModel, table=True):
+    """
+    Bảng tổng hợp (denormalized) theo room type và ngày.
+
+    Được tính lại bởi job nền từ Room, Booking, Inventory, RatePlan và
+    DailyPrice để search có thể lọc giá / sức chứa trực tiếp bằng SQL.
+    """
+    __tablename__ = "room_type_daily_summaries"
+    __table_args__ = (
+        Index("ix_room_type_daily_summaries_property_date", "property_id", "date"),
+    )
+
+    room_type_id: uuid.UUID = Field(foreign_key="room_types.id", primary_key=True)
+    date: date_type = Field(primary_key=True)
+    property_id: uuid.UUID = Field(foreign_key="properties.id")
+
+    available_rooms: int  # số phòng còn bán được trong đêm này
+    min_nightly_rate: Optional[float] = None  # giá thấp nhất trong các rate plan
+    max_nightly_rate: Optional[float] = None  # giá cao nhất trong các rate plan
+    max_occupancy: int
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -4,19 +4,56 @@ import uuid
 from datetime import datetime, date
 from typing import Optional, List
 
+from sqlalchemy import Index, func, literal_column, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlmodel import SQLModel, Field, Relationship
 
+from app.utils.concurrency import version_column
 from app.utils.enums import BookingStatus
 
+# Trạng thái booking đang chiếm phòng
+ACTIVE_BOOKING_STATUSES = [BookingStatus.CONFIRMED, BookingStatus.PENDING]
+
+_booking_version = version_column()
+
+
+def stay_range(check_in, check_out):
+    """Half-open ``daterange`` of a stay: nights ``[check_in, check_out)``."""
+    return func.daterange(check_in, check_out, literal_column("'[)'"))
+
 
 class Booking(SQLModel, table=True):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Một phòng không thể có hai booking active trùng đêm.  The GiST index
+        # behind the constraint also serves overlap lookups (see overlaps_stay).
+        ExcludeConstraint(
+            (literal_column("room_id"), "="),
+            (stay_range(literal_column("check_in"), literal_column("check_out")), "&&"),
+            name="ex_bookings_room_stay",
+            using="gist",
+            where=text(
+                "status IN (%s)" % ", ".join(f"'{status.value}'" for status in ACTIVE_BOOKING_STATUSES)
+            ),
+        ),
+        # Overlap lookups by room type (availability counts)
+        Index(
+            "ix_bookings_room_type_stay",
+            literal_column("room_type_id"),
+            stay_range(literal_column("check_in"), literal_column("check_out")),
+            postgresql_using="gist",
+        ),
+    )
+    # Mỗi UPDATE qua ORM là compare-and-swap trên version (xem app.utils.concurrency)
+    __mapper_args__ = {"version_id_col": _booking_version}
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
 
     user_id: Optional[uuid.UUID] = Field(default=None, foreign_key="users.id")
     property_id: uuid.UUID = Field(foreign_key="properties.id")
     room_type_id: uuid.UUID = Field(foreign_key="room_types.id")
+    room_id: Optional[uuid.UUID] = Field(default=None, foreign_key="rooms.id")  # phòng được gán
+    rate_plan_id: Optional[uuid.UUID] = Field(default=None, foreign_key="rate_plans.id")
 
     check_in: date
     check_out: date
@@ -33,8 +70,12 @@ class Booking(SQLModel, table=True):
     guest_email: Optional[str] = None
     guest_phone: Optional[str] = None
 
+    special_requests: Optional[str] = None
+
     hold_until: Optional[datetime] = None  # thời gian giữ phòng (hold)
 
+    version: int = Field(default=1, sa_column=_booking_version)
+
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(
         default_factory=datetime.utcnow,
@@ -44,3 +85,13 @@ class Booking(SQLModel, table=True):
     # RELATIONSHIPS
     user: Optional["User"] = Relationship(back_populates="bookings")
     payments: List["Payment"] = Relationship(back_populates="booking")
+
+
+def overlaps_stay(check_in: date, check_out: date):
+    """Condition matching bookings whose nights overlap ``[check_in, check_out)``."""
+    return stay_range(Booking.check_in, Booking.check_out).op("&&")(stay_range(check_in, check_out))
+
+
+def is_overlap_violation(exc: Exception) -> bool:
+    """Whether a DB error was raised by the ``ex_bookings_room_stay`` constraint."""
+    return "ex_bookings_room_stay" in str(getattr(exc, "orig", exc))
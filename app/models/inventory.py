@@ -3,12 +3,19 @@ import uuid
 from datetime import date
 from sqlmodel import SQLModel, Field
 
+from app.utils.concurrency import version_column
+
+_inventory_version = version_column()
+
 
 class Inventory(SQLModel, table=True):
     __tablename__ = "inventory"
+    __mapper_args__ = {"version_id_col": _inventory_version}
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     room_type_id: uuid.UUID = Field(foreign_key="room_types.id")
 
     date: date
     available_rooms: int  # số phòng còn
+
+    version: int = Field(default=1, sa_column=_inventory_version)
@@ -0,0 +1,39 @@
+from __future__ import annotations
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+from sqlalchemy import Column, Index, text
+from sqlalchemy.types import JSON
+from sqlmodel import SQLModel, Field
+
+
+class OutboxEvent(SQLModel, table=True):
+    """
+    Side effect (email, notification, ...) ghi cùng transaction với dữ liệu nghiệp vụ.
+
+    Worker relay đọc các event chưa xử lý và gửi sang Celery, nên request
+    không phải chờ broker và không mất event khi broker lỗi.
+    """
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # Hàng đợi: chỉ index các event chưa xử lý
+        Index(
+            "ix_outbox_events_pending",
+            "available_at",
+            postgresql_where=text("processed_at IS NULL"),
+        ),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    event_type: str = Field(max_length=100)
+    payload: Dict[str, Any] = Field(
+        default_factory=dict,
+        sa_column=Column(JSON, nullable=False, default=dict)
+    )
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    available_at: datetime = Field(default_factory=datetime.utcnow)  # thời điểm được thử (lại)
+    processed_at: Optional[datetime] = None
+
+    attempts: int = Field(default=0)
+    last_error: Optional[str] = None
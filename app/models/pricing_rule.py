@@ -0,0 +1,55 @@
+from __future__ import annotations
+import uuid
+from datetime import date, datetime
+from typing import List, Optional
+from sqlalchemy import Column, Index
+from sqlalchemy.types import JSON
+from sqlmodel import SQLModel, Field
+
+from app.utils.enums import PricingRuleType
+
+
+class PricingRule(SQLModel, table=True):
+    """
+    Điều chỉnh giá theo quy tắc (mùa, thứ trong tuần, số đêm, đặt sát ngày).
+
+    Một đêm chịu mọi rule khớp với nó; các hệ số ``1 + adjustment_percent / 100``
+    được nhân với nhau.  Rule không có ``rate_plan_id`` áp dụng cho mọi rate
+    plan của property (trừ khi ``applies_to_rate_plans`` = False) và cho phòng
+    tính giá theo ``price_per_night``.  Điều kiện để trống (None) nghĩa là
+    không giới hạn.
+    """
+    __tablename__ = "pricing_rules"
+    __table_args__ = (
+        Index("ix_pricing_rules_property_rate_plan", "property_id", "rate_plan_id"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    property_id: uuid.UUID = Field(foreign_key="properties.id")
+    rate_plan_id: Optional[uuid.UUID] = Field(default=None, foreign_key="rate_plans.id")
+
+    name: str
+    rule_type: PricingRuleType
+    adjustment_percent: float  # +20 = tăng 20%, -10 = giảm 10%
+
+    # Khoảng ngày áp dụng, tính cả end_date
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    # Thứ áp dụng: 0 = thứ Hai ... 6 = Chủ nhật
+    weekdays: Optional[List[int]] = Field(default=None, sa_column=Column(JSON, nullable=True))
+
+    # Điều kiện theo cả kỳ lưu trú
+    min_nights: Optional[int] = None
+    max_nights: Optional[int] = None
+    min_days_before_checkin: Optional[int] = None
+    max_days_before_checkin: Optional[int] = None
+
+    # False: chỉ áp dụng cho phòng không có rate plan (giá price_per_night)
+    applies_to_rate_plans: bool = Field(default=True)
+    is_active: bool = Field(default=True)
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column_kwargs={"onupdate": datetime.utcnow},
+    )
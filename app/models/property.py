@@ -2,13 +2,21 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 from typing import Optional, List
+from sqlalchemy import Index, event
 from sqlmodel import SQLModel, Field, Relationship
 
 from app.utils.enums import PropertyType
+from app.utils.geo import encode_geohash
 
 
 class Property(SQLModel, table=True):
     __tablename__ = "properties"
+    __table_args__ = (
+        # Prefix (LIKE 'abc%') scans for geo search
+        Index("ix_properties_geohash", "geohash", postgresql_ops={"geohash": "text_pattern_ops"}),
+        # Keyset pagination order for search
+        Index("ix_properties_name_id", "name", "id"),
+    )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     organization_id: uuid.UUID = Field(foreign_key="organizations.id")
@@ -26,6 +34,8 @@ class Property(SQLModel, table=True):
     # Toạ độ để FE map + search
     latitude: Optional[float] = None
     longitude: Optional[float] = None
+    # Geohash của toạ độ, tự cập nhật khi lưu (xem _sync_geohash)
+    geohash: Optional[str] = Field(default=None, max_length=12)
 
     # Gắn location phân cấp (tỉnh/thành/phường/quận)
     location_id: Optional[uuid.UUID] = Field(default=None, foreign_key="locations.id")
@@ -76,6 +86,16 @@ class Property(SQLModel, table=True):
     experiences: List["Experience"] = Relationship(back_populates="property")
 
 
+@event.listens_for(Property, "before_insert")
+@event.listens_for(Property, "before_update")
+def _sync_geohash(mapper, connection, target: Property) -> None:
+    """Keep ``geohash`` in step with latitude/longitude."""
+    if target.latitude is None or target.longitude is None:
+        target.geohash = None
+    else:
+        target.geohash = encode_geohash(target.latitude, target.longitude)
+
+
 class PropertyImage(SQLModel, table=True):
     __tablename__ = "property_images"
 
@@ -11,6 +11,7 @@ from app.models.payment import Payment
 from app.models.booking import Booking
 from app.models.room import Room
 from app.utils.enums import BookingStatus
+from app.services import price_calendar_cache
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -177,3 +178,19 @@ def analytics_revenue(
         "total_revenue": total_revenue,
         "revenue_by_day": revenue_by_day_str,
     }
+
+
+# ============================================================
+# 🗄️ Cache
+# ============================================================
+
+@router.get("/cache/price-calendar")
+def price_calendar_cache_stats(
+    current_admin: User = Depends(get_current_superuser),
+):
+    """
+    Hit/miss counters of the price calendar cache in this API process:
+    hits per tier (in-process LRU, Redis), database loads, invalidations,
+    Redis errors and the resulting hit rates.
+    """
+    return price_calendar_cache.cache_stats()
@@ -25,27 +25,137 @@ Example request body:
 
 The response will include whether the request is available, how many
 rooms remain and the computed total price.
+
+``POST /availability/quote/batch`` takes many such requests (e.g. every
+room type and rate plan on a property page) and answers them together,
+reading inventory and prices with one range query each.
 """
 
 from __future__ import annotations
 
+from collections import defaultdict
 from datetime import timedelta
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import Session, and_, select
 
 from app.core.database import get_session
 from app.models.property import Property
 from app.models.room_type import RoomType
 from app.models.rate_plan import RatePlan
 from app.models.inventory import Inventory
-from app.models.daily_price import DailyPrice
-from app.schemas.availability import QuoteRequest, QuoteResponse
+from app.schemas.availability import (
+    BatchQuoteItem,
+    BatchQuoteRequest,
+    BatchQuoteResponse,
+    QuoteRequest,
+    QuoteResponse,
+)
+from app.services.pricing_engine import PricingEngine
 
 
 router = APIRouter(prefix="/availability", tags=["availability"])
 
+# Kết quả báo giá: (QuoteResponse, None) hoặc (None, (status_code, lỗi))
+QuoteResult = Tuple[Optional[QuoteResponse], Optional[Tuple[int, str]]]
+
+
+def _quote_many(session: Session, requests: List[QuoteRequest]) -> List[QuoteResult]:
+    """Báo giá nhiều yêu cầu cùng lúc.
+
+    Room type (kèm property) và rate plan được kiểm tra bằng hai truy vấn
+    theo id.  Tồn kho của mọi room type trong cả khoảng ngày được đọc bằng
+    một truy vấn, và giá của mọi rate plan bằng một truy vấn qua
+    ``PricingEngine``, nên số truy vấn không tăng theo số yêu cầu hay số đêm.
+    Đêm không có bản ghi inventory được coi là hết phòng.
+    """
+    room_types: Dict = {
+        room_type.id: (room_type, prop)
+        for room_type, prop in session.exec(
+            select(RoomType, Property)
+            .join(Property, RoomType.property_id == Property.id)
+            .where(RoomType.id.in_({request.room_type_id for request in requests}))
+        ).all()
+    }
+    rate_plans: Dict = {
+        rate_plan.id: rate_plan
+        for rate_plan in session.exec(
+            select(RatePlan).where(RatePlan.id.in_({request.rate_plan_id for request in requests}))
+        ).all()
+    }
+
+    errors: Dict[int, Tuple[int, str]] = {}
+    for index, request in enumerate(requests):
+        room_type, prop = room_types.get(request.room_type_id, (None, None))
+        rate_plan = rate_plans.get(request.rate_plan_id)
+        if prop is not None and prop.id == request.property_id and not getattr(prop, "is_active", True):
+            errors[index] = (404, "Property not found")
+        elif (
+            not room_type
+            or room_type.property_id != request.property_id
+            or not getattr(room_type, "is_active", True)
+        ):
+            errors[index] = (404, "Room type not found for this property")
+        elif (
+            not rate_plan
+            or rate_plan.property_id != request.property_id
+            or rate_plan.room_type_id != request.room_type_id
+        ):
+            errors[index] = (404, "Rate plan not found for this room type and property")
+        elif request.check_out <= request.check_in:
+            errors[index] = (400, "check_out must be after check_in")
+
+    valid = [
+        (index, request) for index, request in enumerate(requests) if index not in errors
+    ]
+    results: List[QuoteResult] = [(None, errors.get(index)) for index in range(len(requests))]
+    if not valid:
+        return results
+
+    span_start = min(request.check_in for _, request in valid)
+    span_end = max(request.check_out for _, request in valid)
+    inventory: Dict = defaultdict(dict)
+    for room_type_id, night, available_rooms in session.exec(
+        select(Inventory.room_type_id, Inventory.date, Inventory.available_rooms).where(
+            and_(
+                Inventory.room_type_id.in_({request.room_type_id for _, request in valid}),
+                Inventory.date >= span_start,
+                Inventory.date < span_end,
+            )
+        )
+    ).all():
+        inventory[room_type_id][night] = available_rooms
+
+    calendars = PricingEngine(session).calendars(
+        (rate_plans[request.rate_plan_id] for _, request in valid), span_start, span_end
+    )
+
+    for index, request in valid:
+        rate_plan = rate_plans[request.rate_plan_id]
+        nights = inventory[request.room_type_id]
+        available_rooms = min(
+            nights.get(request.check_in + timedelta(days=i), 0)
+            for i in range((request.check_out - request.check_in).days)
+        )
+        if available_rooms < request.num_rooms:
+            quote = QuoteResponse(
+                available=False,
+                remaining_rooms=max(available_rooms, 0),
+                total_price=0.0,
+                currency=rate_plan.currency,
+            )
+        else:
+            total_price = calendars[rate_plan.id].total(request.check_in, request.check_out)
+            quote = QuoteResponse(
+                available=True,
+                remaining_rooms=available_rooms - request.num_rooms,
+                total_price=total_price * request.num_rooms,
+                currency=rate_plan.currency,
+            )
+        results[index] = (quote, None)
+    return results
+
 
 @router.post("/quote", response_model=QuoteResponse, status_code=status.HTTP_200_OK)
 def quote_availability(
@@ -54,80 +164,40 @@ def quote_availability(
     """Tính toán báo giá và kiểm tra phòng trống.
 
     Nhận vào property, room type và rate plan cùng với ngày check-in,
-    check-out và số lượng phòng cần đặt.  Hàm này xác định số đêm
-    bằng cách tính số ngày giữa check-out và check-in, kiểm tra tồn
-    kho từng ngày để đảm bảo có đủ phòng, và tính tổng giá dựa trên
-    ``RatePlan.base_price`` hoặc ``DailyPrice.price`` (nếu có override).
+    check-out và số lượng phòng cần đặt.  Tồn kho của mọi đêm được đọc
+    bằng một truy vấn theo khoảng ngày, và tổng giá (``RatePlan.base_price``
+    hoặc ``DailyPrice.price`` nếu có override) được tính bằng ``PricingEngine``.
     Nếu không đủ phòng, trả về ``available=False`` cùng số phòng còn lại.
     """
-    # Validate property
-    prop = session.get(Property, payload.property_id)
-    if not prop or not getattr(prop, "is_active", True):
-        raise HTTPException(status_code=404, detail="Property not found")
-    # Validate room type
-    room_type = session.get(RoomType, payload.room_type_id)
-    if (
-        not room_type
-        or room_type.property_id != payload.property_id
-        or not getattr(room_type, "is_active", True)
-    ):
-        raise HTTPException(status_code=404, detail="Room type not found for this property")
-    # Validate rate plan
-    rate_plan = session.get(RatePlan, payload.rate_plan_id)
-    if (
-        not rate_plan
-        or rate_plan.property_id != payload.property_id
-        or rate_plan.room_type_id != payload.room_type_id
-    ):
-        raise HTTPException(status_code=404, detail="Rate plan not found for this room type and property")
-    # Validate dates
-    if payload.check_out <= payload.check_in:
-        raise HTTPException(status_code=400, detail="check_out must be after check_in")
-    # Build list of dates (each night of stay)
-    nights = (payload.check_out - payload.check_in).days
-    dates: List = [payload.check_in + timedelta(days=i) for i in range(nights)]
-    # Determine minimum available rooms across dates
-    min_available: int = None  # type: ignore
-    for day in dates:
-        inv = session.exec(
-            select(Inventory).where(
-                Inventory.room_type_id == payload.room_type_id, Inventory.date == day
+    quote, error = _quote_many(session, [payload])[0]
+    if error:
+        raise HTTPException(status_code=error[0], detail=error[1])
+    return quote
+
+
+@router.post("/quote/batch", response_model=BatchQuoteResponse, status_code=status.HTTP_200_OK)
+def quote_availability_batch(
+    payload: BatchQuoteRequest, session: Session = Depends(get_session)
+) -> BatchQuoteResponse:
+    """Báo giá nhiều (room type, rate plan, ngày, số phòng) trong một request.
+
+    Dùng cho trang property: mọi rate plan được báo giá cùng lúc với cùng
+    số truy vấn như một báo giá đơn lẻ.  Kết quả giữ thứ tự yêu cầu; yêu cầu
+    không hợp lệ có ``error`` thay vì làm hỏng cả batch.
+    """
+    items = []
+    for request, (quote, error) in zip(payload.quotes, _quote_many(session, payload.quotes)):
+        if quote is None:
+            quote = QuoteResponse(available=False, remaining_rooms=0, total_price=0.0, currency="VND")
+        items.append(
+            BatchQuoteItem(
+                **quote.model_dump(),
+                room_type_id=request.room_type_id,
+                rate_plan_id=request.rate_plan_id,
+                check_in=request.check_in,
+                check_out=request.check_out,
+                num_rooms=request.num_rooms,
+                error=error[1] if error else None,
             )
-        ).first()
-        if inv:
-            if inv.closed_for_sale:
-                # If closed for sale, no rooms available
-                min_available = 0
-                break
-            available = inv.total_rooms - inv.booked_rooms
-        else:
-            # No inventory record means no rooms defined for this date
-            available = 0
-        if min_available is None or available < min_available:
-            min_available = available
-    # If no inventory found at all, treat as zero availability
-    available_rooms = min_available if min_available is not None else 0
-    # Check if enough rooms remain
-    if available_rooms < payload.num_rooms:
-        return QuoteResponse(
-            available=False,
-            remaining_rooms=available_rooms,
-            total_price=0.0,
-            currency=rate_plan.currency,
         )
-    # Calculate total price
-    total_price = 0.0
-    for day in dates:
-        daily_override = session.exec(
-            select(DailyPrice).where(
-                DailyPrice.rate_plan_id == payload.rate_plan_id, DailyPrice.date == day
-            )
-        ).first()
-        nightly_price = daily_override.price if daily_override else rate_plan.base_price
-        total_price += nightly_price * payload.num_rooms
-    return QuoteResponse(
-        available=True,
-        remaining_rooms=available_rooms - payload.num_rooms,
-        total_price=total_price,
-        currency=rate_plan.currency,
-    )
\ No newline at end of file
+    return BatchQuoteResponse(quotes=items)
@@ -14,17 +14,21 @@ import uuid
 from datetime import date
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
 
 from app.core.database import get_session
 from app.models.room import Room
-from app.models.booking import Booking
+from app.models.booking import ACTIVE_BOOKING_STATUSES, Booking, is_overlap_violation, overlaps_stay
 from app.models.user import User
-from app.schemas.booking import BookingCreate, BookingUpdate, BookingOut
+from app.schemas.booking import BookingCreate, BookingUpdate, BookingOut, GroupBookingRequest
+from app.utils.concurrency import check_version, conflict_on_stale, parse_if_match
 from app.utils.dependencies import get_current_user
 from app.utils.enums import BookingStatus, UserRole
-from app.services.booking_service import room_available, compute_total
+from app.services.booking_service import BookingService, room_available, compute_total
+from app.services.idempotency import run_idempotent
+from app.services.outbox import add_event
 
 
 router = APIRouter(prefix="/bookings", tags=["bookings"])
@@ -46,13 +50,26 @@ class GuestBookingRequest(BaseModel):
 def create_guest_booking(
     *,
     session: Session = Depends(get_session),
-    booking_request: GuestBookingRequest
+    booking_request: GuestBookingRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ) -> dict:
     """
     Create a booking for guest users (no authentication required).
     Public endpoint for the booking flow with email notifications.
-    """
     
+    Send an ``Idempotency-Key`` header to make retries safe: a repeated
+    request returns the original response without booking twice.
+    """
+    return run_idempotent(
+        "bookings:public",
+        idempotency_key,
+        booking_request.guest_email.lower(),
+        booking_request,
+        lambda: _create_guest_booking(session, booking_request)
+    )
+
+
+def _create_guest_booking(session: Session, booking_request: GuestBookingRequest) -> dict:
     # Validate dates
     if booking_request.check_in >= booking_request.check_out:
         raise HTTPException(
@@ -72,25 +89,23 @@ def create_guest_booking(
         raise HTTPException(status_code=404, detail="Room not found")
     
     # Check if room capacity is sufficient
-    if booking_request.guests > room.capacity:
+    capacity = room.room_type.max_occupancy
+    if booking_request.guests > capacity:
         raise HTTPException(
             status_code=400,
-            detail=f"Room capacity is {room.capacity}, but {booking_request.guests} guests requested"
+            detail=f"Room capacity is {capacity}, but {booking_request.guests} guests requested"
         )
     
     # Check for conflicting bookings
-    from app.models.booking import BookingStatus
-    conflicting_bookings = session.exec(
-        select(Booking).where(
+    conflicting_booking = session.exec(
+        select(Booking.id).where(
             Booking.room_id == booking_request.room_id,
-            Booking.status.in_([BookingStatus.CONFIRMED]),
-            # Check for date overlap
-            Booking.check_in < booking_request.check_out,
-            Booking.check_out > booking_request.check_in
+            Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+            overlaps_stay(booking_request.check_in, booking_request.check_out)
         )
-    ).all()
+    ).first()
     
-    if conflicting_bookings:
+    if conflicting_booking:
         raise HTTPException(
             status_code=400,
             detail="Room is not available for the selected dates"
@@ -99,29 +114,36 @@ def create_guest_booking(
     # Calculate pricing using PricingService
     nights = (booking_request.check_out - booking_request.check_in).days
     
+    from app.services.pricing_rules import property_rules
     from app.services.pricing_service import PricingService
     
     pricing = PricingService.calculate_room_pricing(
-        base_price_per_night=float(room.price_per_night),
+        base_price_per_night=BookingService(session).room_type_price(room.room_type_id),
         nights=nights,
         guests=booking_request.guests,
-        room_capacity=room.capacity,
+        room_capacity=capacity,
         check_in=booking_request.check_in,
-        check_out=booking_request.check_out
+        check_out=booking_request.check_out,
+        lean=True  # chỉ cần total_price
     )
     
     # Apply seasonal pricing
-    pricing = PricingService.apply_seasonal_pricing(pricing, booking_request.check_in, booking_request.check_out)
+    pricing = PricingService.apply_seasonal_pricing(
+        pricing,
+        booking_request.check_in,
+        booking_request.check_out,
+        rules=property_rules(session, room.room_type.property_id)
+    )
     total_price = pricing["total_price"]
     
     # Create booking
     booking = Booking(
         room_id=booking_request.room_id,
-        property_id=room.property_id,
+        room_type_id=room.room_type_id,
+        property_id=room.room_type.property_id,
         check_in=booking_request.check_in,
         check_out=booking_request.check_out,
-        guest_count=booking_request.guests,
-        total_amount=total_price,
+        total_price=total_price,
         status=BookingStatus.PENDING,
         guest_name=booking_request.guest_name,
         guest_email=booking_request.guest_email,
@@ -130,22 +152,32 @@ def create_guest_booking(
     )
     
     session.add(booking)
-    session.commit()
-    session.refresh(booking)
     
-    # Send booking confirmation email asynchronously
-    from app.worker.tasks import send_booking_confirmation
-    send_booking_confirmation.delay(
-        guest_email=booking_request.guest_email,
-        guest_name=booking_request.guest_name,
-        booking_id=str(booking.id),
-        room_number=room.number,
-        check_in=str(booking_request.check_in),
-        check_out=str(booking_request.check_out),
-        guests=booking_request.guests,
-        total_amount=total_price,
-        special_requests=booking_request.special_requests
-    )
+    # Confirmation email goes through the outbox, committed with the booking
+    add_event(session, "booking.confirmation_email", {
+        "guest_email": booking_request.guest_email,
+        "guest_name": booking_request.guest_name,
+        "booking_id": str(booking.id),
+        "room_number": room.room_number,
+        "check_in": str(booking_request.check_in),
+        "check_out": str(booking_request.check_out),
+        "guests": booking_request.guests,
+        "total_amount": total_price,
+        "special_requests": booking_request.special_requests
+    })
+    
+    try:
+        session.commit()
+    except IntegrityError as exc:
+        session.rollback()
+        if is_overlap_violation(exc):
+            # A concurrent request booked the same room first
+            raise HTTPException(
+                status_code=409,
+                detail="Room is not available for the selected dates"
+            ) from None
+        raise
+    session.refresh(booking)
     
     return {
         "booking_id": str(booking.id),
@@ -211,14 +243,31 @@ def create_booking(
     payload: BookingCreate,
     session: Session = Depends(get_session),
     current: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ) -> BookingOut:
-    """Tạo một booking mới."""
+    """Tạo một booking mới.
+
+    Header ``Idempotency-Key`` giúp retry an toàn: request lặp lại trả về
+    response ban đầu, không tạo booking trùng.
+    """
+    return run_idempotent(
+        "bookings",
+        idempotency_key,
+        current.id,
+        payload,
+        lambda: _create_booking(session, payload, current),
+        status_code=status.HTTP_201_CREATED,
+        response_model=BookingOut,
+    )
+
+
+def _create_booking(session: Session, payload: BookingCreate, current: User) -> Booking:
     room = session.get(Room, payload.room_id)
     if not room or not room.is_active:
         raise HTTPException(status_code=404, detail="Room not available")
     if not room_available(session, room.id, payload.check_in, payload.check_out):
         raise HTTPException(status_code=400, detail="Room is not available for selected dates")
-    total = compute_total(room, payload.check_in, payload.check_out)
+    total = compute_total(session, room, payload.check_in, payload.check_out)
     booking = Booking(
         user_id=current.id,
         room_id=room.id,
@@ -233,19 +282,51 @@ def create_booking(
     return booking
 
 
+@router.post("/group", status_code=status.HTTP_201_CREATED)
+def create_group_booking(
+    *,
+    payload: GroupBookingRequest,
+    session: Session = Depends(get_session),
+    current: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+) -> dict:
+    """Đặt nhiều phòng/loại phòng cùng lúc (đoàn, tour operator).
+
+    Toàn bộ các dòng được kiểm tra, tính giá và giữ inventory trong một
+    transaction; kết quả trả về theo từng dòng.
+    """
+    return run_idempotent(
+        "bookings:group",
+        idempotency_key,
+        current.id,
+        payload,
+        lambda: BookingService(session).create_group_booking(
+            user_id=current.id,
+            lines=[line.model_dump() for line in payload.lines],
+            special_requests=payload.special_requests,
+            allow_partial=payload.allow_partial,
+        ),
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
 @router.patch("/{booking_id}", response_model=BookingOut)
 def update_booking(
     *,
     booking_id: uuid.UUID,
     payload: BookingUpdate,
+    if_match: Optional[str] = Header(None, alias="If-Match"),
     session: Session = Depends(get_session),
     current: User = Depends(get_current_user),
 ) -> BookingOut:
     """Cập nhật thông tin booking.
 
     Cho phép điều chỉnh ngày check-in/check-out hoặc cập nhật trạng thái (ví
-    dụ "cancelled").  Hệ thống kiểm tra tính khả dụng của phòng khi thay
-    đổi ngày và tính lại tổng số tiền.
+    dụ "cancelled").  Khi đổi ngày, hệ thống chỉ kiểm tra phòng trống, cập
+    nhật inventory và tính lại giá cho những đêm thêm/bớt.
+
+    Gửi ``If-Match: <version>`` để chỉ cập nhật nếu booking chưa bị sửa kể
+    từ lần đọc; xung đột trả về 409.
     """
     booking = session.get(Booking, booking_id)
     if not booking:
@@ -258,54 +339,57 @@ def update_booking(
     ):
         raise HTTPException(status_code=403, detail="Not authorized to update this booking")
 
+    check_version(booking, parse_if_match(if_match))
+
+    # Các thay đổi được ghi bằng UPDATE ... WHERE version = <version đã đọc>
     data = payload.model_dump(exclude_unset=True)
+    with conflict_on_stale(session, "Booking"):
+        try:
+            # Đổi ngày: chỉ kiểm tra, giữ/trả inventory và tính lại giá cho
+            # các đêm thay đổi (xem BookingService.apply_date_change)
+            new_check_in = data.get("check_in", booking.check_in)
+            new_check_out = data.get("check_out", booking.check_out)
+            if new_check_in != booking.check_in or new_check_out != booking.check_out:
+                BookingService(session).apply_date_change(booking, new_check_in, new_check_out)
 
-    # Cập nhật trạng thái nếu có
-    if "status" in data:
-        # Chỉ cho phép các trạng thái xác định trong BookingStatus
-        if data["status"] not in (
-            BookingStatus.PENDING,
-            BookingStatus.CONFIRMED,
-            BookingStatus.CANCELLED,
-            BookingStatus.COMPLETED,
-        ):
-            raise HTTPException(status_code=400, detail="Invalid booking status")
-        old_status = booking.status
-        booking.status = data["status"]
-        
-        # Send email when booking is approved
-        if old_status == BookingStatus.PENDING and booking.status == BookingStatus.CONFIRMED:
-            from app.worker.tasks import send_booking_approved
-            room = session.get(Room, booking.room_id)
-            send_booking_approved.delay(
-                guest_email=booking.guest_email,
-                guest_name=booking.guest_name,
-                booking_id=str(booking.id),
-                room_number=room.number if room else "Unknown",
-                check_in=str(booking.check_in),
-                check_out=str(booking.check_out)
-            )
-
-    # Cập nhật ngày, cần kiểm tra phòng trống và tính lại tổng tiền
-    new_check_in = data.get("check_in", booking.check_in)
-    new_check_out = data.get("check_out", booking.check_out)
-    # Nếu ngày thay đổi, kiểm tra tính hợp lệ và khả dụng
-    if new_check_in != booking.check_in or new_check_out != booking.check_out:
-        # Validate date order
-        if new_check_in >= new_check_out:
-            raise HTTPException(status_code=400, detail="check_in must be before check_out")
-        # Kiểm tra phòng trống
-        if not room_available(session, booking.room_id, new_check_in, new_check_out):
-            raise HTTPException(status_code=400, detail="Room is not available for selected dates")
-        # Tính lại giá
-        room = session.get(Room, booking.room_id)
-        total = compute_total(room, new_check_in, new_check_out)
-        booking.check_in = new_check_in
-        booking.check_out = new_check_out
-        booking.total_amount = total
+            # Cập nhật trạng thái nếu có
+            if "status" in data:
+                # Chỉ cho phép các trạng thái xác định trong BookingStatus
+                if data["status"] not in (
+                    BookingStatus.PENDING,
+                    BookingStatus.CONFIRMED,
+                    BookingStatus.CANCELLED,
+                    BookingStatus.COMPLETED,
+                ):
+                    raise HTTPException(status_code=400, detail="Invalid booking status")
+                old_status = booking.status
+                booking.status = data["status"]
 
-    session.add(booking)
-    session.commit()
+                # Send email when booking is approved (via the outbox, committed below)
+                if old_status == BookingStatus.PENDING and booking.status == BookingStatus.CONFIRMED:
+                    room = session.get(Room, booking.room_id)
+                    add_event(session, "booking.approved_email", {
+                        "guest_email": booking.guest_email,
+                        "guest_name": booking.guest_name,
+                        "booking_id": str(booking.id),
+                        "room_number": room.room_number if room else "Unknown",
+                        "check_in": str(booking.check_in),
+                        "check_out": str(booking.check_out)
+                    })
+
+            session.add(booking)
+            session.commit()
+        except IntegrityError as exc:
+            session.rollback()
+            if is_overlap_violation(exc):
+                raise HTTPException(
+                    status_code=409,
+                    detail="Room is no longer available for the selected dates"
+                ) from None
+            raise
+        except Exception:
+            session.rollback()
+            raise
     session.refresh(booking)
     return booking
 
@@ -313,13 +397,14 @@ def update_booking(
 @router.delete("/{booking_id}", status_code=status.HTTP_204_NO_CONTENT)
 def cancel_booking(
     booking_id: uuid.UUID,
+    if_match: Optional[str] = Header(None, alias="If-Match"),
     session: Session = Depends(get_session),
     current: User = Depends(get_current_user),
 ) -> None:
     """Hủy một booking.
 
     Booking sẽ được chuyển sang trạng thái ``cancelled`` để giữ lịch sử.  Chỉ
-    chủ sở hữu hoặc admin/staff có thể hủy.
+    chủ sở hữu hoặc admin/staff có thể hủy.  Hỗ trợ ``If-Match`` như PATCH.
     """
     booking = session.get(Booking, booking_id)
     if not booking:
@@ -330,7 +415,9 @@ def cancel_booking(
         UserRole.STAFF,
     ):
         raise HTTPException(status_code=403, detail="Not authorized to cancel this booking")
+    check_version(booking, parse_if_match(if_match))
     booking.status = BookingStatus.CANCELLED
     session.add(booking)
-    session.commit()
+    with conflict_on_stale(session, "Booking"):
+        session.commit()
     return None
\ No newline at end of file
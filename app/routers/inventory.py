@@ -3,7 +3,7 @@ Inventory Management API
 Handles room availability, bookings, and inventory tracking
 """
 
-from datetime import date, datetime
+from datetime import date
 from typing import List, Optional
 import uuid
 
@@ -17,6 +17,8 @@ from app.models.room import Room
 from app.models.room_type import RoomType
 from app.utils.dependencies import get_current_user
 from app.models.user import User
+from app.services.booking_service import BookingService
+from app.services.hold_service import HOLD_TTL_SECONDS, get_hold, place_hold, release_hold
 
 router = APIRouter(prefix="/inventory", tags=["inventory"])
 
@@ -117,38 +119,127 @@ def reserve_room_inventory(
 ) -> dict:
     """
     Reserve room inventory for booking.
-    This creates a temporary hold on the inventory.
+    This creates a temporary hold on the room's room type (see /inventory/holds).
     """
     
-    # First check availability
-    availability = check_room_inventory(
-        room_id=room_id,
-        check_in=check_in,
-        check_out=check_out,
-        session=session
-    )
-    
-    if not availability["is_available"]:
-        raise HTTPException(
-            status_code=409,
-            detail=f"Room not available for selected dates. Unavailable dates: {availability['unavailable_dates']}"
-        )
-    
-    # Create reservation record (temporary hold)
-    reservation_id = str(uuid.uuid4())
+    room = session.get(Room, room_id)
+    if not room or not room.is_active:
+        raise HTTPException(status_code=404, detail="Room not found")
     
-    # In a real system, you would create a reservation/hold record
-    # For now, we'll return a reservation confirmation
+    hold = place_hold(
+        session,
+        room.room_type_id,
+        check_in,
+        check_out,
+        user_id=current_user.id
+    )
     
     return {
-        "reservation_id": reservation_id,
+        "reservation_id": hold["hold_id"],
         "room_id": str(room_id),
+        "room_type_id": hold["room_type_id"],
         "check_in": check_in,
         "check_out": check_out,
         "guest_count": guest_count,
         "status": "reserved",
-        "expires_at": datetime.utcnow().replace(microsecond=0).isoformat() + "Z",  # 15 minutes from now
-        "message": "Room reserved successfully. Complete payment within 15 minutes."
+        "expires_at": hold["expires_at"],
+        "message": f"Room reserved successfully. Complete payment within {HOLD_TTL_SECONDS // 60} minutes."
+    }
+
+
+@router.post("/holds", status_code=status.HTTP_201_CREATED)
+def create_hold(
+    *,
+    room_type_id: uuid.UUID,
+    check_in: date,
+    check_out: date,
+    rooms: int = Query(1, ge=1, le=10),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+) -> dict:
+    """
+    Hold rooms of a room type while the guest completes checkout.
+    
+    The hold is kept in Redis only and expires automatically.
+    """
+    
+    if check_in < date.today():
+        raise HTTPException(status_code=400, detail="Check-in date cannot be in the past")
+    
+    room_type = session.get(RoomType, room_type_id)
+    if not room_type or not room_type.is_active:
+        raise HTTPException(status_code=404, detail="Room type not found")
+    
+    return place_hold(
+        session,
+        room_type_id,
+        check_in,
+        check_out,
+        rooms=rooms,
+        user_id=current_user.id
+    )
+
+
+def _get_own_hold(hold_id: str, current_user: User) -> dict:
+    hold = get_hold(hold_id)
+    if not hold:
+        raise HTTPException(status_code=404, detail="Hold not found or expired")
+    if hold["user_id"] and hold["user_id"] != str(current_user.id):
+        raise HTTPException(status_code=403, detail="Hold belongs to another user")
+    return hold
+
+
+@router.get("/holds/{hold_id}")
+def get_hold_details(
+    hold_id: str,
+    current_user: User = Depends(get_current_user)
+) -> dict:
+    """Get an active hold."""
+    return _get_own_hold(hold_id, current_user)
+
+
+@router.delete("/holds/{hold_id}", status_code=status.HTTP_204_NO_CONTENT)
+def release_hold_endpoint(
+    hold_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Release a hold early, giving its rooms back."""
+    _get_own_hold(hold_id, current_user)
+    release_hold(hold_id)
+
+
+@router.post("/holds/{hold_id}/confirm", status_code=status.HTTP_201_CREATED)
+def confirm_hold(
+    hold_id: str,
+    rate_plan_id: uuid.UUID,
+    special_requests: Optional[str] = None,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+) -> dict:
+    """Convert a hold into a booking."""
+    
+    hold = _get_own_hold(hold_id, current_user)
+    
+    booking = BookingService(session).create_booking(
+        user_id=current_user.id,
+        room_type_id=uuid.UUID(hold["room_type_id"]),
+        rate_plan_id=rate_plan_id,
+        check_in=date.fromisoformat(hold["check_in"]),
+        check_out=date.fromisoformat(hold["check_out"]),
+        special_requests=special_requests,
+        hold_id=hold_id,
+        rooms=hold["rooms"]
+    )
+    
+    return {
+        "booking_id": str(booking.id),
+        "status": booking.status,
+        "room_id": str(booking.room_id) if booking.room_id else None,
+        "check_in": booking.check_in,
+        "check_out": booking.check_out,
+        "rooms": booking.rooms_count,
+        "total_price": booking.total_price,
+        "currency": booking.currency
     }
 
 
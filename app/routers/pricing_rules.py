@@ -0,0 +1,143 @@
+"""
+Pricing Rules Router.
+
+CRUD for ``PricingRule`` rows (seasonal, day-of-week, length-of-stay and
+last-minute adjustments) of the current organization's properties.
+Writes go through the session, so cached rule indexes, price calendars
+and search results are invalidated on commit (see
+``app.services.change_tracking``).
+"""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import Session, and_, select
+
+from app.core.database import get_session
+from app.models.pricing_rule import PricingRule
+from app.models.property import Property
+from app.models.rate_plan import RatePlan
+from app.models.user import User
+from app.schemas.pricing_rule import PricingRuleCreate, PricingRuleResponse, PricingRuleUpdate
+from app.utils.dependencies import get_current_staff, get_organization_context
+
+router = APIRouter(prefix="/pricing-rules", tags=["pricing-rules"])
+
+
+def _get_property(session: Session, property_id: uuid.UUID, org_id: uuid.UUID) -> Property:
+    property = session.get(Property, property_id)
+    if not property or property.organization_id != org_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found or doesn't belong to your organization"
+        )
+    return property
+
+
+def _get_rule(session: Session, rule_id: uuid.UUID, org_id: uuid.UUID) -> PricingRule:
+    rule = session.exec(
+        select(PricingRule).join(Property, PricingRule.property_id == Property.id).where(
+            and_(
+                PricingRule.id == rule_id,
+                Property.organization_id == org_id
+            )
+        )
+    ).first()
+    if not rule:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pricing rule not found")
+    return rule
+
+
+def _validate_rule(session: Session, rule: PricingRule) -> None:
+    """Reject rules whose ranges are empty or whose rate plan is not the property's."""
+    if rule.start_date and rule.end_date and rule.start_date > rule.end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    if rule.weekdays and any(weekday not in range(7) for weekday in rule.weekdays):
+        raise HTTPException(status_code=400, detail="weekdays must be between 0 (Monday) and 6 (Sunday)")
+    for low, high, name in (
+        (rule.min_nights, rule.max_nights, "nights"),
+        (rule.min_days_before_checkin, rule.max_days_before_checkin, "days_before_checkin"),
+    ):
+        if low is not None and high is not None and low > high:
+            raise HTTPException(status_code=400, detail=f"min_{name} must not exceed max_{name}")
+    if rule.rate_plan_id:
+        rate_plan = session.get(RatePlan, rule.rate_plan_id)
+        if not rate_plan or rate_plan.property_id != rule.property_id:
+            raise HTTPException(status_code=404, detail="Rate plan not found")
+
+
+@router.get("", response_model=List[PricingRuleResponse])
+def list_pricing_rules(
+    property_id: uuid.UUID,
+    rate_plan_id: Optional[uuid.UUID] = Query(None),
+    include_inactive: bool = Query(False),
+    session: Session = Depends(get_session),
+    current_staff: User = Depends(get_current_staff),
+    org_context: dict = Depends(get_organization_context)
+):
+    """List a property's pricing rules, optionally only those of one rate plan."""
+    _get_property(session, property_id, org_context["organization"].id)
+
+    query = select(PricingRule).where(PricingRule.property_id == property_id)
+    if rate_plan_id:
+        query = query.where(PricingRule.rate_plan_id == rate_plan_id)
+    if not include_inactive:
+        query = query.where(PricingRule.is_active == True)
+    return session.exec(query.order_by(PricingRule.start_date, PricingRule.name)).all()
+
+
+@router.post("", response_model=PricingRuleResponse, status_code=status.HTTP_201_CREATED)
+def create_pricing_rule(
+    payload: PricingRuleCreate,
+    session: Session = Depends(get_session),
+    current_staff: User = Depends(get_current_staff),
+    org_context: dict = Depends(get_organization_context)
+):
+    """Create a pricing rule for a property or one of its rate plans."""
+    _get_property(session, payload.property_id, org_context["organization"].id)
+
+    rule = PricingRule(**payload.model_dump())
+    _validate_rule(session, rule)
+    session.add(rule)
+    session.commit()
+    session.refresh(rule)
+    return rule
+
+
+@router.patch("/{rule_id}", response_model=PricingRuleResponse)
+def update_pricing_rule(
+    rule_id: uuid.UUID,
+    payload: PricingRuleUpdate,
+    session: Session = Depends(get_session),
+    current_staff: User = Depends(get_current_staff),
+    org_context: dict = Depends(get_organization_context)
+):
+    """Update a pricing rule; fields left out are unchanged."""
+    rule = _get_rule(session, rule_id, org_context["organization"].id)
+
+    for field, value in payload.model_dump(exclude_unset=True).items():
+        setattr(rule, field, value)
+    _validate_rule(session, rule)
+    rule.updated_at = datetime.utcnow()
+    session.add(rule)
+    session.commit()
+    session.refresh(rule)
+    return rule
+
+
+@router.delete("/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_pricing_rule(
+    rule_id: uuid.UUID,
+    session: Session = Depends(get_session),
+    current_staff: User = Depends(get_current_staff),
+    org_context: dict = Depends(get_organization_context)
+):
+    """Delete a pricing rule (default peak-season rules are re-seeded; deactivate those instead)."""
+    rule = _get_rule(session, rule_id, org_context["organization"].id)
+    session.delete(rule)
+    session.commit()
+    return None
@@ -84,7 +84,7 @@ def create_booking(
         raise HTTPException(status_code=404, detail="Room not available")
     if not room_available(session, room.id, payload.check_in, payload.check_out):
         raise HTTPException(status_code=400, detail="Room is not available for selected dates")
-    total = compute_total(room, payload.check_in, payload.check_out)
+    total = compute_total(session, room, payload.check_in, payload.check_out)
     booking = Booking(
         user_id=current.id,
         room_id=room.id,
@@ -151,7 +151,7 @@ def update_booking(
             raise HTTPException(status_code=400, detail="Room is not available for selected dates")
         # Tính lại giá
         room = session.get(Room, booking.room_id)
-        total = compute_total(room, new_check_in, new_check_out)
+        total = compute_total(session, room, new_check_in, new_check_out)
         booking.check_in = new_check_in
         booking.check_out = new_check_out
         booking.total_amount = total
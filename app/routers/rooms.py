@@ -16,16 +16,17 @@ from typing import List, Optional
 from datetime import datetime, date
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlmodel import Session, select
+from sqlmodel import Session, select, func
 
 from app.core.database import get_session
 from app.core.redis import get_cache, set_cache, delete_cache
 from app.models.room import Room
 from app.models.room_type import RoomType
 from app.models.property import Property
-from app.models.booking import Booking, BookingStatus
+from app.models.booking import ACTIVE_BOOKING_STATUSES, Booking, overlaps_stay
 from app.schemas.room import RoomCreate, RoomOut, RoomUpdate
 from app.utils.dependencies import get_current_superuser
+from app.utils.pagination import decode_cursor, encode_cursor
 from app.models.user import User
 
 
@@ -78,76 +79,77 @@ def list_public_rooms(
     max_price: Optional[float] = Query(None, description="Giá tối đa"),
     min_capacity: Optional[int] = Query(None, description="Số người tối thiểu"),
     max_capacity: Optional[int] = Query(None, description="Số người tối đa"),
-    amenities: Optional[str] = Query(None, description="Tiện ích (phân cách bằng dấu phẩy)")
+    amenities: Optional[str] = Query(None, description="Tiện ích (phân cách bằng dấu phẩy)"),
+    cursor: Optional[str] = Query(None, description="Cursor của trang trước (next_cursor)")
 ) -> dict:
     """
     API công khai để lấy danh sách phòng với thông tin đầy đủ và filters.
     Không cần authentication, phù hợp cho trang public.
     Hỗ trợ pagination và filters theo loại phòng, giá, số người, tiện ích.
+    Truyền ``next_cursor`` vào ``cursor`` để phân trang keyset (không OFFSET).
     """
-    # Base query để lấy rooms với room_type và property info
-    query = select(Room, RoomType).join(
-        RoomType, Room.room_type_id == RoomType.id
-    ).where(
+    # Điều kiện lọc dùng chung cho truy vấn dữ liệu và truy vấn đếm
+    filters = [
         Room.is_active == True,
         RoomType.is_active == True
-    )
+    ]
     
     # Apply filters
     if property_id:
-        query = query.where(RoomType.property_id == property_id)
+        filters.append(RoomType.property_id == property_id)
     
     if room_type:
-        query = query.where(Room.type.ilike(f"%{room_type}%"))
+        filters.append(Room.type.ilike(f"%{room_type}%"))
     
     if min_price is not None:
-        query = query.where(Room.price_per_night >= min_price)
+        filters.append(Room.price_per_night >= min_price)
     
     if max_price is not None:
-        query = query.where(Room.price_per_night <= max_price)
+        filters.append(Room.price_per_night <= max_price)
     
     if min_capacity is not None:
-        query = query.where(Room.capacity >= min_capacity)
+        filters.append(Room.capacity >= min_capacity)
     
     if max_capacity is not None:
-        query = query.where(Room.capacity <= max_capacity)
+        filters.append(Room.capacity <= max_capacity)
     
-    # Count total for pagination
-    count_query = select(Room).join(RoomType, Room.room_type_id == RoomType.id).where(
-        Room.is_active == True,
-        RoomType.is_active == True
-    )
-    
-    # Apply same filters to count query
-    if property_id:
-        count_query = count_query.where(RoomType.property_id == property_id)
-    if room_type:
-        count_query = count_query.where(Room.type.ilike(f"%{room_type}%"))
-    if min_price is not None:
-        count_query = count_query.where(Room.price_per_night >= min_price)
-    if max_price is not None:
-        count_query = count_query.where(Room.price_per_night <= max_price)
-    if min_capacity is not None:
-        count_query = count_query.where(Room.capacity >= min_capacity)
-    if max_capacity is not None:
-        count_query = count_query.where(Room.capacity <= max_capacity)
+    # Base query để lấy rooms với room_type và property info (một truy vấn, không N+1)
+    query = select(Room, RoomType, Property).join(
+        RoomType, Room.room_type_id == RoomType.id
+    ).outerjoin(
+        Property, RoomType.property_id == Property.id
+    ).where(*filters).order_by(Room.id)
     
-    total_count = len(session.exec(count_query).all())
+    if cursor:
+        # Keyset pagination: tiếp tục sau phòng cuối cùng của trang trước
+        state = decode_cursor(cursor)
+        try:
+            last_id = uuid.UUID(state["id"])
+            total_count = int(state["total"])
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid pagination cursor") from None
+        query = query.where(Room.id > last_id)
+    else:
+        # Count total for pagination bằng COUNT(*) trên database (chỉ ở trang đầu)
+        total_count = session.exec(
+            select(func.count(Room.id)).select_from(Room).join(
+                RoomType, Room.room_type_id == RoomType.id
+            ).where(*filters)
+        ).one()
+        if offset:
+            query = query.offset(offset)
     
-    # Apply pagination
-    if offset:
-        query = query.offset(offset)
+    # Apply pagination (lấy dư một dòng để biết còn trang sau hay không)
     if limit:
-        query = query.limit(limit)
+        query = query.limit(limit + 1)
     
     results = session.exec(query).all()
+    has_more = bool(limit) and len(results) > limit
+    if limit:
+        results = results[:limit]
     
     rooms_data = []
-    for room, room_type in results:
-        # Get property info
-        property_query = select(Property).where(Property.id == room_type.property_id)
-        property_obj = session.exec(property_query).first()
-        
+    for room, room_type, property_obj in results:
         room_data = {
             "id": str(room.id),
             "number": room.number,
@@ -178,6 +180,10 @@ def list_public_rooms(
         }
         rooms_data.append(room_data)
     
+    next_cursor = None
+    if has_more and results:
+        next_cursor = encode_cursor({"id": results[-1][0].id, "total": total_count})
+    
     # Return with pagination info
     return {
         "rooms": rooms_data,
@@ -185,8 +191,9 @@ def list_public_rooms(
             "total": total_count,
             "limit": limit,
             "offset": offset,
-            "has_more": (offset + limit) < total_count if limit else False,
-            "current_page": (offset // limit) + 1 if limit else 1,
+            "has_more": has_more,
+            "next_cursor": next_cursor,
+            "current_page": (offset // limit) + 1 if limit and not cursor else None,
             "total_pages": (total_count + limit - 1) // limit if limit else 1
         },
         "filters_applied": {
@@ -395,12 +402,10 @@ def check_room_availability(
     
     # Check for conflicting bookings
     conflicting_bookings = session.exec(
-        select(Booking).where(
+        select(Booking.id).where(
             Booking.room_id == room_id,
-            Booking.status.in_([BookingStatus.CONFIRMED]),
-            # Check for date overlap: booking overlaps if it starts before check_out and ends after check_in
-            Booking.check_in < check_out,
-            Booking.check_out > check_in
+            Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+            overlaps_stay(check_in, check_out)
         )
     ).all()
     
@@ -418,6 +423,7 @@ def check_room_availability(
     # Calculate nights and pricing using PricingService
     nights = (check_out - check_in).days
     
+    from app.services.pricing_rules import property_rules
     from app.services.pricing_service import PricingService
     
     pricing = PricingService.calculate_room_pricing(
@@ -430,7 +436,12 @@ def check_room_availability(
     )
     
     # Apply seasonal pricing
-    pricing = PricingService.apply_seasonal_pricing(pricing, check_in, check_out)
+    pricing = PricingService.apply_seasonal_pricing(
+        pricing,
+        check_in,
+        check_out,
+        rules=property_rules(session, room.room_type.property_id)
+    )
     
     return {
         "available": True,
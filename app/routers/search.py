@@ -5,10 +5,14 @@ This router provides endpoints for property search, availability checks,
 and pricing information for the SAAS hotel booking platform.
 """
 
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
 from sqlmodel import Session
 from typing import List, Optional, Dict, Any
 from datetime import date
+import json
 import uuid
 
 from app.core.database import get_session
@@ -31,6 +35,7 @@ def search_properties(
     organization_id: Optional[uuid.UUID] = Query(None, description="Filter by organization (for multi-tenant)"),
     limit: int = Query(20, ge=1, le=100, description="Number of results per page"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page (next_cursor)"),
     session: Session = Depends(get_session),
     current_user: Optional[User] = Depends(get_current_user_optional)
 ):
@@ -76,10 +81,335 @@ def search_properties(
         max_price=max_price,
         organization_id=organization_id,
         limit=limit,
+        offset=offset,
+        cursor=cursor
+    )
+
+
+@router.get("/properties/stream")
+async def stream_search_properties(
+    request: Request,
+    city: Optional[str] = Query(None, description="City to search in"),
+    check_in: Optional[date] = Query(None, description="Check-in date (YYYY-MM-DD)"),
+    check_out: Optional[date] = Query(None, description="Check-out date (YYYY-MM-DD)"),
+    guests: int = Query(2, ge=1, le=10, description="Number of guests"),
+    property_type: Optional[str] = Query(None, description="Type of property (HOTEL, APARTMENT, etc.)"),
+    min_price: Optional[float] = Query(None, ge=0, description="Minimum price per night"),
+    max_price: Optional[float] = Query(None, ge=0, description="Maximum price per night"),
+    organization_id: Optional[uuid.UUID] = Query(None, description="Filter by organization (for multi-tenant)"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of properties to stream"),
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$", description="ndjson or sse (Server-Sent Events)"),
+    session: Session = Depends(get_session)
+):
+    """
+    Stream search results as they are resolved.
+    
+    Emits one property per line (``ndjson``) or per ``property`` event
+    (``sse``), followed by a final ``done`` record with the count.  If the
+    client disconnects, the search stops without resolving the rest.
+    """
+    
+    if check_in and check_out:
+        if check_in >= check_out:
+            raise HTTPException(
+                status_code=400,
+                detail="Check-in date must be before check-out date"
+            )
+        if check_in < date.today():
+            raise HTTPException(
+                status_code=400,
+                detail="Check-in date cannot be in the past"
+            )
+    
+    if min_price and max_price and min_price > max_price:
+        raise HTTPException(
+            status_code=400,
+            detail="Minimum price cannot be greater than maximum price"
+        )
+    
+    search_service = SearchService(session)
+    results = search_service.iter_search_properties(
+        city=city,
+        check_in=check_in,
+        check_out=check_out,
+        guests=guests,
+        property_type=property_type,
+        min_price=min_price,
+        max_price=max_price,
+        organization_id=organization_id,
+        limit=limit
+    )
+    
+    def encode(event: str, payload: Dict[str, Any]) -> str:
+        data = json.dumps(jsonable_encoder(payload))
+        if format == "sse":
+            return f"event: {event}\ndata: {data}\n\n"
+        return data + "\n"
+    
+    async def event_stream():
+        count = 0
+        # DB work runs in the threadpool; the loop only relays results
+        stream = iterate_in_threadpool(results)
+        try:
+            async for item in stream:
+                if await request.is_disconnected():
+                    return
+                count += 1
+                yield encode("property", item)
+            yield encode("done", {"type": "done", "count": count})
+        finally:
+            # Closes the service generator so no further chunks are queried
+            await stream.aclose()
+            results.close()
+    
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        event_stream(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/facets", response_model=Dict[str, Any])
+def get_search_facets(
+    city: Optional[str] = Query(None, description="City to search in"),
+    check_in: Optional[date] = Query(None, description="Check-in date (YYYY-MM-DD)"),
+    check_out: Optional[date] = Query(None, description="Check-out date (YYYY-MM-DD)"),
+    guests: int = Query(2, ge=1, le=10, description="Number of guests"),
+    property_type: Optional[str] = Query(None, description="Type of property (HOTEL, APARTMENT, etc.)"),
+    min_price: Optional[float] = Query(None, ge=0, description="Minimum price per night"),
+    max_price: Optional[float] = Query(None, ge=0, description="Maximum price per night"),
+    organization_id: Optional[uuid.UUID] = Query(None, description="Filter by organization (for multi-tenant)"),
+    session: Session = Depends(get_session)
+):
+    """
+    Get filter sidebar counts for a search in one request.
+    
+    Returns property type, star rating, price range and amenity counts
+    for the same filters accepted by ``/search/properties``.
+    """
+    
+    if check_in and check_out and check_in >= check_out:
+        raise HTTPException(
+            status_code=400,
+            detail="Check-in date must be before check-out date"
+        )
+    
+    search_service = SearchService(session)
+    
+    return search_service.search_facets(
+        city=city,
+        check_in=check_in,
+        check_out=check_out,
+        guests=guests,
+        property_type=property_type,
+        min_price=min_price,
+        max_price=max_price,
+        organization_id=organization_id
+    )
+
+
+@router.get("/flexible", response_model=Dict[str, Any])
+def search_flexible_dates(
+    earliest_check_in: date = Query(..., description="First possible check-in date (YYYY-MM-DD)"),
+    latest_check_in: date = Query(..., description="Last possible check-in date (YYYY-MM-DD)"),
+    nights: int = Query(..., ge=1, le=30, description="Length of stay in nights"),
+    city: Optional[str] = Query(None, description="City to search in"),
+    guests: int = Query(2, ge=1, le=10, description="Number of guests"),
+    property_type: Optional[str] = Query(None, description="Type of property (HOTEL, APARTMENT, etc.)"),
+    weekdays: Optional[str] = Query(None, description="Allowed check-in weekdays, comma separated (0=Mon … 6=Sun), e.g. 4 for weekends"),
+    windows_per_property: int = Query(3, ge=1, le=10, description="Best date windows returned per property"),
+    organization_id: Optional[uuid.UUID] = Query(None, description="Filter by organization (for multi-tenant)"),
+    limit: int = Query(20, ge=1, le=100, description="Number of results per page"),
+    offset: int = Query(0, ge=0, description="Offset for pagination"),
+    session: Session = Depends(get_session)
+):
+    """
+    Flexible-date search: cheapest stays of a given length within a date range.
+    
+    Example: any weekend in March →
+    ``earliest_check_in=2026-03-01&latest_check_in=2026-03-31&nights=2&weekdays=4``.
+    """
+    
+    if latest_check_in < earliest_check_in:
+        raise HTTPException(
+            status_code=400,
+            detail="Latest check-in must not be before earliest check-in"
+        )
+    if (latest_check_in - earliest_check_in).days > 62:
+        raise HTTPException(
+            status_code=400,
+            detail="Flexible date range cannot exceed 62 days"
+        )
+    if earliest_check_in < date.today():
+        raise HTTPException(
+            status_code=400,
+            detail="Check-in date cannot be in the past"
+        )
+    
+    check_in_weekdays = None
+    if weekdays:
+        try:
+            check_in_weekdays = [int(day) for day in weekdays.split(",") if day.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="weekdays must be integers 0-6") from None
+        if any(day < 0 or day > 6 for day in check_in_weekdays):
+            raise HTTPException(status_code=400, detail="weekdays must be integers 0-6")
+    
+    search_service = SearchService(session)
+    
+    return search_service.search_flexible_dates(
+        earliest_check_in=earliest_check_in,
+        latest_check_in=latest_check_in,
+        nights=nights,
+        city=city,
+        guests=guests,
+        property_type=property_type,
+        organization_id=organization_id,
+        check_in_weekdays=check_in_weekdays,
+        windows_per_property=windows_per_property,
+        limit=limit,
         offset=offset
     )
 
 
+@router.get("/multi-room", response_model=Dict[str, Any])
+def search_multi_room(
+    check_in: date = Query(..., description="Check-in date (YYYY-MM-DD)"),
+    check_out: date = Query(..., description="Check-out date (YYYY-MM-DD)"),
+    rooms: int = Query(1, ge=1, le=10, description="Number of rooms"),
+    guests: Optional[int] = Query(None, ge=1, le=40, description="Total number of guests across all rooms"),
+    occupancy: Optional[str] = Query(None, description="Guests per room, comma separated (e.g. 2,2,3); overrides rooms/guests"),
+    city: Optional[str] = Query(None, description="City to search in"),
+    property_type: Optional[str] = Query(None, description="Type of property (HOTEL, APARTMENT, etc.)"),
+    organization_id: Optional[uuid.UUID] = Query(None, description="Filter by organization (for multi-tenant)"),
+    limit: int = Query(20, ge=1, le=100, description="Number of results per page"),
+    offset: int = Query(0, ge=0, description="Offset for pagination"),
+    session: Session = Depends(get_session)
+):
+    """
+    Search for several rooms at once, e.g. 3 rooms for 7 adults.
+    
+    Each property returns its cheapest room combination with enough
+    inventory for the stay.
+    """
+    
+    if check_in >= check_out:
+        raise HTTPException(
+            status_code=400,
+            detail="Check-in date must be before check-out date"
+        )
+    if check_in < date.today():
+        raise HTTPException(
+            status_code=400,
+            detail="Check-in date cannot be in the past"
+        )
+    
+    occupancies = None
+    if occupancy:
+        try:
+            occupancies = [int(guests_in_room) for guests_in_room in occupancy.split(",") if guests_in_room.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="occupancy must be a list of integers") from None
+        if not occupancies or len(occupancies) > 10 or any(n < 1 or n > 10 for n in occupancies):
+            raise HTTPException(status_code=400, detail="occupancy must list 1-10 rooms of 1-10 guests")
+    elif guests is None:
+        guests = rooms * 2
+    elif guests > rooms * 10:
+        raise HTTPException(status_code=400, detail="Too many guests for the number of rooms")
+    
+    search_service = SearchService(session)
+    
+    return search_service.search_multi_room(
+        check_in=check_in,
+        check_out=check_out,
+        rooms=rooms,
+        guests=guests,
+        occupancies=occupancies,
+        city=city,
+        property_type=property_type,
+        organization_id=organization_id,
+        limit=limit,
+        offset=offset
+    )
+
+
+@router.get("/nearby", response_model=Dict[str, Any])
+def search_nearby(
+    latitude: float = Query(..., ge=-90, le=90, description="Latitude of the search center"),
+    longitude: float = Query(..., ge=-180, le=180, description="Longitude of the search center"),
+    radius_km: float = Query(10, gt=0, le=500, description="Search radius in kilometres"),
+    check_in: Optional[date] = Query(None, description="Check-in date (YYYY-MM-DD)"),
+    check_out: Optional[date] = Query(None, description="Check-out date (YYYY-MM-DD)"),
+    guests: int = Query(2, ge=1, le=10, description="Number of guests"),
+    property_type: Optional[str] = Query(None, description="Type of property (HOTEL, APARTMENT, etc.)"),
+    organization_id: Optional[uuid.UUID] = Query(None, description="Filter by organization (for multi-tenant)"),
+    limit: int = Query(20, ge=1, le=100, description="Number of results"),
+    session: Session = Depends(get_session)
+):
+    """
+    Search for properties within a radius of a point.
+    
+    Results are ordered by distance and include ``distance_km``.
+    """
+    
+    if check_in and check_out and check_in >= check_out:
+        raise HTTPException(
+            status_code=400,
+            detail="Check-in date must be before check-out date"
+        )
+    
+    search_service = SearchService(session)
+    
+    return search_service.search_nearby(
+        latitude=latitude,
+        longitude=longitude,
+        radius_km=radius_km,
+        check_in=check_in,
+        check_out=check_out,
+        guests=guests,
+        property_type=property_type,
+        organization_id=organization_id,
+        limit=limit
+    )
+
+
+@router.get("/map", response_model=Dict[str, Any])
+def search_map_viewport(
+    south: float = Query(..., ge=-90, le=90, description="Southern latitude of the viewport"),
+    west: float = Query(..., ge=-180, le=180, description="Western longitude of the viewport"),
+    north: float = Query(..., ge=-90, le=90, description="Northern latitude of the viewport"),
+    east: float = Query(..., ge=-180, le=180, description="Eastern longitude of the viewport"),
+    property_type: Optional[str] = Query(None, description="Type of property (HOTEL, APARTMENT, etc.)"),
+    organization_id: Optional[uuid.UUID] = Query(None, description="Filter by organization (for multi-tenant)"),
+    limit: int = Query(200, ge=1, le=1000, description="Maximum number of markers"),
+    session: Session = Depends(get_session)
+):
+    """
+    List properties inside a map viewport for map-based search.
+    
+    A viewport with ``west > east`` crosses the antimeridian.
+    """
+    
+    if south > north:
+        raise HTTPException(
+            status_code=400,
+            detail="South latitude must not be greater than north latitude"
+        )
+    
+    search_service = SearchService(session)
+    
+    return search_service.search_in_bounds(
+        south=south,
+        west=west,
+        north=north,
+        east=east,
+        property_type=property_type,
+        organization_id=organization_id,
+        limit=limit
+    )
+
+
 @router.get("/properties/{property_id}", response_model=Dict[str, Any])
 def get_property_details(
     property_id: uuid.UUID,
@@ -206,6 +536,25 @@ def get_popular_cities(
     ]
 
 
+@router.get("/autocomplete")
+def autocomplete_destinations(
+    q: str = Query(..., min_length=1, max_length=100, description="Destination prefix typed by the user"),
+    limit: int = Query(10, ge=1, le=50),
+    session: Session = Depends(get_session)
+):
+    """
+    Autocomplete cities and locations by prefix.
+    
+    Served from the Redis destination index; matching is case- and
+    accent-insensitive on any word of the destination name.  If Redis is
+    down, cities are matched in the database instead.
+    """
+    
+    from app.services.destination_index import autocomplete_destinations as lookup
+    
+    return {"query": q, "suggestions": lookup(q, limit=limit, session=session)}
+
+
 @router.get("/property-types")
 def get_property_types(
     session: Session = Depends(get_session)
@@ -12,10 +12,11 @@ from typing import List, Optional
 from datetime import datetime, date, timedelta
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
 from sqlmodel import Session, select, and_, or_, func
 
 from app.core.database import get_session
+from app.utils.concurrency import check_version, conflict_on_stale, parse_if_match
 from app.utils.dependencies import get_current_staff, get_organization_context
 from app.models.booking import Booking
 from app.models.user import User
@@ -26,6 +27,7 @@ from app.models.customer_profile import ReviewStatus
 from app.models.chat_message import ChatMessage
 from app.schemas.booking import BookingOut, BookingUpdate
 from app.schemas.customer import PropertyReviewOut
+from app.services.booking_service import BookingService
 from app.utils.enums import BookingStatus, UserRole
 
 router = APIRouter(prefix="/staff", tags=["staff"])
@@ -193,18 +195,24 @@ def list_all_bookings(
 def modify_booking(
     booking_id: uuid.UUID,
     payload: BookingUpdate,
+    if_match: Optional[str] = Header(None, alias="If-Match"),
     session: Session = Depends(get_session),
     current_staff: User = Depends(get_current_staff),
     org_context: dict = Depends(get_organization_context)
 ):
-    """Update a booking (staff/admin only)."""
+    """
+    Update a booking (staff/admin only).
+    
+    Optimistic concurrency: the update only applies if the booking still has
+    the version that was read (and the ``If-Match`` version, if sent), so two
+    staff members editing the same booking get a 409 instead of overwriting
+    each other.
+    """
     org_id = org_context["organization"].id
     
     # Verify booking belongs to organization
     booking = session.exec(
-        select(Booking).join(Room, Booking.room_id == Room.id).join(
-            Property, Room.property_id == Property.id
-        ).where(
+        select(Booking).join(Property, Booking.property_id == Property.id).where(
             and_(
                 Booking.id == booking_id,
                 Property.organization_id == org_id
@@ -218,13 +226,24 @@ def modify_booking(
             detail="Booking not found or doesn't belong to your organization"
         )
     
-    # Update booking
-    update_data = payload.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(booking, field, value)
+    check_version(booking, parse_if_match(if_match))
     
-    session.add(booking)
-    session.commit()
+    # Update booking; date changes only touch the nights added or removed
+    update_data = payload.model_dump(exclude_unset=True)
+    check_in = update_data.pop("check_in", booking.check_in)
+    check_out = update_data.pop("check_out", booking.check_out)
+    
+    with conflict_on_stale(session, "Booking"):
+        try:
+            if check_in != booking.check_in or check_out != booking.check_out:
+                BookingService(session).apply_date_change(booking, check_in, check_out)
+            for field, value in update_data.items():
+                setattr(booking, field, value)
+            session.add(booking)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
     session.refresh(booking)
     
     return booking
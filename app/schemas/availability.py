@@ -0,0 +1,39 @@
+from __future__ import annotations
+import uuid
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class QuoteRequest(BaseModel):
+    property_id: uuid.UUID
+    room_type_id: uuid.UUID
+    rate_plan_id: uuid.UUID
+    check_in: date
+    check_out: date
+    num_rooms: int = Field(default=1, ge=1)
+
+
+class QuoteResponse(BaseModel):
+    available: bool
+    remaining_rooms: int
+    total_price: float
+    currency: str
+
+
+class BatchQuoteRequest(BaseModel):
+    quotes: List[QuoteRequest] = Field(..., min_length=1, max_length=100)
+
+
+class BatchQuoteItem(QuoteResponse):
+    room_type_id: uuid.UUID
+    rate_plan_id: uuid.UUID
+    check_in: date
+    check_out: date
+    num_rooms: int
+    error: Optional[str] = None  # lý do không báo giá được (404/400 khi gọi đơn lẻ)
+
+
+class BatchQuoteResponse(BaseModel):
+    quotes: List[BatchQuoteItem]
@@ -3,7 +3,7 @@ import uuid
 from datetime import date, datetime
 from typing import Optional, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from app.utils.enums import BookingStatus
 
 
@@ -38,12 +38,28 @@ class BookingUpdate(BaseModel):
     guest_phone: Optional[str] = None
 
 
+class GroupBookingLine(BaseModel):
+    room_type_id: uuid.UUID
+    rate_plan_id: uuid.UUID
+    check_in: date
+    check_out: date
+    rooms: int = Field(default=1, ge=1, le=50)
+    guests: int = Field(default=2, ge=1)  # khách mỗi phòng
+
+
+class GroupBookingRequest(BaseModel):
+    lines: List[GroupBookingLine] = Field(..., min_length=1, max_length=100)
+    special_requests: Optional[str] = None
+    allow_partial: bool = False  # đặt các dòng hợp lệ dù có dòng lỗi
+
+
 class BookingResponse(BookingBase):
     id: uuid.UUID
     user_id: Optional[uuid.UUID]
     property_id: uuid.UUID
     room_type_id: uuid.UUID
     hold_until: Optional[datetime]
+    version: int = 1  # gửi lại trong If-Match khi cập nhật
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,56 @@
+from __future__ import annotations
+import uuid
+from datetime import date, datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.utils.enums import PricingRuleType
+
+
+class PricingRuleBase(BaseModel):
+    name: str
+    rule_type: PricingRuleType
+    adjustment_percent: float = Field(..., gt=-100)
+
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    weekdays: Optional[List[int]] = None  # 0 = thứ Hai ... 6 = Chủ nhật
+
+    min_nights: Optional[int] = None
+    max_nights: Optional[int] = None
+    min_days_before_checkin: Optional[int] = None
+    max_days_before_checkin: Optional[int] = None
+
+    applies_to_rate_plans: bool = True
+    is_active: bool = True
+
+
+class PricingRuleCreate(PricingRuleBase):
+    property_id: uuid.UUID
+    rate_plan_id: Optional[uuid.UUID] = None
+
+
+class PricingRuleUpdate(BaseModel):
+    name: Optional[str] = None
+    adjustment_percent: Optional[float] = Field(default=None, gt=-100)
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    weekdays: Optional[List[int]] = None
+    min_nights: Optional[int] = None
+    max_nights: Optional[int] = None
+    min_days_before_checkin: Optional[int] = None
+    max_days_before_checkin: Optional[int] = None
+    applies_to_rate_plans: Optional[bool] = None
+    is_active: Optional[bool] = None
+
+
+class PricingRuleResponse(PricingRuleBase):
+    id: uuid.UUID
+    property_id: uuid.UUID
+    rate_plan_id: Optional[uuid.UUID]
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
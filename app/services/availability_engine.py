@@ -0,0 +1,289 @@
+"""
+Set-based availability engine for hotel search.
+
+The engine answers "how many rooms of each room type are sellable for
+this stay, and what does it cost" for many room types at once.  Instead
+of issuing count, booking-overlap, inventory and rate-plan queries per
+room type, every lookup is a single grouped query over all candidate
+room types, so the number of round trips is fixed regardless of how many
+properties or room types are on the page.
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections import defaultdict
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+from sqlmodel import Session, and_, func, select
+
+from app.models.booking import ACTIVE_BOOKING_STATUSES, Booking, overlaps_stay
+from app.models.inventory import Inventory
+from app.models.rate_plan import RatePlan
+from app.models.room import Room
+from app.services.pricing_engine import PriceCalendar, PricingEngine
+
+# Availability reported when a room type has no inventory rows for the stay
+UNRESTRICTED_INVENTORY = 999
+
+
+class AvailabilityEngine:
+    """Batched availability and pricing lookups for many room types."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def evaluate(
+        self,
+        room_type_ids: Iterable[uuid.UUID],
+        check_in: Optional[date] = None,
+        check_out: Optional[date] = None,
+    ) -> Dict[uuid.UUID, Dict[str, Any]]:
+        """
+        Compute availability and pricing for every room type in one pass.
+
+        Returns a mapping of room type id to a dict with ``available_count``
+        and ``pricing`` (same shape as ``SearchService.calculate_room_type_pricing``).
+        """
+        room_type_ids = list(dict.fromkeys(room_type_ids))
+        if not room_type_ids:
+            return {}
+
+        if check_in and check_out and (check_out - check_in).days <= 0:
+            raise HTTPException(status_code=400, detail="Invalid date range")
+
+        total_rooms = self.total_rooms(room_type_ids)
+        if check_in and check_out:
+            booked = self.booked_rooms(room_type_ids, check_in, check_out)
+            inventory = self.inventory_minimums(room_type_ids, check_in, check_out)
+        else:
+            booked, inventory = {}, {}
+
+        rate_plans = self.rate_plans(room_type_ids)
+        default_plans = {rt_id: plans[0] for rt_id, plans in rate_plans.items() if plans}
+        calendars: Dict[uuid.UUID, PriceCalendar] = {}
+        if check_in and check_out:
+            calendars = PricingEngine(self.session).calendars(
+                default_plans.values(), check_in, check_out
+            )
+
+        results: Dict[uuid.UUID, Dict[str, Any]] = {}
+        for rt_id in room_type_ids:
+            rooms = total_rooms.get(rt_id, 0)
+            if check_in and check_out:
+                available_count = min(
+                    rooms - booked.get(rt_id, 0),
+                    inventory.get(rt_id, UNRESTRICTED_INVENTORY),
+                )
+            else:
+                available_count = rooms
+
+            results[rt_id] = {
+                "available_count": available_count,
+                "pricing": self._price_stay(
+                    rate_plans.get(rt_id, []),
+                    calendars.get(default_plans[rt_id].id) if rt_id in default_plans else None,
+                    check_in,
+                    check_out,
+                ),
+            }
+        return results
+
+    # ------------------------------------------------------------------
+    # Grouped lookups
+    # ------------------------------------------------------------------
+
+    def total_rooms(self, room_type_ids: List[uuid.UUID]) -> Dict[uuid.UUID, int]:
+        """Active room count per room type."""
+        rows = self.session.exec(
+            select(Room.room_type_id, func.count(Room.id))
+            .where(
+                and_(
+                    Room.room_type_id.in_(room_type_ids),
+                    Room.is_active == True,
+                )
+            )
+            .group_by(Room.room_type_id)
+        ).all()
+        return {rt_id: count for rt_id, count in rows}
+
+    def booked_rooms(
+        self,
+        room_type_ids: List[uuid.UUID],
+        check_in: date,
+        check_out: date,
+    ) -> Dict[uuid.UUID, int]:
+        """Rooms held by active bookings overlapping the stay, per room type."""
+        rows = self.session.exec(
+            select(Booking.room_type_id, func.coalesce(func.sum(Booking.rooms_count), 0))
+            .where(
+                and_(
+                    Booking.room_type_id.in_(room_type_ids),
+                    Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+                    overlaps_stay(check_in, check_out)
+                )
+            )
+            .group_by(Booking.room_type_id)
+        ).all()
+        return {rt_id: int(count) for rt_id, count in rows}
+
+    def inventory_minimums(
+        self,
+        room_type_ids: List[uuid.UUID],
+        check_in: date,
+        check_out: date,
+    ) -> Dict[uuid.UUID, int]:
+        """
+        Lowest ``available_rooms`` across the stay, per room type.
+
+        Room types without inventory rows are absent from the result and
+        should be treated as unrestricted.
+        """
+        rows = self.session.exec(
+            select(Inventory.room_type_id, func.min(Inventory.available_rooms))
+            .where(
+                and_(
+                    Inventory.room_type_id.in_(room_type_ids),
+                    Inventory.date >= check_in,
+                    Inventory.date < check_out
+                )
+            )
+            .group_by(Inventory.room_type_id)
+        ).all()
+        return {rt_id: minimum for rt_id, minimum in rows}
+
+    def rate_plans(self, room_type_ids: List[uuid.UUID]) -> Dict[uuid.UUID, List[RatePlan]]:
+        """Rate plans grouped by room type, in query order."""
+        plans: Dict[uuid.UUID, List[RatePlan]] = defaultdict(list)
+        for plan in self.session.exec(
+            select(RatePlan).where(RatePlan.room_type_id.in_(room_type_ids))
+        ).all():
+            plans[plan.room_type_id].append(plan)
+        return plans
+
+    # ------------------------------------------------------------------
+    # Per-night calendars
+    # ------------------------------------------------------------------
+
+    def nightly_availability(
+        self,
+        room_type_ids: List[uuid.UUID],
+        start: date,
+        end: date,
+    ) -> Dict[uuid.UUID, List[int]]:
+        """
+        Sellable rooms for each night in ``[start, end)``, per room type.
+
+        Bookings are folded into a difference array, so the cost is one
+        query for bookings and one for inventory regardless of span.
+        """
+        nights = (end - start).days
+        total_rooms = self.total_rooms(room_type_ids)
+        booked = {rt_id: [0] * (nights + 1) for rt_id in room_type_ids}
+        caps: Dict[uuid.UUID, List[int]] = {
+            rt_id: [UNRESTRICTED_INVENTORY] * nights for rt_id in room_type_ids
+        }
+
+        for rt_id, stay_start, stay_end, rooms_count in self.session.exec(
+            select(Booking.room_type_id, Booking.check_in, Booking.check_out, Booking.rooms_count)
+            .where(
+                and_(
+                    Booking.room_type_id.in_(room_type_ids),
+                    Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+                    overlaps_stay(start, end)
+                )
+            )
+        ).all():
+            diff = booked[rt_id]
+            diff[max((stay_start - start).days, 0)] += rooms_count or 1
+            diff[min((stay_end - start).days, nights)] -= rooms_count or 1
+
+        for rt_id, night, available_rooms in self.session.exec(
+            select(Inventory.room_type_id, Inventory.date, Inventory.available_rooms)
+            .where(
+                and_(
+                    Inventory.room_type_id.in_(room_type_ids),
+                    Inventory.date >= start,
+                    Inventory.date < end
+                )
+            )
+        ).all():
+            caps[rt_id][(night - start).days] = available_rooms
+
+        calendars: Dict[uuid.UUID, List[int]] = {}
+        for rt_id in room_type_ids:
+            rooms = total_rooms.get(rt_id, 0)
+            running = 0
+            calendar = []
+            for i in range(nights):
+                running += booked[rt_id][i]
+                calendar.append(min(rooms - running, caps[rt_id][i]))
+            calendars[rt_id] = calendar
+        return calendars
+
+    def nightly_prices(
+        self,
+        rate_plans: List[RatePlan],
+        start: date,
+        end: date,
+    ) -> Dict[uuid.UUID, PriceCalendar]:
+        """Price calendar of each rate plan over ``[start, end)`` (see ``PricingEngine``)."""
+        return PricingEngine(self.session).calendars(rate_plans, start, end)
+
+    # ------------------------------------------------------------------
+    # Pricing
+    # ------------------------------------------------------------------
+
+    def _price_stay(
+        self,
+        rate_plans: List[RatePlan],
+        calendar: Optional[PriceCalendar],
+        check_in: Optional[date],
+        check_out: Optional[date],
+    ) -> Dict[str, Any]:
+        """Price a stay on the room type's default (first) rate plan."""
+        if not rate_plans:
+            return {
+                "total_price": 0.0,
+                "avg_price_per_night": 0.0,
+                "currency": "USD",
+                "nights": 0,
+                "rate_plans": []
+            }
+
+        default_rate_plan = rate_plans[0]
+        base_price = float(default_rate_plan.base_price)
+
+        if not check_in or not check_out:
+            return {
+                "total_price": base_price,
+                "avg_price_per_night": base_price,
+                "currency": default_rate_plan.currency,
+                "nights": 1,
+                "rate_plans": [format_rate_plan(default_rate_plan)]
+            }
+
+        nights = (check_out - check_in).days
+        total_price = calendar.total(check_in, check_out)
+
+        return {
+            "total_price": total_price,
+            "avg_price_per_night": total_price / nights,
+            "currency": default_rate_plan.currency,
+            "nights": nights,
+            "rate_plans": [format_rate_plan(rp) for rp in rate_plans]
+        }
+
+
+def format_rate_plan(rate_plan: RatePlan) -> Dict[str, Any]:
+    """Format rate plan for API response."""
+    return {
+        "id": rate_plan.id,
+        "name": rate_plan.name,
+        "base_price": float(rate_plan.base_price),
+        "currency": rate_plan.currency,
+        "is_refundable": not rate_plan.non_refundable,
+        "cancellation_policy_id": rate_plan.cancellation_policy_id
+    }
@@ -0,0 +1,293 @@
+"""
+Maintenance of the per-room-type, per-night availability summary.
+
+``RoomTypeDailySummary`` holds, for every room type and night in the
+booking horizon, the sellable room count, the lowest and highest nightly
+rate across its rate plans and the room type's max occupancy.  Search
+uses it to push price and occupancy filters into SQL before pagination.
+
+Rows are recomputed with :class:`AvailabilityEngine` calendars and
+written with a bulk upsert.  Room types touched by a committed write are
+queued in a Redis set (see :mod:`app.services.change_tracking`) and
+refreshed by a frequent Celery job; a nightly job rebuilds everything and
+records how far the summary is built.
+
+Search only trusts the summary up to that date, and never filters out a
+property whose room types are still queued or being refreshed, so a fresh
+deploy or a just-created room type cannot hide properties.
+"""
+
+from __future__ import annotations
+
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+import redis
+from sqlmodel import Session, and_, func, or_, select
+
+from app.core.logger import logger
+from app.core.redis import redis_main
+from app.models.availability_summary import RoomTypeDailySummary
+from app.models.room_type import RoomType
+from app.services.availability_engine import AvailabilityEngine
+from app.services.change_tracking import on_availability_change
+from app.services.pricing_engine import PriceCalendar
+from app.services.search_cache import SUMMARY_SCOPE, invalidate_scopes
+
+SUMMARY_HORIZON_DAYS = 365
+SUMMARY_DIRTY_KEY = "availability_summary:dirty"
+SUMMARY_REFRESHING_KEY = "availability_summary:refreshing"
+SUMMARY_BUILT_KEY = "availability_summary:built_through"
+REFRESH_BATCH_SIZE = 50  # room types per refresh round
+UPSERT_BATCH_SIZE = 1000
+
+
+def summary_built_through() -> Optional[date]:
+    """End (exclusive) of the nights built by the latest full rebuild, ``None`` if never built."""
+    try:
+        value = redis_main.get(SUMMARY_BUILT_KEY)
+    except redis.RedisError as exc:
+        logger.warning(f"Availability summary marker read failed: {exc}")
+        return None
+    return date.fromisoformat(value) if value else None
+
+
+def summary_covers(check_in: date, check_out: date) -> bool:
+    """Whether a stay lies inside the range built by the summary jobs."""
+    built_through = summary_built_through()
+    return (
+        built_through is not None
+        and check_in >= date.today()
+        and check_out <= built_through
+    )
+
+
+def pending_room_type_ids() -> Optional[Set[uuid.UUID]]:
+    """Room types whose summary rows are queued or being refreshed (``None`` if unknown)."""
+    try:
+        members = redis_main.sunion(SUMMARY_DIRTY_KEY, SUMMARY_REFRESHING_KEY)
+    except redis.RedisError as exc:
+        logger.warning(f"Availability summary queue read failed: {exc}")
+        return None
+    return {uuid.UUID(rt_id) for rt_id in members}
+
+
+def eligible_property_ids_query(
+    check_in: date,
+    check_out: date,
+    guests: int,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+):
+    """
+    Subquery of properties with a room type that can match a search.
+
+    A room type qualifies when it has a summary row with free rooms for
+    every night, fits ``guests``, and its total stay price can fall in
+    the requested range.  Summed per-night minimum/maximum rates (pricing
+    rules included, see :func:`nightly_rate_bounds`) bound the price of
+    any single rate plan, so this never drops a property the exact
+    pricing would keep.
+    """
+    nights = (check_out - check_in).days
+    query = (
+        select(RoomTypeDailySummary.property_id)
+        .where(
+            and_(
+                RoomTypeDailySummary.date >= check_in,
+                RoomTypeDailySummary.date < check_out,
+                RoomTypeDailySummary.available_rooms > 0,
+                RoomTypeDailySummary.max_occupancy >= guests
+            )
+        )
+        .group_by(RoomTypeDailySummary.property_id, RoomTypeDailySummary.room_type_id)
+        .having(func.count() == nights)
+    )
+    if min_price:
+        query = query.having(func.sum(RoomTypeDailySummary.max_nightly_rate) >= min_price)
+    if max_price:
+        query = query.having(func.sum(RoomTypeDailySummary.min_nightly_rate) <= max_price)
+    return query
+
+
+def summary_prefilter(
+    property_id_column,
+    check_in: date,
+    check_out: date,
+    guests: int,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+):
+    """
+    WHERE clause keeping properties that may match a search, or ``None``.
+
+    ``None`` means the summary cannot be trusted for this stay (not built
+    through ``check_out`` yet, or Redis unavailable) and no prefilter
+    should be applied.  Properties with queued room types are always kept.
+    """
+    if not summary_covers(check_in, check_out):
+        return None
+    pending = pending_room_type_ids()
+    if pending is None:
+        return None
+    eligible = property_id_column.in_(
+        eligible_property_ids_query(check_in, check_out, guests, min_price, max_price)
+    )
+    if not pending:
+        return eligible
+    return or_(
+        eligible,
+        property_id_column.in_(
+            select(RoomType.property_id).where(RoomType.id.in_(pending))
+        )
+    )
+
+
+def nightly_rate_bounds(
+    calendars: List[PriceCalendar],
+    start: date,
+    end: date,
+) -> List[Tuple[float, float]]:
+    """
+    Lowest and highest price of each night of ``[start, end)`` over rate plans.
+
+    Pricing rules are included: each plan's base price is widened by the
+    lowest and highest multiplier the night can get (see
+    ``RuleIndex.night_bounds``), so summed bounds contain every stay price.
+    Room types without a rate plan price at 0.0, as in AvailabilityEngine.
+    """
+    nights = max((end - start).days, 0)
+    if not calendars:
+        return [(0.0, 0.0)] * nights
+    lows = [float("inf")] * nights
+    highs = [float("-inf")] * nights
+    for calendar in calendars:
+        offset = (start - calendar.start).days
+        if calendar.rules:
+            low_factors, high_factors = calendar.rules.night_bounds(start, end)
+        else:
+            low_factors = high_factors = [1.0] * nights
+        for i in range(nights):
+            price = calendar.prices[offset + i]
+            lows[i] = min(lows[i], price * low_factors[i])
+            highs[i] = max(highs[i], price * high_factors[i])
+    return list(zip(lows, highs))
+
+
+def refresh_room_types(
+    session: Session,
+    room_type_ids: Iterable[uuid.UUID],
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> int:
+    """Recompute and upsert summary rows for room types over ``[start, end)``."""
+    start = start or date.today()
+    end = end or start + timedelta(days=SUMMARY_HORIZON_DAYS)
+    room_types = session.exec(
+        select(RoomType).where(RoomType.id.in_(list(room_type_ids)))
+    ).all()
+    if not room_types:
+        return 0
+
+    ids = [room_type.id for room_type in room_types]
+    engine = AvailabilityEngine(session)
+    availability = engine.nightly_availability(ids, start, end)
+    rate_plans = engine.rate_plans(ids)
+    prices = engine.nightly_prices(
+        [plan for plans in rate_plans.values() for plan in plans], start, end
+    )
+
+    now = datetime.utcnow()
+    rows: List[Dict] = []
+    for room_type in room_types:
+        rate_bounds = nightly_rate_bounds(
+            [prices[plan.id] for plan in rate_plans.get(room_type.id, [])], start, end
+        )
+        for i, available_rooms in enumerate(availability[room_type.id]):
+            rows.append({
+                "room_type_id": room_type.id,
+                "date": start + timedelta(days=i),
+                "property_id": room_type.property_id,
+                "available_rooms": available_rooms if room_type.is_active else 0,
+                "min_nightly_rate": rate_bounds[i][0],
+                "max_nightly_rate": rate_bounds[i][1],
+                "max_occupancy": room_type.max_occupancy,
+                "updated_at": now,
+            })
+
+    for offset in range(0, len(rows), UPSERT_BATCH_SIZE):
+        statement = pg_insert(RoomTypeDailySummary).values(rows[offset:offset + UPSERT_BATCH_SIZE])
+        session.exec(
+            statement.on_conflict_do_update(
+                index_elements=["room_type_id", "date"],
+                set_={
+                    column: statement.excluded[column]
+                    for column in (
+                        "property_id",
+                        "available_rooms",
+                        "min_nightly_rate",
+                        "max_nightly_rate",
+                        "max_occupancy",
+                        "updated_at",
+                    )
+                },
+            )
+        )
+    # Drop nights that slid out of the horizon
+    session.exec(
+        RoomTypeDailySummary.__table__.delete().where(
+            and_(
+                RoomTypeDailySummary.room_type_id.in_(ids),
+                RoomTypeDailySummary.date < start
+            )
+        )
+    )
+    session.commit()
+    # Searches narrowed with the old rows may have left out properties
+    invalidate_scopes([SUMMARY_SCOPE])
+    return len(rows)
+
+
+def refresh_dirty_room_types(session: Session) -> int:
+    """
+    Refresh every room type queued by recent writes; returns room types refreshed.
+
+    A batch stays in ``SUMMARY_REFRESHING_KEY`` until its rows are
+    committed, so search keeps those room types' properties meanwhile.
+    Batches left there by a crashed run are queued again first.
+    """
+    redis_main.sunionstore(SUMMARY_DIRTY_KEY, [SUMMARY_DIRTY_KEY, SUMMARY_REFRESHING_KEY])
+    refreshed = 0
+    while True:
+        batch = redis_main.spop(SUMMARY_DIRTY_KEY, REFRESH_BATCH_SIZE)
+        if not batch:
+            return refreshed
+        redis_main.sadd(SUMMARY_REFRESHING_KEY, *batch)
+        refresh_room_types(session, [uuid.UUID(rt_id) for rt_id in batch])
+        redis_main.srem(SUMMARY_REFRESHING_KEY, *batch)
+        refreshed += len(batch)
+
+
+def rebuild_summary(session: Session) -> int:
+    """
+    Recompute the summary for all room types; returns room types processed.
+
+    Afterwards records the end of the nights covered, which gates the search
+    prefilter (see :func:`summary_covers`).
+    """
+    start = date.today()
+    end = start + timedelta(days=SUMMARY_HORIZON_DAYS)
+    room_type_ids = session.exec(select(RoomType.id)).all()
+    for offset in range(0, len(room_type_ids), REFRESH_BATCH_SIZE):
+        refresh_room_types(session, room_type_ids[offset:offset + REFRESH_BATCH_SIZE], start, end)
+    redis_main.set(SUMMARY_BUILT_KEY, end.isoformat())
+    logger.info(f"Availability summary rebuilt for {len(room_type_ids)} room types")
+    return len(room_type_ids)
+
+
+@on_availability_change
+def _queue_changed_room_types(changes: Dict[str, Set[uuid.UUID]]) -> None:
+    if changes["room_type_ids"]:
+        redis_main.sadd(SUMMARY_DIRTY_KEY, *[str(rt_id) for rt_id in changes["room_type_ids"]])
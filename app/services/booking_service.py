@@ -7,25 +7,114 @@ advanced pricing, inventory management, and business rules.
 
 from __future__ import annotations
 
+import time
 import uuid
+from bisect import bisect_left
 from datetime import date, datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from decimal import Decimal
 from enum import Enum
 
+from sqlalchemy import Date, Integer, Uuid, column, exists, update, values
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select, and_, or_, func
 from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
 
-from app.models.booking import Booking, BookingStatus
+from app.models.booking import (
+    ACTIVE_BOOKING_STATUSES,
+    Booking,
+    BookingStatus,
+    is_overlap_violation,
+    overlaps_stay,
+)
 from app.models.room import Room
 from app.models.room_type import RoomType
 from app.models.rate_plan import RatePlan
-from app.models.daily_price import DailyPrice
 from app.models.inventory import Inventory
 from app.models.property import Property
 from app.models.user import User
 from app.models.organization import Organization
+from app.core.logger import logger
+from app.services.availability_engine import AvailabilityEngine
+from app.services.change_tracking import record_changes
+from app.services.hold_service import get_hold, held_rooms, release_hold
+from app.services.pricing_engine import PriceCalendar, PricingEngine
+from app.services.pricing_service import PricingService
+from app.utils.concurrency import check_version, conflict_on_stale
 from app.utils.helpers import nights_between
+from app.utils.money import Money, round_half_up
+
+
+# Days either side of a stay considered when scoring best-fit room assignment
+ASSIGNMENT_WINDOW_DAYS = 14
+
+# Bookings updated per transaction by auto_update_statuses
+STATUS_UPDATE_CHUNK_SIZE = 1000
+
+
+class RoomCalendar:
+    """
+    Bookings of one room indexed for overlap and neighbour lookups.
+    
+    Intervals are sorted by start with a running maximum of their ends,
+    so every lookup is a binary search (legacy overlapping bookings are
+    handled by the running maximum).
+    """
+    
+    def __init__(self, intervals: List[tuple]):
+        self.intervals = sorted(intervals)
+        self._index()
+    
+    def _index(self) -> None:
+        self.starts: List[date] = [start for start, _ in self.intervals]
+        self.max_ends: List[date] = []
+        for _, end in self.intervals:
+            self.max_ends.append(max(end, self.max_ends[-1]) if self.max_ends else end)
+    
+    def add(self, start: date, end: date) -> None:
+        """Record a new booking (e.g. one assigned earlier in the same request)."""
+        self.intervals.insert(bisect_left(self.intervals, (start, end)), (start, end))
+        self._index()
+    
+    def remove(self, start: date, end: date) -> None:
+        self.intervals.remove((start, end))
+        self._index()
+    
+    def is_free(self, start: date, end: date) -> bool:
+        """Whether ``[start, end)`` overlaps no booking."""
+        position = bisect_left(self.starts, end)
+        return position == 0 or self.max_ends[position - 1] <= start
+    
+    def gap_around(self, start: date, end: date, horizon: int) -> int:
+        """Free nights left before and after a free ``[start, end)``, each capped at ``horizon``."""
+        position = bisect_left(self.starts, end)
+        before = horizon
+        if position > 0:
+            before = min(horizon, (start - self.max_ends[position - 1]).days)
+        after = horizon
+        if position < len(self.starts):
+            after = min(horizon, (self.starts[position] - end).days)
+        return before + after
+
+
+def pick_room(
+    calendars: List[Tuple[Room, RoomCalendar]],
+    check_in: date,
+    check_out: date,
+    strategy: str = "best_fit"
+) -> Optional[Room]:
+    """Choose a free room for a stay from indexed room calendars (see ``find_available_room``)."""
+    best_room, best_gap = None, None
+    for room, calendar in calendars:
+        if not calendar.is_free(check_in, check_out):
+            continue
+        if strategy == "first_fit":
+            return room
+        gap = calendar.gap_around(check_in, check_out, ASSIGNMENT_WINDOW_DAYS)
+        if best_gap is None or gap < best_gap:
+            best_room, best_gap = room, gap
+    return best_room
 
 
 class BookingService:
@@ -43,7 +132,9 @@ class BookingService:
         check_out: date,
         guests: int = 2,
         special_requests: Optional[str] = None,
-        organization_id: Optional[uuid.UUID] = None
+        organization_id: Optional[uuid.UUID] = None,
+        hold_id: Optional[str] = None,
+        rooms: int = 1
     ) -> Booking:
         """
         Create a new booking with enhanced validation and pricing.
@@ -53,8 +144,29 @@ class BookingService:
         - Pricing calculation
         - Inventory management
         - Multi-tenant validation
+        
+        Rooms held by other guests (see :mod:`app.services.hold_service`)
+        are not sellable.  Pass ``hold_id`` to convert the caller's own
+        hold; it is released once the booking is committed.  ``rooms``
+        books several rooms of the type in one booking (``rooms_count``),
+        priced per room; it must match the hold's room count.
         """
         
+        hold = None
+        if hold_id:
+            hold = get_hold(hold_id)
+            if not hold:
+                raise HTTPException(status_code=410, detail="Hold has expired or does not exist")
+            if (
+                hold["room_type_id"] != str(room_type_id)
+                or hold["check_in"] != check_in.isoformat()
+                or hold["check_out"] != check_out.isoformat()
+                or hold["rooms"] != rooms
+            ):
+                raise HTTPException(status_code=400, detail="Booking does not match the hold")
+            if hold["user_id"] and hold["user_id"] != str(user_id):
+                raise HTTPException(status_code=403, detail="Hold belongs to another user")
+        
         # Validate dates
         if check_in >= check_out:
             raise HTTPException(
@@ -98,7 +210,9 @@ class BookingService:
             raise HTTPException(status_code=404, detail="Rate plan not found")
         
         # Check availability
-        if not self.check_room_type_availability(room_type_id, check_in, check_out):
+        if not self.check_room_type_availability(
+            room_type_id, check_in, check_out, exclude_hold=hold, rooms=rooms
+        ):
             raise HTTPException(
                 status_code=400,
                 detail="No rooms available for the selected dates"
@@ -115,7 +229,7 @@ class BookingService:
                 detail="No specific room available for assignment"
             )
         
-        # Create booking
+        # Create booking and claim inventory in the same transaction
         booking = Booking(
             user_id=user_id,
             room_id=available_room.id,
@@ -124,29 +238,444 @@ class BookingService:
             property_id=property.id,
             check_in=check_in,
             check_out=check_out,
-            total_amount=pricing["total_price"],
+            rooms_count=rooms,
+            total_price=pricing["total_price"] * rooms,
+            currency=pricing["currency"],
             status=BookingStatus.PENDING,
-            # Add additional fields for enhanced booking
-            guest_count=guests,
             special_requests=special_requests
         )
         
-        self.session.add(booking)
-        self.session.commit()
+        try:
+            self.reserve_inventory(room_type_id, check_in, check_out, rooms=rooms)
+            self.session.add(booking)
+            self.session.commit()
+        except IntegrityError as exc:
+            self.session.rollback()
+            if is_overlap_violation(exc):
+                # Another booking took the room concurrently
+                raise HTTPException(
+                    status_code=409,
+                    detail="Room is no longer available for the selected dates"
+                ) from None
+            raise
+        except Exception:
+            self.session.rollback()
+            raise
         self.session.refresh(booking)
         
-        # Update inventory if managed
-        self.update_inventory_on_booking(room_type_id, check_in, check_out, -1)
+        if hold_id:
+            release_hold(hold_id)
         
         return booking
     
+    def create_group_booking(
+        self,
+        user_id: uuid.UUID,
+        lines: List[Dict[str, Any]],
+        special_requests: Optional[str] = None,
+        organization_id: Optional[uuid.UUID] = None,
+        allow_partial: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Book many room type/date lines (e.g. a tour group) in one transaction.
+        
+        Each line has ``room_type_id``, ``rate_plan_id``, ``check_in``,
+        ``check_out``, ``rooms`` and optionally ``guests`` (per room).  Room
+        types, rate plans, availability calendars, prices and room
+        calendars are loaded once for all lines; inventory for every line
+        is claimed with one statement and everything is committed once, so
+        the query count does not grow with the number of lines.
+        
+        Lines that fail validation are reported per line.  Unless
+        ``allow_partial`` is set, any failed line aborts the whole group
+        with 409 and nothing is booked.
+        """
+        
+        if not lines:
+            raise HTTPException(status_code=400, detail="Group booking has no lines")
+        
+        today = date.today()
+        room_type_ids = list({line["room_type_id"] for line in lines})
+        room_types = {
+            room_type.id: room_type
+            for room_type in self.session.exec(
+                select(RoomType).where(RoomType.id.in_(room_type_ids))
+            ).all()
+        }
+        properties = {
+            property.id: property
+            for property in self.session.exec(
+                select(Property).where(
+                    Property.id.in_({room_type.property_id for room_type in room_types.values()})
+                )
+            ).all()
+        }
+        rate_plans = {
+            rate_plan.id: rate_plan
+            for rate_plan in self.session.exec(
+                select(RatePlan).where(RatePlan.id.in_({line["rate_plan_id"] for line in lines}))
+            ).all()
+        }
+        
+        span_start = min(line["check_in"] for line in lines)
+        span_end = max(line["check_out"] for line in lines)
+        engine = AvailabilityEngine(self.session)
+        sellable = engine.nightly_availability(room_type_ids, span_start, span_end)
+        prices = engine.nightly_prices(list(rate_plans.values()), span_start, span_end)
+        calendars = self.room_calendars(room_type_ids, span_start, span_end)
+        calendar_by_room = {
+            room.id: calendar
+            for entries in calendars.values()
+            for room, calendar in entries
+        }
+        
+        # Rooms taken by earlier lines of this group, per (room type, night)
+        demand: Dict[Tuple[uuid.UUID, date], int] = {}
+        results: List[Dict[str, Any]] = []
+        bookings: List[Booking] = []
+        
+        for index, line in enumerate(lines):
+            room_type_id = line["room_type_id"]
+            check_in, check_out = line["check_in"], line["check_out"]
+            rooms = line.get("rooms", 1)
+            result: Dict[str, Any] = {
+                "line": index,
+                "room_type_id": room_type_id,
+                "check_in": check_in,
+                "check_out": check_out,
+                "rooms": rooms
+            }
+            results.append(result)
+            
+            room_type = room_types.get(room_type_id)
+            property = properties.get(room_type.property_id) if room_type else None
+            rate_plan = rate_plans.get(line["rate_plan_id"])
+            error = None
+            if check_in >= check_out:
+                error = "Check-in date must be before check-out date"
+            elif check_in < today:
+                error = "Check-in date cannot be in the past"
+            elif not room_type or not room_type.is_active or not property or not property.is_active:
+                error = "Room type not found"
+            elif organization_id and property.organization_id != organization_id:
+                error = "Property does not belong to your organization"
+            elif not rate_plan or rate_plan.room_type_id != room_type_id:
+                error = "Rate plan not found"
+            elif line.get("guests", 1) > room_type.max_occupancy:
+                error = f"Room type can accommodate maximum {room_type.max_occupancy} guests"
+            if error:
+                result.update(status="failed", error=error)
+                continue
+            
+            first = (check_in - span_start).days
+            last = (check_out - span_start).days
+            held = held_rooms(room_type_id, check_in, check_out)
+            free = min(
+                sellable[room_type_id][night]
+                - demand.get((room_type_id, span_start + timedelta(days=night)), 0)
+                for night in range(first, last)
+            ) - held
+            
+            assigned: List[Room] = []
+            if free >= rooms:
+                for _ in range(rooms):
+                    room = pick_room(calendars.get(room_type_id, []), check_in, check_out)
+                    if not room:
+                        break
+                    assigned.append(room)
+                    calendar_by_room[room.id].add(check_in, check_out)
+            if len(assigned) < rooms:
+                # Give back rooms tentatively assigned to this line
+                for room in assigned:
+                    calendar_by_room[room.id].remove(check_in, check_out)
+                result.update(status="failed", error="Not enough rooms available for the selected dates")
+                continue
+            
+            for night in range(first, last):
+                key = (room_type_id, span_start + timedelta(days=night))
+                demand[key] = demand.get(key, 0) + rooms
+            
+            price_per_room = prices[rate_plan.id].total(check_in, check_out)
+            line_bookings = [
+                Booking(
+                    user_id=user_id,
+                    room_id=room.id,
+                    room_type_id=room_type_id,
+                    rate_plan_id=rate_plan.id,
+                    property_id=property.id,
+                    check_in=check_in,
+                    check_out=check_out,
+                    total_price=price_per_room,
+                    currency=rate_plan.currency,
+                    status=BookingStatus.PENDING,
+                    special_requests=special_requests
+                )
+                for room in assigned
+            ]
+            bookings.extend(line_bookings)
+            result.update(
+                status="reserved",
+                booking_ids=[booking.id for booking in line_bookings],
+                room_ids=[room.id for room in assigned],
+                price_per_room=price_per_room,
+                total_price=price_per_room * rooms,
+                currency=rate_plan.currency
+            )
+        
+        failed = [result for result in results if result["status"] == "failed"]
+        if failed and not allow_partial:
+            raise HTTPException(
+                status_code=409,
+                detail={
+                    "message": "Some lines of the group booking cannot be fulfilled",
+                    "lines": jsonable_encoder(failed)
+                }
+            )
+        
+        if bookings:
+            try:
+                self.reserve_inventory_bulk(demand)
+                self.session.add_all(bookings)
+                self.session.commit()
+            except IntegrityError as exc:
+                self.session.rollback()
+                if is_overlap_violation(exc):
+                    raise HTTPException(
+                        status_code=409,
+                        detail="Rooms are no longer available for the selected dates"
+                    ) from None
+                raise
+            except Exception:
+                self.session.rollback()
+                raise
+        
+        return {
+            "lines": results,
+            "booked_lines": len(results) - len(failed),
+            "failed_lines": len(failed),
+            "rooms": len(bookings),
+            "total_price": sum(result.get("total_price", 0.0) for result in results)
+        }
+    
+    def amend_booking(
+        self,
+        booking_id: uuid.UUID,
+        check_in: date,
+        check_out: date,
+        user_id: Optional[uuid.UUID] = None,
+        expected_version: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Change the dates of an active booking and commit.
+        
+        See :meth:`apply_date_change`.  ``user_id`` restricts the change to
+        the booking's owner; ``expected_version`` is checked as in
+        :meth:`cancel_booking`.
+        """
+        
+        booking = self.session.get(Booking, booking_id)
+        if not booking:
+            raise HTTPException(status_code=404, detail="Booking not found")
+        if user_id and booking.user_id != user_id:
+            raise HTTPException(status_code=403, detail="Not authorized to modify this booking")
+        check_version(booking, expected_version)
+        
+        with conflict_on_stale(self.session, "Booking"):
+            try:
+                delta = self.apply_date_change(booking, check_in, check_out)
+                self.session.commit()
+            except IntegrityError as exc:
+                self.session.rollback()
+                if is_overlap_violation(exc):
+                    raise HTTPException(
+                        status_code=409,
+                        detail="Room is no longer available for the selected dates"
+                    ) from None
+                raise
+            except Exception:
+                self.session.rollback()
+                raise
+        self.session.refresh(booking)
+        return {"booking": booking, **delta}
+    
+    def apply_date_change(self, booking: Booking, check_in: date, check_out: date) -> Dict[str, Any]:
+        """
+        Move ``booking`` to ``[check_in, check_out)`` in the caller's transaction.
+        
+        Only the symmetric difference of the old and new nights is touched,
+        so the work is proportional to the nights that change rather than
+        the length of the stay:
+        
+        - added nights are checked for the assigned room, the room type's
+          availability and holds;
+        - inventory for added and removed nights is claimed and released
+          with one statement (:meth:`reserve_inventory_bulk`);
+        - removed nights are credited pro rata at the booked total, and
+          added nights charged at current rates (pricing rules included,
+          plus fees and taxes for bookings priced without a rate plan).
+        
+        If the change alters which length-of-stay or lead-time rules the
+        stay meets, the whole stay is repriced at current rates instead.
+        
+        The booking row itself is a versioned (compare-and-swap) update.
+        Returns the nights added and removed and the price difference.
+        """
+        
+        if check_in >= check_out:
+            raise HTTPException(
+                status_code=400,
+                detail="Check-in date must be before check-out date"
+            )
+        if booking.status not in ACTIVE_BOOKING_STATUSES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cannot modify booking with status: {booking.status}"
+            )
+        
+        added_ranges = _range_difference(check_in, check_out, booking.check_in, booking.check_out)
+        removed_ranges = _range_difference(booking.check_in, booking.check_out, check_in, check_out)
+        added = [night for start, end in added_ranges for night in _nights(start, end)]
+        removed = [night for start, end in removed_ranges for night in _nights(start, end)]
+        if not added and not removed:
+            return {"nights_added": [], "nights_removed": [], "price_difference": 0.0}
+        
+        if added:
+            if check_in < date.today() and check_in != booking.check_in:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Check-in date cannot be in the past"
+                )
+            # Old nights are already ours; only the added ones can clash
+            if booking.room_id:
+                clash = self.session.exec(
+                    select(Booking.id).where(
+                        and_(
+                            Booking.room_id == booking.room_id,
+                            Booking.id != booking.id,
+                            Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+                            or_(*(overlaps_stay(start, end) for start, end in added_ranges))
+                        )
+                    )
+                ).first()
+                if clash:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Room is not available for selected dates"
+                    )
+            if not all(
+                self.check_room_type_availability(
+                    booking.room_type_id, start, end, rooms=booking.rooms_count or 1
+                )
+                for start, end in added_ranges
+            ):
+                raise HTTPException(
+                    status_code=400,
+                    detail="No rooms available for the selected dates"
+                )
+        
+        # Stay-dependent rules are evaluated as of the original booking date
+        booked_on = booking.created_at.date() if booking.created_at else None
+        booked = Money.of(booking.total_price, booking.currency)
+        changed = added + removed
+        calendar = self.booking_calendar(booking, min(changed), max(changed) + timedelta(days=1))
+        if calendar.rules and (
+            calendar.rules.stay_matches(booking.check_in, booking.check_out, booked_on)
+            != calendar.rules.stay_matches(check_in, check_out, booked_on)
+        ):
+            # A length-of-stay / lead-time rule now applies differently: reprice every night
+            calendar = self.booking_calendar(booking, check_in, check_out)
+            new_total = self._stay_charge(booking, calendar.total(check_in, check_out, booked_on))
+        else:
+            # Removed nights are credited at what was paid for them (pro rata)
+            old_nights = (booking.check_out - booking.check_in).days
+            credit = Money(round_half_up(booked.minor * len(removed), old_nights), booking.currency)
+            charge = self._stay_charge(
+                booking, sum(calendar.stay_prices(added, check_in, check_out, booked_on).values())
+            )
+            new_total = booked - credit + charge
+        price_difference = float(new_total - booked)
+        
+        booking.check_in = check_in
+        booking.check_out = check_out
+        booking.total_price = max(0.0, float(new_total))
+        booking.updated_at = datetime.utcnow()
+        self.session.add(booking)
+        # CAS on the booking first, so only the winning amendment moves inventory
+        self.session.flush()
+        
+        rooms = booking.rooms_count or 1
+        demand: Dict[Tuple[uuid.UUID, date], int] = {}
+        for night in added:
+            demand[(booking.room_type_id, night)] = rooms
+        for night in removed:
+            demand[(booking.room_type_id, night)] = -rooms
+        self.reserve_inventory_bulk(demand)
+        record_changes(self.session, {booking.room_type_id})
+        
+        return {
+            "nights_added": added,
+            "nights_removed": removed,
+            "price_difference": price_difference
+        }
+    
+    def _stay_charge(self, booking: Booking, amount: float) -> Money:
+        """
+        What a booking is charged for nights worth ``amount`` per room at list rates.
+        
+        Multi-room bookings pay for each of their ``rooms_count`` rooms.
+        Bookings without a rate plan were priced like guest bookings, with
+        service fee and taxes on top (extra-guest charges cannot be
+        recomputed, the guest count is not stored).
+        """
+        
+        amount *= booking.rooms_count or 1
+        if booking.rate_plan_id:
+            return Money.of(amount, booking.currency)
+        return PricingService.add_fees_and_taxes(amount, booking.currency)
+    
+    def booking_calendar(self, booking: Booking, start: date, end: date) -> PriceCalendar:
+        """
+        Price calendar of a booking's rate plan over ``[start, end)``.
+        
+        Bookings without a rate plan (guest bookings of a room) are priced
+        flat at their room type's nightly price, see :meth:`room_type_price`.
+        """
+        
+        engine = PricingEngine(self.session)
+        rate_plan = self.session.get(RatePlan, booking.rate_plan_id) if booking.rate_plan_id else None
+        if rate_plan:
+            return engine.calendar(rate_plan, start, end)
+        price = self.room_type_price(booking.room_type_id)
+        return engine.flat_calendar(booking.property_id, price, booking.currency, start, end)
+    
+    def room_type_price(self, room_type_id: uuid.UUID) -> float:
+        """
+        Nightly price of a room type for bookings made without a rate plan.
+        
+        Rooms carry no price of their own; the room type's cheapest rate
+        plan sets it.  Raises 400 when the room type has no rate plan.
+        """
+        
+        base_price = self.session.exec(
+            select(func.min(RatePlan.base_price)).where(RatePlan.room_type_id == room_type_id)
+        ).first()
+        if base_price is None:
+            raise HTTPException(status_code=400, detail="Room type has no rate plan to price the stay")
+        return float(base_price)
+    
     def check_room_type_availability(
         self,
         room_type_id: uuid.UUID,
         check_in: date,
-        check_out: date
+        check_out: date,
+        exclude_hold: Optional[Dict[str, Any]] = None,
+        rooms: int = 1
     ) -> bool:
-        """Check if room type has availability for date range."""
+        """
+        Check if room type has ``rooms`` rooms available for date range.
+        
+        Rooms under active holds count as taken, except ``exclude_hold``'s.
+        """
         
         # Get total rooms of this type
         total_rooms = self.session.exec(
@@ -163,15 +692,11 @@ class BookingService:
         
         # Get booked rooms for the date range
         booked_count = self.session.exec(
-            select(func.count(Booking.id)).where(
+            select(func.coalesce(func.sum(Booking.rooms_count), 0)).where(
                 and_(
                     Booking.room_type_id == room_type_id,
-                    Booking.status.in_([BookingStatus.CONFIRMED, BookingStatus.PENDING]),
-                    or_(
-                        and_(Booking.check_in <= check_in, Booking.check_out > check_in),
-                        and_(Booking.check_in < check_out, Booking.check_out >= check_out),
-                        and_(Booking.check_in >= check_in, Booking.check_out <= check_out)
-                    )
+                    Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+                    overlaps_stay(check_in, check_out)
                 )
             )
         ).first() or 0
@@ -182,32 +707,77 @@ class BookingService:
         )
         
         available_rooms = min(total_rooms - booked_count, inventory_available)
-        return available_rooms > 0
+        available_rooms -= held_rooms(room_type_id, check_in, check_out, exclude_hold)
+        return available_rooms >= rooms
     
     def find_available_room(
         self,
         room_type_id: uuid.UUID,
         check_in: date,
-        check_out: date
+        check_out: date,
+        strategy: str = "best_fit"
     ) -> Optional[Room]:
-        """Find a specific room that's available for the date range."""
+        """
+        Find a specific room that's available for the date range.
+        
+        Rooms and their bookings near the stay are loaded in one query and
+        indexed per room.  ``first_fit`` returns the first free room by room
+        number; ``best_fit`` (default) picks the free room whose neighbouring
+        bookings leave the smallest gaps around the stay, so stays pack
+        together and whole free runs stay sellable for long stays.
+        """
+        
+        calendars = self.room_calendars([room_type_id], check_in, check_out)
+        return pick_room(calendars.get(room_type_id, []), check_in, check_out, strategy)
+    
+    def room_calendars(
+        self,
+        room_type_ids: List[uuid.UUID],
+        start: date,
+        end: date
+    ) -> Dict[uuid.UUID, List[Tuple[Room, RoomCalendar]]]:
+        """
+        Active rooms of several room types with their bookings around ``[start, end)``.
         
-        # Get all rooms of this type
-        rooms = self.session.exec(
-            select(Room).where(
+        One outer-join query; rooms come back in room number order.
+        """
+        
+        window = timedelta(days=ASSIGNMENT_WINDOW_DAYS)
+        rows = self.session.exec(
+            select(Room, Booking.check_in, Booking.check_out)
+            .outerjoin(
+                Booking,
                 and_(
-                    Room.room_type_id == room_type_id,
+                    Booking.room_id == Room.id,
+                    Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+                    Booking.check_in < end + window,
+                    Booking.check_out > start - window
+                )
+            )
+            .where(
+                and_(
+                    Room.room_type_id.in_(room_type_ids),
                     Room.is_active == True
                 )
             )
+            .order_by(Room.room_number)
         ).all()
         
-        # Check each room for availability
-        for room in rooms:
-            if self.room_available(room.id, check_in, check_out):
-                return room
+        bookings: Dict[uuid.UUID, List[tuple]] = {}
+        rooms: List[Room] = []
+        for room, stay_start, stay_end in rows:
+            if room.id not in bookings:
+                bookings[room.id] = []
+                rooms.append(room)
+            if stay_start is not None:
+                bookings[room.id].append((stay_start, stay_end))
         
-        return None
+        calendars: Dict[uuid.UUID, List[Tuple[Room, RoomCalendar]]] = {}
+        for room in rooms:
+            calendars.setdefault(room.room_type_id, []).append(
+                (room, RoomCalendar(bookings[room.id]))
+            )
+        return calendars
     
     def room_available(self, room_id: uuid.UUID, check_in: date, check_out: date) -> bool:
         """
@@ -216,15 +786,11 @@ class BookingService:
         Enhanced version with better overlap detection and status checking.
         """
         overlapping_bookings = self.session.exec(
-            select(Booking).where(
+            select(Booking.id).where(
                 and_(
-        Booking.room_id == room_id,
-                    Booking.status.in_([BookingStatus.CONFIRMED, BookingStatus.PENDING]),
-                    or_(
-                        and_(Booking.check_in <= check_in, Booking.check_out > check_in),
-                        and_(Booking.check_in < check_out, Booking.check_out >= check_out),
-                        and_(Booking.check_in >= check_in, Booking.check_out <= check_out)
-                    )
+                    Booking.room_id == room_id,
+                    Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+                    overlaps_stay(check_in, check_out)
                 )
             )
         ).first()
@@ -237,60 +803,20 @@ class BookingService:
         check_in: date,
         check_out: date
     ) -> Dict[str, Any]:
-        """Calculate total price for a booking with daily price support."""
+        """Calculate total price for a booking with daily price support (see ``PricingEngine``)."""
         
         rate_plan = self.session.get(RatePlan, rate_plan_id)
         if not rate_plan:
             raise HTTPException(status_code=404, detail="Rate plan not found")
         
-        nights = (check_out - check_in).days
-        if nights <= 0:
-            raise HTTPException(status_code=400, detail="Invalid date range")
-        
-        # Get daily prices if available
-        daily_prices = self.session.exec(
-            select(DailyPrice).where(
-                and_(
-                    DailyPrice.rate_plan_id == rate_plan_id,
-                    DailyPrice.date >= check_in,
-                    DailyPrice.date < check_out
-                )
-            )
-        ).all()
-        
-        # Create a map of date -> price
-        daily_price_map = {dp.date: dp.price for dp in daily_prices}
-        
-        # Calculate total price
-        total_price = 0.0
-        current_date = check_in
-        daily_breakdown = []
-        
-        while current_date < check_out:
-            if current_date in daily_price_map:
-                day_price = float(daily_price_map[current_date])
-            else:
-                day_price = float(rate_plan.base_price)
-            
-            total_price += day_price
-            daily_breakdown.append({
-                "date": current_date,
-                "price": day_price
-            })
-            
-            current_date += timedelta(days=1)
-        
+        pricing = PricingEngine(self.session).quote(rate_plan, check_in, check_out)
         return {
-            "total_price": total_price,
-            "nights": nights,
-            "avg_price_per_night": total_price / nights,
-            "currency": rate_plan.currency,
-            "daily_breakdown": daily_breakdown,
+            **pricing,
             "rate_plan": {
                 "id": rate_plan.id,
                 "name": rate_plan.name,
-                "is_refundable": rate_plan.is_refundable,
-                "cancellation_policy": rate_plan.cancellation_policy
+                "is_refundable": not rate_plan.non_refundable,
+                "cancellation_policy_id": rate_plan.cancellation_policy_id
             }
         }
     
@@ -319,6 +845,84 @@ class BookingService:
         # Return minimum available across all dates
         return min(record.available_rooms for record in inventory_records)
     
+    def reserve_inventory(
+        self,
+        room_type_id: uuid.UUID,
+        check_in: date,
+        check_out: date,
+        rooms: int = 1
+    ) -> int:
+        """
+        Atomically take ``rooms`` from every managed night of a stay.
+        
+        See :meth:`reserve_inventory_bulk`.  Returns the number of nights claimed.
+        """
+        return self.reserve_inventory_bulk({
+            (room_type_id, check_in + timedelta(days=i)): rooms
+            for i in range((check_out - check_in).days)
+        })
+    
+    def reserve_inventory_bulk(self, demand: Dict[Tuple[uuid.UUID, date], int]) -> int:
+        """
+        Atomically take rooms for many room type nights in one statement.
+        
+        ``demand`` maps ``(room_type_id, night)`` to rooms needed; negative
+        quantities give rooms back in the same statement.  The matching
+        ``Inventory`` rows are locked in (room type, date) order, so
+        concurrent reservations cannot deadlock, and updated only if none
+        of them is short.  Nights without an inventory row are
+        unrestricted.  Raises 400 when any night is sold out; the caller's
+        transaction is left for it to commit or roll back.
+        
+        Returns the number of inventory rows updated.
+        """
+        if not demand:
+            return 0
+        
+        wanted = values(
+            column("room_type_id", Uuid),
+            column("date", Date),
+            column("quantity", Integer),
+            name="demand"
+        ).data([(rt_id, night, quantity) for (rt_id, night), quantity in demand.items()])
+        nights = (
+            select(Inventory.id, Inventory.available_rooms, wanted.c.quantity)
+            .join(
+                wanted,
+                and_(
+                    Inventory.room_type_id == wanted.c.room_type_id,
+                    Inventory.date == wanted.c.date
+                )
+            )
+            .order_by(Inventory.room_type_id, Inventory.date)
+            .with_for_update(of=Inventory)
+            .cte("stay_nights")
+        )
+        sold_out = exists().where(nights.c.available_rooms < nights.c.quantity)
+        claimed = (
+            update(Inventory)
+            .where(and_(Inventory.id == nights.c.id, ~sold_out))
+            .values(
+                available_rooms=Inventory.available_rooms - nights.c.quantity,
+                version=Inventory.version + 1
+            )
+            .returning(Inventory.id)
+            .cte("claimed_nights")
+        )
+        managed, taken = self.session.exec(
+            select(
+                select(func.count()).select_from(nights).scalar_subquery(),
+                select(func.count()).select_from(claimed).scalar_subquery()
+            )
+        ).one()
+        
+        if taken < managed:
+            raise HTTPException(
+                status_code=400,
+                detail="No rooms available for the selected dates"
+            )
+        return taken
+    
     def update_inventory_on_booking(
         self,
         room_type_id: uuid.UUID,
@@ -326,47 +930,177 @@ class BookingService:
         check_out: date,
         quantity_change: int
     ):
-        """Update inventory when booking is created or cancelled."""
-        
-        current_date = check_in
-        while current_date < check_out:
-            inventory = self.session.exec(
-                select(Inventory).where(
-                    and_(
-                        Inventory.room_type_id == room_type_id,
-                        Inventory.date == current_date
-                    )
+        """
+        Adjust inventory for every night of a stay in one UPDATE.
+        
+        Used to give rooms back (e.g. on cancellation); never goes below 0.
+        Runs in the caller's transaction.  Use :meth:`reserve_inventory`
+        to take rooms.
+        """
+        
+        self.session.exec(
+            update(Inventory)
+            .where(
+                and_(
+                    Inventory.room_type_id == room_type_id,
+                    Inventory.date >= check_in,
+                    Inventory.date < check_out
                 )
-            ).first()
+            )
+            .values(
+                available_rooms=func.greatest(0, Inventory.available_rooms + quantity_change),
+                version=Inventory.version + 1
+            )
+        )
+    
+    def release_inventory_bulk(self, demand: Dict[Tuple[uuid.UUID, date], int]) -> int:
+        """
+        Give rooms back for many room type nights in one UPDATE.
+        
+        ``demand`` maps ``(room_type_id, night)`` to rooms released.  Runs in
+        the caller's transaction; returns the number of inventory rows updated.
+        """
+        if not demand:
+            return 0
+        
+        released = values(
+            column("room_type_id", Uuid),
+            column("date", Date),
+            column("quantity", Integer),
+            name="released"
+        ).data([(rt_id, night, quantity) for (rt_id, night), quantity in demand.items()])
+        result = self.session.exec(
+            update(Inventory)
+            .where(
+                and_(
+                    Inventory.room_type_id == released.c.room_type_id,
+                    Inventory.date == released.c.date
+                )
+            )
+            .values(
+                available_rooms=Inventory.available_rooms + released.c.quantity,
+                version=Inventory.version + 1
+            )
+            .execution_options(synchronize_session=False)
+        )
+        record_changes(self.session, {rt_id for rt_id, _ in demand})
+        return result.rowcount
+    
+    def auto_update_statuses(
+        self,
+        today: Optional[date] = None,
+        chunk_size: int = STATUS_UPDATE_CHUNK_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Move finished and overdue bookings to their final status.
+        
+        - CONFIRMED bookings whose check-out has passed become COMPLETED.
+        - PENDING bookings whose check-in has passed become CANCELLED, and
+          their remaining nights go back to inventory.
+        
+        Bookings are updated in chunks of ``chunk_size`` with
+        ``UPDATE ... RETURNING`` over a ``FOR UPDATE SKIP LOCKED`` batch,
+        committing after each chunk, so no long transaction or table lock
+        is held and rows being edited elsewhere are picked up next run.
+        """
+        today = today or date.today()
+        started = time.perf_counter()
+        completed, _ = self._transition_in_chunks(
+            and_(Booking.status == BookingStatus.CONFIRMED, Booking.check_out < today),
+            BookingStatus.COMPLETED,
+            chunk_size
+        )
+        cancelled, rows_released = self._transition_in_chunks(
+            and_(Booking.status == BookingStatus.PENDING, Booking.check_in < today),
+            BookingStatus.CANCELLED,
+            chunk_size,
+            release_from=today
+        )
+        
+        report = {
+            "completed": completed,
+            "cancelled": cancelled,
+            "inventory_rows_released": rows_released,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+        logger.info(f"Booking status update: {report}")
+        return report
+    
+    def _transition_in_chunks(
+        self,
+        condition,
+        new_status: BookingStatus,
+        chunk_size: int,
+        release_from: Optional[date] = None
+    ) -> Tuple[int, int]:
+        """
+        Set ``new_status`` on bookings matching ``condition``, one chunk per transaction.
+        
+        With ``release_from``, nights from that date on are given back to
+        inventory in the same transaction.  Returns (bookings updated,
+        inventory rows released).
+        """
+        updated = released = 0
+        while True:
+            batch = (
+                select(Booking.id)
+                .where(condition)
+                .order_by(Booking.id)
+                .limit(chunk_size)
+                .with_for_update(skip_locked=True)
+                .cte("batch")
+            )
+            rows = self.session.exec(
+                update(Booking)
+                .where(Booking.id == batch.c.id)
+                .values(status=new_status, updated_at=datetime.utcnow(), version=Booking.version + 1)
+                .returning(Booking.room_type_id, Booking.check_in, Booking.check_out, Booking.rooms_count)
+                .execution_options(synchronize_session=False)
+            ).all()
             
-            if inventory:
-                inventory.available_rooms += quantity_change
-                # Ensure we don't go below 0
-                inventory.available_rooms = max(0, inventory.available_rooms)
-                self.session.add(inventory)
+            if rows:
+                record_changes(self.session, {row.room_type_id for row in rows})
+            if release_from is not None:
+                demand: Dict[Tuple[uuid.UUID, date], int] = {}
+                for row in rows:
+                    night = max(row.check_in, release_from)
+                    while night < row.check_out:
+                        key = (row.room_type_id, night)
+                        demand[key] = demand.get(key, 0) + (row.rooms_count or 1)
+                        night += timedelta(days=1)
+                released += self.release_inventory_bulk(demand)
             
-            current_date += timedelta(days=1)
-        
-        self.session.commit()
+            self.session.commit()
+            updated += len(rows)
+            if len(rows) < chunk_size:
+                return updated, released
     
     def cancel_booking(
         self,
         booking_id: uuid.UUID,
         user_id: Optional[uuid.UUID] = None,
-        reason: Optional[str] = None
+        reason: Optional[str] = None,
+        expected_version: Optional[int] = None
     ) -> Booking:
-        """Cancel a booking with inventory restoration."""
+        """
+        Cancel a booking with inventory restoration.
+        
+        The status change is a compare-and-swap on ``Booking.version``:
+        raises 409 if ``expected_version`` is stale or the booking changed
+        concurrently, in which case no inventory is restored.
+        """
         
         booking = self.session.get(Booking, booking_id)
         if not booking:
             raise HTTPException(status_code=404, detail="Booking not found")
         
-        # Check authorization
+        # Check authorization first: a 409 would reveal the booking's version
         if user_id and booking.user_id != user_id:
             raise HTTPException(
                 status_code=403,
                 detail="Not authorized to cancel this booking"
             )
+        check_version(booking, expected_version)
         
         # Check if booking can be cancelled
         if booking.status in [BookingStatus.CANCELLED, BookingStatus.COMPLETED]:
@@ -384,26 +1118,32 @@ class BookingService:
         
         self.session.add(booking)
         
-        # Restore inventory
-        if booking.room_type_id:
-            self.update_inventory_on_booking(
-                booking.room_type_id,
-                booking.check_in,
-                booking.check_out,
-                1  # Add back the room
-            )
-        
-        self.session.commit()
+        with conflict_on_stale(self.session, "Booking"):
+            # Flush first so inventory is only restored by the winning cancel
+            self.session.flush()
+            if booking.room_type_id:
+                self.update_inventory_on_booking(
+                    booking.room_type_id,
+                    booking.check_in,
+                    booking.check_out,
+                    booking.rooms_count or 1  # Add back the rooms
+                )
+            self.session.commit()
         self.session.refresh(booking)
         
         return booking
     
-    def confirm_booking(self, booking_id: uuid.UUID) -> Booking:
-        """Confirm a pending booking."""
+    def confirm_booking(
+        self,
+        booking_id: uuid.UUID,
+        expected_version: Optional[int] = None
+    ) -> Booking:
+        """Confirm a pending booking (409 if it changed concurrently)."""
         
         booking = self.session.get(Booking, booking_id)
         if not booking:
             raise HTTPException(status_code=404, detail="Booking not found")
+        check_version(booking, expected_version)
         
         if booking.status != BookingStatus.PENDING:
             raise HTTPException(
@@ -415,7 +1155,8 @@ class BookingService:
         booking.updated_at = datetime.utcnow()
         
         self.session.add(booking)
-        self.session.commit()
+        with conflict_on_stale(self.session, "Booking"):
+            self.session.commit()
         self.session.refresh(booking)
         
         return booking
@@ -448,6 +1189,16 @@ class BookingService:
         return self.session.exec(query).all()
 
 
+def _nights(start: date, end: date) -> List[date]:
+    return [start + timedelta(days=i) for i in range((end - start).days)]
+
+
+def _range_difference(start: date, end: date, other_start: date, other_end: date) -> List[Tuple[date, date]]:
+    """Parts of ``[start, end)`` outside ``[other_start, other_end)`` (at most two ranges)."""
+    parts = [(start, min(end, other_start)), (max(start, other_end), end)]
+    return [(part_start, part_end) for part_start, part_end in parts if part_start < part_end]
+
+
 # Legacy functions for backward compatibility
 def room_available(session: Session, room_id, check_in: date, check_out: date) -> bool:
     """Legacy function - use BookingService.room_available instead."""
@@ -455,9 +1206,9 @@ def room_available(session: Session, room_id, check_in: date, check_out: date) -
     return service.room_available(room_id, check_in, check_out)
 
 
-def compute_total(room: Room, check_in: date, check_out: date) -> float:
+def compute_total(session: Session, room: Room, check_in: date, check_out: date) -> float:
     """Legacy function - use BookingService.calculate_booking_price instead."""
     nights = nights_between(check_in, check_out)
     if nights <= 0:
         raise ValueError("Invalid dates")
-    return nights * room.price_per_night
+    return nights * BookingService(session).room_type_price(room.room_type_id)
@@ -0,0 +1,152 @@
+"""
+Change notifications for availability and pricing data.
+
+Several caches and derived tables depend on ``RoomType``, ``Room``,
+``Booking``, ``Inventory``, ``RatePlan``, ``DailyPrice`` and
+``PricingRule`` rows.
+Rather than each of them hooking the session, this module collects the
+room types, properties and rate plans touched by every flush and, once the
+transaction commits, hands them to the subscribers registered with
+:func:`on_availability_change`.  Rolled-back work is discarded.
+
+Subscribers run after commit, outside the transaction, and must not use
+the committing session.  Their exceptions are logged and swallowed.
+"""
+
+from __future__ import annotations
+
+import uuid
+from typing import Any, Callable, Dict, List, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlmodel import select
+
+from app.core.logger import logger
+from app.models.booking import Booking
+from app.models.daily_price import DailyPrice
+from app.models.inventory import Inventory
+from app.models.pricing_rule import PricingRule
+from app.models.rate_plan import RatePlan
+from app.models.room import Room
+from app.models.room_type import RoomType
+
+_PENDING_KEY = "availability_changes"
+
+_subscribers: List[Callable[[Dict[str, Set[uuid.UUID]]], None]] = []
+
+
+def on_availability_change(callback: Callable[[Dict[str, Set[uuid.UUID]]], None]):
+    """
+    Register a callback run after commit with the ids affected by a transaction.
+
+    The callback receives a dict with ``room_type_ids``, ``property_ids``,
+    ``rate_plan_ids`` and ``pricing_property_ids`` (properties whose
+    pricing rules changed) sets.  Usable as a decorator.
+    """
+    _subscribers.append(callback)
+    return callback
+
+
+def _values(obj: Any, attr: str) -> Set[Any]:
+    """Current and previous values of an attribute on a flushed instance."""
+    history = inspect(obj).attrs[attr].history
+    values = set(history.added) | set(history.unchanged) | set(history.deleted)
+    values.add(getattr(obj, attr, None))
+    values.discard(None)
+    return values
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context: Any) -> None:
+    room_type_ids: Set[uuid.UUID] = set()
+    rate_plan_ids: Set[uuid.UUID] = set()
+    pricing_property_ids: Set[uuid.UUID] = set()
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, RoomType):
+            room_type_ids |= _values(obj, "id")
+        elif isinstance(obj, (Booking, Inventory, Room)):
+            room_type_ids |= _values(obj, "room_type_id")
+        elif isinstance(obj, RatePlan):
+            room_type_ids |= _values(obj, "room_type_id")
+            rate_plan_ids |= _values(obj, "id")
+        elif isinstance(obj, DailyPrice):
+            rate_plan_ids |= _values(obj, "rate_plan_id")
+        elif isinstance(obj, PricingRule):
+            pricing_property_ids |= _values(obj, "property_id")
+            rate_plan_ids |= _values(obj, "rate_plan_id")
+
+    record_changes(session, room_type_ids, rate_plan_ids, pricing_property_ids)
+
+
+def record_changes(
+    session: Session,
+    room_type_ids: Set[uuid.UUID] = frozenset(),
+    rate_plan_ids: Set[uuid.UUID] = frozenset(),
+    pricing_property_ids: Set[uuid.UUID] = frozenset(),
+) -> None:
+    """
+    Queue room types / rate plans changed in this transaction for notification.
+
+    Flushed ORM objects are picked up automatically; call this after bulk
+    ``UPDATE`` statements, which bypass the unit of work.
+    """
+    room_type_ids = set(room_type_ids)
+    rate_plan_ids = set(rate_plan_ids)
+    pricing_property_ids = set(pricing_property_ids)
+    property_ids: Set[uuid.UUID] = set(pricing_property_ids)
+    if not room_type_ids and not rate_plan_ids and not pricing_property_ids:
+        return
+
+    connection = session.connection()
+    if rate_plan_ids:
+        room_type_ids.update(
+            connection.execute(
+                select(RatePlan.room_type_id).where(RatePlan.id.in_(rate_plan_ids))
+            ).scalars()
+        )
+    if pricing_property_ids:
+        # Property-wide pricing rules reprice every room type of the property
+        room_type_ids.update(
+            connection.execute(
+                select(RoomType.id).where(RoomType.property_id.in_(pricing_property_ids))
+            ).scalars()
+        )
+    if room_type_ids:
+        property_ids.update(
+            connection.execute(
+                select(RoomType.property_id).where(RoomType.id.in_(room_type_ids))
+            ).scalars()
+        )
+
+    pending = session.info.setdefault(
+        _PENDING_KEY,
+        {
+            "room_type_ids": set(),
+            "property_ids": set(),
+            "rate_plan_ids": set(),
+            "pricing_property_ids": set(),
+        }
+    )
+    pending["room_type_ids"] |= room_type_ids
+    pending["property_ids"] |= property_ids
+    pending["rate_plan_ids"] |= rate_plan_ids
+    pending["pricing_property_ids"] |= pricing_property_ids
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_subscribers(session: Session) -> None:
+    changes = session.info.pop(_PENDING_KEY, None)
+    if not changes:
+        return
+    for callback in _subscribers:
+        try:
+            callback(changes)
+        except Exception as exc:
+            logger.warning(f"Availability change subscriber {callback.__name__} failed: {exc}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
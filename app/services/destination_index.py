@@ -0,0 +1,297 @@
+"""
+Destination autocomplete backed by a Redis sorted-set prefix index.
+
+Every destination (a property city or a ``Location``) is indexed under
+each word-suffix of its accent-folded name, e.g. "Hồ Chí Minh" is stored
+as ``ho chi minh``, ``chi minh`` and ``minh``.  All members share score 0,
+so ``ZRANGEBYLEX`` walks them in lexical order and a prefix lookup is a
+single range read; no database access happens on the request path.  If
+Redis is down, lookups fall back to a (slower, accent-sensitive) city
+prefix query on ``Property``.
+
+Property counts per city are kept in a separate sorted set and updated
+incrementally from SQLAlchemy session events whenever a property's city,
+country or active flag changes.  Importing this module registers the
+listeners.
+"""
+
+from __future__ import annotations
+
+import json
+import unicodedata
+import uuid
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import redis
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlmodel import and_, func, select
+
+from app.core.logger import logger
+from app.core.redis import redis_main
+from app.models.location import Location
+from app.models.property import Property
+
+TERMS_KEY = "autocomplete:terms"      # ZSET (score 0): "<term>\x00<entry id>"
+ENTRIES_KEY = "autocomplete:entries"  # HASH: entry id -> JSON payload
+COUNTS_KEY = "autocomplete:counts"    # ZSET: entry id -> property count
+
+TERM_SEPARATOR = "\x00"
+LEX_UPPER_BOUND = "\uffff"
+MAX_SCAN = 100  # index members read per lookup before ranking
+
+_PENDING_KEY = "destination_index_deltas"
+
+
+def normalize_term(text: str) -> str:
+    """Lowercase, fold accents (including Vietnamese "đ") and collapse spaces."""
+    text = text.replace("đ", "d").replace("Đ", "D")
+    folded = "".join(
+        ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch)
+    )
+    return " ".join(folded.lower().split())
+
+
+def _suffixes(name: str) -> List[str]:
+    words = normalize_term(name).split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def _city_entry_id(city: str, country: Optional[str]) -> str:
+    return f"city:{normalize_term(city)}|{normalize_term(country or '')}"
+
+
+def _city_entry(city: str, country: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+    return _city_entry_id(city, country), {
+        "type": "city",
+        "label": f"{city}, {country}" if country else city,
+        "city": city,
+        "country": country,
+    }
+
+
+def _location_entry(location: Location, parent: Optional[Location]) -> Tuple[str, Dict[str, Any]]:
+    return f"location:{location.id}", {
+        "type": location.type,
+        "name": location.name,
+        "label": f"{location.name}, {parent.name}" if parent else location.name,
+        "location_id": str(location.id),
+        "slug": location.slug,
+        "country_code": location.country_code,
+        "latitude": location.latitude,
+        "longitude": location.longitude,
+    }
+
+
+def _add_entries(
+    pipe,
+    entries: Iterable[Tuple[str, Dict[str, Any]]],
+    terms_key: str = TERMS_KEY,
+    entries_key: str = ENTRIES_KEY,
+    only_new: bool = False,
+) -> None:
+    for entry_id, payload in entries:
+        if only_new:
+            pipe.hsetnx(entries_key, entry_id, json.dumps(payload))
+        else:
+            pipe.hset(entries_key, entry_id, json.dumps(payload))
+        name = payload.get("city") or payload["name"]
+        pipe.zadd(
+            terms_key,
+            {f"{term}{TERM_SEPARATOR}{entry_id}": 0 for term in _suffixes(name)},
+        )
+
+
+def rebuild_destination_index(session: Session) -> int:
+    """
+    Rebuild the whole index from ``Property`` and ``Location``.
+
+    The new index is written under temporary keys and swapped in with
+    ``RENAME`` so readers never see a half-built index.  Returns the
+    number of indexed destinations.
+    """
+    cities = session.exec(
+        select(Property.city, Property.country, func.count(Property.id))
+        .where(
+            and_(
+                Property.is_active == True,
+                Property.city.is_not(None),
+                Property.city != ""
+            )
+        )
+        .group_by(Property.city, Property.country)
+    ).all()
+    locations = session.exec(select(Location).where(Location.is_active == True)).all()
+    by_id = {location.id: location for location in locations}
+
+    counts: Counter = Counter()
+    entries: Dict[str, Dict[str, Any]] = {}
+    for city, country, count in cities:
+        entry_id, payload = _city_entry(city, country)
+        entries[entry_id] = payload
+        counts[entry_id] += count
+    for location in locations:
+        entry_id, payload = _location_entry(location, by_id.get(location.parent_id))
+        entries[entry_id] = payload
+
+    suffix = f":rebuild:{uuid.uuid4().hex}"
+    pipe = redis_main.pipeline()
+    _add_entries(
+        pipe, entries.items(), terms_key=TERMS_KEY + suffix, entries_key=ENTRIES_KEY + suffix
+    )
+    if counts:
+        pipe.zadd(COUNTS_KEY + suffix, dict(counts))
+    for key in (TERMS_KEY, ENTRIES_KEY, COUNTS_KEY):
+        pipe.delete(key)
+    if entries:
+        pipe.rename(TERMS_KEY + suffix, TERMS_KEY)
+        pipe.rename(ENTRIES_KEY + suffix, ENTRIES_KEY)
+    if counts:
+        pipe.rename(COUNTS_KEY + suffix, COUNTS_KEY)
+    pipe.execute()
+
+    logger.info(f"Destination index rebuilt with {len(entries)} entries")
+    return len(entries)
+
+
+def autocomplete_destinations(
+    query: str, limit: int = 10, session: Optional[Session] = None
+) -> List[Dict[str, Any]]:
+    """
+    Return destinations whose name has a word starting with ``query``.
+
+    Cities without active properties are skipped; results are ranked by
+    property count, then label.  When Redis is unavailable, cities are
+    looked up in the database through ``session`` (no suggestions without
+    one).
+    """
+    prefix = normalize_term(query)
+    if not prefix:
+        return []
+
+    try:
+        return _lookup(prefix, limit)
+    except redis.RedisError as exc:
+        logger.warning(f"Destination index unavailable, falling back to the database: {exc}")
+    if session is None:
+        return []
+    return _lookup_cities_in_database(session, query, limit)
+
+
+def _lookup(prefix: str, limit: int) -> List[Dict[str, Any]]:
+    members = redis_main.zrangebylex(
+        TERMS_KEY, f"[{prefix}", f"[{prefix}{LEX_UPPER_BOUND}", start=0, num=MAX_SCAN
+    )
+    entry_ids = list(dict.fromkeys(m.split(TERM_SEPARATOR, 1)[1] for m in members))
+    if not entry_ids:
+        return []
+
+    pipe = redis_main.pipeline()
+    pipe.hmget(ENTRIES_KEY, entry_ids)
+    pipe.zmscore(COUNTS_KEY, entry_ids)
+    payloads, counts = pipe.execute()
+
+    results = []
+    for payload, count in zip(payloads, counts):
+        if payload is None:
+            continue
+        entry = json.loads(payload)
+        entry["property_count"] = int(count or 0)
+        if entry["type"] == "city" and entry["property_count"] <= 0:
+            continue
+        results.append(entry)
+
+    results.sort(key=lambda e: (-e["property_count"], e["label"]))
+    return results[:limit]
+
+
+def _lookup_cities_in_database(session: Session, query: str, limit: int) -> List[Dict[str, Any]]:
+    """Cities of active properties with a word starting with ``query`` (ILIKE)."""
+    pattern = " ".join(query.split()).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    cities = session.exec(
+        select(Property.city, Property.country, func.count(Property.id))
+        .where(
+            and_(
+                Property.is_active == True,
+                Property.city.ilike(f"{pattern}%") | Property.city.ilike(f"% {pattern}%")
+            )
+        )
+        .group_by(Property.city, Property.country)
+        .order_by(func.count(Property.id).desc(), Property.city)
+        .limit(limit)
+    ).all()
+
+    results = []
+    for city, country, count in cities:
+        _, entry = _city_entry(city, country)
+        entry["property_count"] = count
+        results.append(entry)
+    return results
+
+
+# ----------------------------------------------------------------------
+# Incremental refresh from property writes
+# ----------------------------------------------------------------------
+
+def _listed_city(obj: Property, previous: bool) -> Optional[Tuple[str, Optional[str]]]:
+    """(city, country) a property counts towards, before or after the flush."""
+    state = inspect(obj)
+    values = {}
+    for attr in ("city", "country", "is_active"):
+        history = state.attrs[attr].history
+        if not previous or not history.has_changes():
+            values[attr] = getattr(obj, attr)
+        else:
+            values[attr] = history.deleted[0] if history.deleted else None
+    if not values["city"] or not values["is_active"]:
+        return None
+    return values["city"], values["country"]
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_city_deltas(session: Session, flush_context: Any) -> None:
+    deltas: Counter = Counter()
+    for obj in session.new:
+        if isinstance(obj, Property):
+            current = _listed_city(obj, previous=False)
+            if current:
+                deltas[current] += 1
+    for obj in session.dirty:
+        if isinstance(obj, Property):
+            before = _listed_city(obj, previous=True)
+            after = _listed_city(obj, previous=False)
+            if before != after:
+                if before:
+                    deltas[before] -= 1
+                if after:
+                    deltas[after] += 1
+    for obj in session.deleted:
+        if isinstance(obj, Property):
+            before = _listed_city(obj, previous=True)
+            if before:
+                deltas[before] -= 1
+
+    deltas = Counter({key: value for key, value in deltas.items() if value})
+    if deltas:
+        session.info.setdefault(_PENDING_KEY, Counter()).update(deltas)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_city_deltas(session: Session) -> None:
+    deltas = session.info.pop(_PENDING_KEY, None)
+    if not deltas:
+        return
+    try:
+        pipe = redis_main.pipeline()
+        _add_entries(pipe, (_city_entry(city, country) for city, country in deltas), only_new=True)
+        for (city, country), delta in deltas.items():
+            pipe.zincrby(COUNTS_KEY, delta, _city_entry_id(city, country))
+        pipe.execute()
+    except redis.RedisError as exc:
+        logger.warning(f"Destination index update failed: {exc}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_city_deltas(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
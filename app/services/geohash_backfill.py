@@ -0,0 +1,51 @@
+"""
+Backfill of ``Property.geohash`` for rows saved before it existed.
+
+The geohash is kept in step by listeners on ``Property`` (see
+``_sync_geohash``), which only run when a row is written.  Properties
+created earlier keep ``geohash`` NULL until this backfill runs; it is
+called on startup and is a no-op once every row with coordinates has a
+geohash.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import update
+from sqlmodel import Session, and_, select
+
+from app.core.logger import logger
+from app.models.property import Property
+from app.utils.geo import encode_geohash
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def backfill_geohashes(session: Session, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Set ``geohash`` on properties with coordinates but no geohash; returns rows updated."""
+    updated = 0
+    while True:
+        rows = session.exec(
+            select(Property.id, Property.latitude, Property.longitude)
+            .where(
+                and_(
+                    Property.geohash.is_(None),
+                    Property.latitude.is_not(None),
+                    Property.longitude.is_not(None)
+                )
+            )
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        session.execute(
+            update(Property),
+            [
+                {"id": property_id, "geohash": encode_geohash(latitude, longitude)}
+                for property_id, latitude, longitude in rows
+            ]
+        )
+        session.commit()
+        updated += len(rows)
+    if updated:
+        logger.info(f"Backfilled geohash for {updated} properties")
+    return updated
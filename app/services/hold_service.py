@@ -0,0 +1,217 @@
+"""
+Short-lived inventory holds kept in Redis.
+
+A hold reserves rooms of a room type for a stay while the guest checks
+out, without writing to Postgres.  Held rooms are counted per room type
+and night in Redis counters; a Lua script checks every night against the
+sellable count read from the database and claims them all-or-nothing, so
+concurrent holds can't oversell each other.
+
+Each hold expires after ``HOLD_TTL_SECONDS``.  Expiry times are kept in a
+sorted set and a frequent Celery job (``tasks.release_expired_holds``)
+releases expired holds, giving their rooms back.  A hold is either
+released explicitly or converted into a ``Booking`` by
+``BookingService.create_booking(hold_id=...)``.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import redis
+from fastapi import HTTPException
+from sqlmodel import Session
+
+from app.core.logger import logger
+from app.core.redis import redis_main
+from app.services.availability_engine import AvailabilityEngine
+
+HOLD_TTL_SECONDS = 15 * 60
+# Hold records outlive their expiry so the sweeper can still release them
+HOLD_GRACE_SECONDS = 60 * 60
+
+HOLD_KEY_PREFIX = "hold:"             # STRING (JSON): hold record
+HOLD_COUNT_PREFIX = "hold:count:"     # STRING (int): rooms held per room type and night
+HOLD_EXPIRY_KEY = "hold:expiry"       # ZSET: hold id -> expiry (epoch seconds)
+
+SWEEP_BATCH_SIZE = 500
+
+# KEYS: hold record, expiry zset, one held-count key per night
+# ARGV: rooms, expires_at, record ttl, hold id, record JSON, sellable rooms per night
+_CLAIM_SCRIPT = redis_main.register_script("""
+local rooms = tonumber(ARGV[1])
+local nights = #KEYS - 2
+for i = 1, nights do
+    local held = tonumber(redis.call('GET', KEYS[i + 2]) or '0')
+    if held + rooms > tonumber(ARGV[5 + i]) then
+        return i
+    end
+end
+for i = 1, nights do
+    redis.call('INCRBY', KEYS[i + 2], rooms)
+end
+redis.call('SET', KEYS[1], ARGV[5], 'EX', ARGV[3])
+redis.call('ZADD', KEYS[2], ARGV[2], ARGV[4])
+return 0
+""")
+
+# KEYS: hold record, expiry zset
+# ARGV: hold id, held-count key prefix
+_RELEASE_SCRIPT = redis_main.register_script("""
+redis.call('ZREM', KEYS[2], ARGV[1])
+local raw = redis.call('GET', KEYS[1])
+if not raw then
+    return 0
+end
+local hold = cjson.decode(raw)
+for _, night in ipairs(hold['nights']) do
+    local key = ARGV[2] .. hold['room_type_id'] .. ':' .. night
+    if redis.call('DECRBY', key, hold['rooms']) <= 0 then
+        redis.call('DEL', key)
+    end
+end
+redis.call('DEL', KEYS[1])
+return 1
+""")
+
+
+def _nights(check_in: date, check_out: date) -> List[str]:
+    return [
+        (check_in + timedelta(days=i)).isoformat()
+        for i in range((check_out - check_in).days)
+    ]
+
+
+def _count_key(room_type_id: uuid.UUID, night: str) -> str:
+    return f"{HOLD_COUNT_PREFIX}{room_type_id}:{night}"
+
+
+def place_hold(
+    session: Session,
+    room_type_id: uuid.UUID,
+    check_in: date,
+    check_out: date,
+    rooms: int = 1,
+    user_id: Optional[uuid.UUID] = None,
+    ttl: int = HOLD_TTL_SECONDS,
+) -> Dict[str, Any]:
+    """
+    Hold ``rooms`` rooms of a room type for a stay.
+
+    Sellable rooms per night come from one read-only availability query;
+    the claim against other holds is a single atomic Lua call.  Raises
+    409 naming the first night that can't be held.
+    """
+    if check_in >= check_out:
+        raise HTTPException(status_code=400, detail="Check-in date must be before check-out date")
+
+    sellable = AvailabilityEngine(session).nightly_availability(
+        [room_type_id], check_in, check_out
+    )[room_type_id]
+    nights = _nights(check_in, check_out)
+
+    hold_id = str(uuid.uuid4())
+    expires_at = int(time.time()) + ttl
+    record = {
+        "id": hold_id,
+        "room_type_id": str(room_type_id),
+        "check_in": check_in.isoformat(),
+        "check_out": check_out.isoformat(),
+        "nights": nights,
+        "rooms": rooms,
+        "user_id": str(user_id) if user_id else None,
+        "expires_at": expires_at,
+    }
+
+    failed_night = _CLAIM_SCRIPT(
+        keys=[HOLD_KEY_PREFIX + hold_id, HOLD_EXPIRY_KEY]
+        + [_count_key(room_type_id, night) for night in nights],
+        args=[rooms, expires_at, ttl + HOLD_GRACE_SECONDS, hold_id, json.dumps(record)]
+        + [max(available, 0) for available in sellable],
+    )
+    if failed_night:
+        raise HTTPException(
+            status_code=409,
+            detail=f"No rooms available to hold on {nights[failed_night - 1]}"
+        )
+
+    return _format_hold(record)
+
+
+def get_hold(hold_id: str) -> Optional[Dict[str, Any]]:
+    """Return an active hold, or ``None`` if it doesn't exist or has expired."""
+    raw = redis_main.get(HOLD_KEY_PREFIX + hold_id)
+    if not raw:
+        return None
+    record = json.loads(raw)
+    if record["expires_at"] <= time.time():
+        return None
+    return _format_hold(record)
+
+
+def release_hold(hold_id: str) -> bool:
+    """Give a hold's rooms back; returns ``False`` if it was already gone."""
+    return bool(
+        _RELEASE_SCRIPT(
+            keys=[HOLD_KEY_PREFIX + hold_id, HOLD_EXPIRY_KEY],
+            args=[hold_id, HOLD_COUNT_PREFIX],
+        )
+    )
+
+
+def held_rooms(
+    room_type_id: uuid.UUID,
+    check_in: date,
+    check_out: date,
+    exclude_hold: Optional[Dict[str, Any]] = None,
+) -> int:
+    """
+    Most rooms held on any night of the stay, minus ``exclude_hold``'s own.
+
+    Returns 0 (and logs) if Redis is unavailable, so bookings fall back
+    to database availability alone.
+    """
+    nights = _nights(check_in, check_out)
+    try:
+        counts = redis_main.mget([_count_key(room_type_id, night) for night in nights])
+    except redis.RedisError as exc:
+        logger.warning(f"Hold counts unavailable: {exc}")
+        return 0
+
+    own_nights = set(exclude_hold["nights"]) if exclude_hold else set()
+    own_rooms = exclude_hold["rooms"] if exclude_hold else 0
+    return max(
+        (
+            int(count or 0) - (own_rooms if night in own_nights else 0)
+            for night, count in zip(nights, counts)
+        ),
+        default=0
+    )
+
+
+def release_expired_holds(limit: int = SWEEP_BATCH_SIZE) -> int:
+    """Release holds past their expiry; returns the number released."""
+    released = 0
+    while True:
+        expired = redis_main.zrangebyscore(HOLD_EXPIRY_KEY, "-inf", time.time(), start=0, num=limit)
+        if not expired:
+            return released
+        for hold_id in expired:
+            released += release_hold(hold_id)
+
+
+def _format_hold(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "hold_id": record["id"],
+        "room_type_id": record["room_type_id"],
+        "check_in": record["check_in"],
+        "check_out": record["check_out"],
+        "nights": record["nights"],
+        "rooms": record["rooms"],
+        "user_id": record["user_id"],
+        "expires_at": datetime.utcfromtimestamp(record["expires_at"]).isoformat() + "Z",
+    }
@@ -0,0 +1,139 @@
+"""
+Idempotency-Key support for non-idempotent POST endpoints.
+
+Clients (or proxies) retrying a request send the same ``Idempotency-Key``
+header.  The first request claims the key in Redis and runs; its response
+is stored for ``IDEMPOTENCY_TTL`` seconds and replayed verbatim for every
+retry, without re-running availability checks, pricing, inserts or side
+effects such as confirmation emails.
+
+* A retry while the first request is still running gets 409.  The
+  claim expires after ``PROCESSING_TTL`` seconds, so a key whose request
+  died mid-way (crash, restart, timeout) can be retried.
+* Reusing a key with a different request body gets 422.
+* Failed requests release the key so they can be retried.
+
+If Redis is unavailable the request runs without deduplication.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Callable, Optional, Type
+
+import redis
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.logger import logger
+from app.core.redis import redis_main
+
+IDEMPOTENCY_TTL = 24 * 60 * 60  # seconds, completed responses
+PROCESSING_TTL = 120  # seconds; frees the key if the process dies mid-request
+IDEMPOTENCY_PREFIX = "idempotency"
+MAX_KEY_LENGTH = 255
+
+_PROCESSING = "processing"
+_COMPLETED = "completed"
+
+
+def _fingerprint(payload: Any) -> str:
+    return hashlib.sha256(
+        json.dumps(jsonable_encoder(payload), sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def _response_body(result: Any, response_model: Optional[Type[BaseModel]]) -> Any:
+    if response_model is not None:
+        result = response_model.model_validate(result, from_attributes=True)
+    return jsonable_encoder(result)
+
+
+def run_idempotent(
+    scope: str,
+    key: Optional[str],
+    principal: Any,
+    payload: Any,
+    handler: Callable[[], Any],
+    status_code: int = 200,
+    response_model: Optional[Type[BaseModel]] = None,
+) -> Any:
+    """
+    Run ``handler`` at most once per ``(scope, principal, key)``.
+
+    ``payload`` is the request body used to detect key reuse; ``principal``
+    (user id, guest email, ...) keeps keys of different callers apart.
+    Without a key the handler simply runs.  Replays are returned as a
+    ``JSONResponse`` carrying the stored body and ``status_code``.
+
+    Pass the route's ``response_model`` when the handler returns an ORM
+    object: the stored body is then the model's serialization, the same
+    JSON the first request sent, not every column of the object.
+    """
+    if not key:
+        return handler()
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail="Idempotency-Key is too long")
+
+    redis_key = f"{IDEMPOTENCY_PREFIX}:{scope}:{principal}:{key}"
+    fingerprint = _fingerprint(payload)
+
+    try:
+        claimed = redis_main.set(
+            redis_key,
+            json.dumps({"state": _PROCESSING, "fingerprint": fingerprint}),
+            nx=True,
+            ex=PROCESSING_TTL,
+        )
+        stored = None if claimed else redis_main.get(redis_key)
+    except redis.RedisError as exc:
+        logger.warning(f"Idempotency store unavailable, running without it: {exc}")
+        return handler()
+
+    if not claimed:
+        record = json.loads(stored) if stored else None
+        if record is None or record["state"] == _PROCESSING:
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still being processed"
+            )
+        if record["fingerprint"] != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used with a different request"
+            )
+        return JSONResponse(
+            content=record["body"],
+            status_code=record["status_code"],
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    try:
+        result = handler()
+    except Exception:
+        try:
+            redis_main.delete(redis_key)
+        except redis.RedisError as exc:
+            logger.warning(f"Could not release Idempotency-Key {key}: {exc}")
+        raise
+
+    try:
+        redis_main.set(
+            redis_key,
+            json.dumps(
+                {
+                    "state": _COMPLETED,
+                    "fingerprint": fingerprint,
+                    "status_code": status_code,
+                    "body": _response_body(result, response_model),
+                },
+                default=str,
+            ),
+            ex=IDEMPOTENCY_TTL,
+        )
+    except redis.RedisError as exc:
+        logger.warning(f"Could not store response for Idempotency-Key {key}: {exc}")
+    return result
@@ -0,0 +1,106 @@
+"""
+Transactional outbox for side effects of business writes.
+
+Instead of calling ``task.delay(...)`` after committing (which blocks the
+request on the broker and loses the side effect if the broker is down),
+request handlers add an ``OutboxEvent`` in the same transaction as the
+booking.  ``tasks.relay_outbox`` drains pending events in batches and
+hands them to Celery, so the event exists if and only if the booking
+does, and the request path does no broker I/O.
+
+Delivery is at least once: an event is marked processed only after it
+was handed to the broker, so a relay crash in between re-sends it.
+Events that fail are retried with exponential backoff.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from fastapi.encoders import jsonable_encoder
+from sqlmodel import Session, and_, delete, select
+
+from app.core.logger import logger
+from app.models.outbox import OutboxEvent
+from app.worker.celery_app import celery
+
+# Event type -> Celery task receiving the payload as keyword arguments
+OUTBOX_TASKS = {
+    "booking.confirmation_email": "tasks.send_booking_confirmation",
+    "booking.approved_email": "tasks.send_booking_approved",
+}
+
+RELAY_BATCH_SIZE = 100
+MAX_RETRY_DELAY_SECONDS = 60 * 60
+PROCESSED_RETENTION_DAYS = 7
+
+
+def add_event(session: Session, event_type: str, payload: Dict[str, Any]) -> OutboxEvent:
+    """Add an event to the caller's transaction; it is relayed once committed."""
+    if event_type not in OUTBOX_TASKS:
+        raise ValueError(f"Unknown outbox event type: {event_type}")
+    event = OutboxEvent(event_type=event_type, payload=jsonable_encoder(payload))
+    session.add(event)
+    return event
+
+
+def relay_outbox(session: Session, batch_size: int = RELAY_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Hand pending events to Celery, one batch per transaction.
+
+    Batches are claimed with ``FOR UPDATE SKIP LOCKED`` so several relays
+    can run side by side.  Returns counts of sent and failed events.
+    """
+    sent = failed = 0
+    while True:
+        now = datetime.utcnow()
+        events = session.exec(
+            select(OutboxEvent)
+            .where(
+                and_(
+                    OutboxEvent.processed_at.is_(None),
+                    OutboxEvent.available_at <= now
+                )
+            )
+            .order_by(OutboxEvent.available_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not events:
+            break
+
+        for event in events:
+            try:
+                celery.send_task(OUTBOX_TASKS[event.event_type], kwargs=event.payload)
+            except Exception as exc:
+                event.attempts += 1
+                event.last_error = str(exc)[:1000]
+                delay = min(5 * 2 ** event.attempts, MAX_RETRY_DELAY_SECONDS)
+                event.available_at = now + timedelta(seconds=delay)
+                failed += 1
+                logger.warning(
+                    f"Outbox event {event.id} ({event.event_type}) failed, "
+                    f"attempt {event.attempts}: {exc}"
+                )
+            else:
+                event.processed_at = now
+                sent += 1
+            session.add(event)
+        session.commit()
+
+        if len(events) < batch_size:
+            break
+
+    return {"sent": sent, "failed": failed}
+
+
+def purge_processed_events(session: Session, retention_days: int = PROCESSED_RETENTION_DAYS) -> int:
+    """Delete events processed more than ``retention_days`` ago."""
+    result = session.exec(
+        delete(OutboxEvent).where(
+            OutboxEvent.processed_at < datetime.utcnow() - timedelta(days=retention_days)
+        )
+    )
+    session.commit()
+    return result.rowcount
@@ -0,0 +1,250 @@
+"""
+Two-tier cache of rate plan price calendars, one entry per rate plan and month.
+
+An entry holds the base price of every night of a month (``DailyPrice``
+override or ``RatePlan.base_price``).  Lookups go through:
+
+1. a per-process LRU (``PRICE_LRU_SIZE`` months), so hot calendars are
+   served from memory without any I/O;
+2. Redis hashes ``price_calendar:v1:{rate_plan_id}:{generation}:{YYYY-MM}``
+   with one field per day, shared by every API and worker process;
+3. Postgres, one ``DailyPrice`` range query for all months still missing,
+   whose results are written back to both tiers.
+
+Writes to ``DailyPrice`` and ``RatePlan`` invalidate after commit via
+:mod:`app.services.change_tracking`: the local LRU drops the rate plan and
+its Redis generation counter is incremented, so every process reads fresh
+keys from then on (old keys expire).  Other processes' LRU entries live
+at most ``PRICE_LRU_TTL_SECONDS``.  If Redis is down the cache degrades to
+LRU + database.
+
+Hit and miss counters per tier are reported by :func:`cache_stats`.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from array import array
+from calendar import monthrange
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import redis
+from sqlmodel import Session, and_, select
+
+from app.core.logger import logger
+from app.core.redis import redis_main
+from app.models.daily_price import DailyPrice
+from app.models.rate_plan import RatePlan
+from app.services.change_tracking import on_availability_change
+
+PRICE_CALENDAR_PREFIX = "price_calendar:v1"
+GENERATION_PREFIX = "price_calendar:gen"
+PRICE_CALENDAR_TTL = 24 * 60 * 60  # seconds, Redis tier
+PRICE_LRU_SIZE = 4096               # months kept per process
+PRICE_LRU_TTL_SECONDS = 30          # bounds staleness of other processes' LRUs
+
+Month = Tuple[int, int]
+_MonthKey = Tuple[uuid.UUID, Month]
+
+_lock = threading.Lock()
+_lru: "OrderedDict[_MonthKey, Tuple[float, array]]" = OrderedDict()
+_stats: Dict[str, int] = {
+    "lru_hits": 0,
+    "redis_hits": 0,
+    "db_loads": 0,
+    "invalidations": 0,
+    "redis_errors": 0,
+}
+
+
+def months_between(start: date, end: date) -> List[Month]:
+    """Months overlapping ``[start, end)``."""
+    months: List[Month] = []
+    year, month = start.year, start.month
+    while date(year, month, 1) < end:
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def _month_start(month: Month) -> date:
+    return date(month[0], month[1], 1)
+
+
+def _month_end(month: Month) -> date:
+    return _month_start(month) + timedelta(days=monthrange(*month)[1])
+
+
+def _redis_key(rate_plan_id: uuid.UUID, generation: str, month: Month) -> str:
+    return f"{PRICE_CALENDAR_PREFIX}:{rate_plan_id}:{generation}:{month[0]:04d}-{month[1]:02d}"
+
+
+def _count(name: str, amount: int = 1) -> None:
+    with _lock:
+        _stats[name] += amount
+
+
+def _lru_get(keys: Iterable[_MonthKey]) -> Dict[_MonthKey, array]:
+    now = time.monotonic()
+    found: Dict[_MonthKey, array] = {}
+    with _lock:
+        for key in keys:
+            entry = _lru.get(key)
+            if entry is None:
+                continue
+            if entry[0] <= now:
+                del _lru[key]
+                continue
+            _lru.move_to_end(key)
+            found[key] = entry[1]
+        _stats["lru_hits"] += len(found)
+    return found
+
+
+def _lru_put(entries: Dict[_MonthKey, array]) -> None:
+    expires_at = time.monotonic() + PRICE_LRU_TTL_SECONDS
+    with _lock:
+        for key, prices in entries.items():
+            _lru[key] = (expires_at, prices)
+            _lru.move_to_end(key)
+        while len(_lru) > PRICE_LRU_SIZE:
+            _lru.popitem(last=False)
+
+
+def _generations(rate_plan_ids: Set[uuid.UUID]) -> Dict[uuid.UUID, str]:
+    ids = list(rate_plan_ids)
+    values = redis_main.mget([f"{GENERATION_PREFIX}:{rate_plan_id}" for rate_plan_id in ids])
+    return {rate_plan_id: value or "0" for rate_plan_id, value in zip(ids, values)}
+
+
+def _redis_get(
+    keys: List[_MonthKey],
+) -> Tuple[Dict[_MonthKey, array], Optional[Dict[uuid.UUID, str]]]:
+    """Entries found in Redis, and the generations used (``None`` if Redis failed)."""
+    try:
+        generations = _generations({rate_plan_id for rate_plan_id, _ in keys})
+        pipe = redis_main.pipeline(transaction=False)
+        for rate_plan_id, month in keys:
+            pipe.hgetall(_redis_key(rate_plan_id, generations[rate_plan_id], month))
+        hashes = pipe.execute()
+    except redis.RedisError as exc:
+        _count("redis_errors")
+        logger.warning(f"Price calendar cache read failed: {exc}")
+        return {}, None
+
+    found: Dict[_MonthKey, array] = {}
+    for key, fields in zip(keys, hashes):
+        days = monthrange(*key[1])[1]
+        if len(fields) == days:
+            found[key] = array("d", (float(fields[str(day)]) for day in range(1, days + 1)))
+    _count("redis_hits", len(found))
+    return found, generations
+
+
+def _redis_put(entries: Dict[_MonthKey, array], generations: Dict[uuid.UUID, str]) -> None:
+    try:
+        pipe = redis_main.pipeline(transaction=False)
+        for (rate_plan_id, month), prices in entries.items():
+            key = _redis_key(rate_plan_id, generations[rate_plan_id], month)
+            pipe.hset(key, mapping={str(day): repr(price) for day, price in enumerate(prices, 1)})
+            pipe.expire(key, PRICE_CALENDAR_TTL)
+        pipe.execute()
+    except redis.RedisError as exc:
+        _count("redis_errors")
+        logger.warning(f"Price calendar cache write failed: {exc}")
+
+
+def _load(session: Session, keys: List[_MonthKey], plans: Dict[uuid.UUID, RatePlan]) -> Dict[_MonthKey, array]:
+    """Build months from the database with one ``DailyPrice`` range query."""
+    months: Dict[_MonthKey, array] = {
+        (rate_plan_id, month): array("d", [float(plans[rate_plan_id].base_price)]) * monthrange(*month)[1]
+        for rate_plan_id, month in keys
+    }
+    start = min(_month_start(month) for _, month in keys)
+    end = max(_month_end(month) for _, month in keys)
+    for rate_plan_id, night, price in session.exec(
+        select(DailyPrice.rate_plan_id, DailyPrice.date, DailyPrice.price).where(
+            and_(
+                DailyPrice.rate_plan_id.in_({rate_plan_id for rate_plan_id, _ in keys}),
+                DailyPrice.date >= start,
+                DailyPrice.date < end
+            )
+        )
+    ).all():
+        prices = months.get((rate_plan_id, (night.year, night.month)))
+        if prices is not None:
+            prices[night.day - 1] = float(price)
+    _count("db_loads", len(months))
+    return months
+
+
+def month_prices(
+    session: Session,
+    rate_plans: Iterable[RatePlan],
+    start: date,
+    end: date,
+) -> Dict[_MonthKey, array]:
+    """Price arrays (index ``day - 1``) of every rate plan and month overlapping ``[start, end)``."""
+    plans = {plan.id: plan for plan in rate_plans}
+    keys = [(rate_plan_id, month) for rate_plan_id in plans for month in months_between(start, end)]
+    if not keys:
+        return {}
+
+    found = _lru_get(keys)
+    missing = [key for key in keys if key not in found]
+    if not missing:
+        return found
+
+    from_redis, generations = _redis_get(missing)
+    found.update(from_redis)
+    _lru_put(from_redis)
+    missing = [key for key in missing if key not in from_redis]
+    if not missing:
+        return found
+
+    loaded = _load(session, missing, plans)
+    found.update(loaded)
+    _lru_put(loaded)
+    if generations is not None:
+        _redis_put(loaded, generations)
+    return found
+
+
+def invalidate_rate_plans(rate_plan_ids: Iterable[uuid.UUID]) -> None:
+    """Drop cached calendars of the given rate plans in this process and in Redis."""
+    rate_plan_ids = set(rate_plan_ids)
+    if not rate_plan_ids:
+        return
+    with _lock:
+        for key in [key for key in _lru if key[0] in rate_plan_ids]:
+            del _lru[key]
+        _stats["invalidations"] += len(rate_plan_ids)
+    try:
+        pipe = redis_main.pipeline(transaction=False)
+        for rate_plan_id in rate_plan_ids:
+            pipe.incr(f"{GENERATION_PREFIX}:{rate_plan_id}")
+        pipe.execute()
+    except redis.RedisError as exc:
+        _count("redis_errors")
+        logger.warning(f"Price calendar cache invalidation failed: {exc}")
+
+
+def cache_stats() -> Dict[str, float]:
+    """Hit/miss counters of this process, with per-tier and overall hit rates."""
+    with _lock:
+        stats: Dict[str, float] = dict(_stats)
+        stats["lru_size"] = len(_lru)
+    lookups = stats["lru_hits"] + stats["redis_hits"] + stats["db_loads"]
+    stats["lookups"] = lookups
+    stats["lru_hit_rate"] = stats["lru_hits"] / lookups if lookups else 0.0
+    stats["hit_rate"] = (stats["lru_hits"] + stats["redis_hits"]) / lookups if lookups else 0.0
+    return stats
+
+
+@on_availability_change
+def _invalidate_changed_rate_plans(changes: Dict[str, Set[uuid.UUID]]) -> None:
+    invalidate_rate_plans(changes["rate_plan_ids"])
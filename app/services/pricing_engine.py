@@ -0,0 +1,226 @@
+"""
+Shared nightly pricing for rate plans over date ranges.
+
+A rate plan's price for a night is its ``DailyPrice`` override or else its
+``base_price``.  ``PricingEngine`` loads the prices of many rate plans
+(from the two-tier month cache, with one range query for misses) and
+lays each plan out as a ``PriceCalendar``: a flat ``array('d')`` of
+nightly prices plus its prefix sums.  Any stay
+inside the loaded span is then priced in O(1) (a difference of two prefix
+sums) and a night's price is an index lookup, so quoting cost no longer
+grows with the number of nights times the number of overrides.
+
+Rate plans' pricing rules are applied on top of the base prices when a
+stay is priced.  Search, booking pricing and availability quotes all price
+through this module.
+"""
+
+from __future__ import annotations
+
+import uuid
+from array import array
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlmodel import Session
+
+from app.models.rate_plan import RatePlan
+from app.services import price_calendar_cache
+from app.services.pricing_rules import RuleIndex, property_rules, rate_plan_rules
+
+
+class PriceCalendar:
+    """
+    Nightly prices of one rate plan for ``[start, end)``, with prefix sums.
+
+    ``prices`` are base prices (``DailyPrice`` or ``base_price``); stay
+    prices also apply the rate plan's pricing rules (see
+    :mod:`app.services.pricing_rules`).  Without rules a stay total is O(1).
+    """
+
+    __slots__ = ("rate_plan_id", "currency", "start", "end", "prices", "sums", "rules")
+
+    def __init__(
+        self,
+        rate_plan_id: Optional[uuid.UUID],
+        currency: str,
+        start: date,
+        prices: array,
+        rules: Optional[RuleIndex] = None,
+    ):
+        self.rate_plan_id = rate_plan_id
+        self.currency = currency
+        self.start = start
+        self.end = start + timedelta(days=len(prices))
+        self.prices = prices
+        self.sums = array("d", accumulate(prices, initial=0.0))
+        self.rules = rules
+
+    def _span(self, check_in: date, check_out: date) -> Tuple[int, int]:
+        first = (check_in - self.start).days
+        last = (check_out - self.start).days
+        if first < 0 or last > len(self.prices) or first > last:
+            raise ValueError(
+                f"Stay {check_in} - {check_out} is outside the loaded calendar "
+                f"{self.start} - {self.end}"
+            )
+        return first, last
+
+    def price(self, night: date) -> float:
+        """Base price of one night, before pricing rules."""
+        return self.prices[(night - self.start).days]
+
+    def nightly(self, check_in: date, check_out: date, today: Optional[date] = None) -> List[float]:
+        """Price of each night of a stay booked on ``today``."""
+        first, last = self._span(check_in, check_out)
+        nightly = self.prices[first:last].tolist()
+        if not self.rules:
+            return nightly
+        return [
+            price * multiplier
+            for price, multiplier in zip(nightly, self.rules.multipliers(check_in, check_out, today))
+        ]
+
+    def total(self, check_in: date, check_out: date, today: Optional[date] = None) -> float:
+        """Total price of a stay (one room) booked on ``today``."""
+        if self.rules:
+            return sum(self.nightly(check_in, check_out, today))
+        first, last = self._span(check_in, check_out)
+        return self.sums[last] - self.sums[first]
+
+    def stay_prices(
+        self,
+        nights: Iterable[date],
+        check_in: date,
+        check_out: date,
+        today: Optional[date] = None,
+    ) -> Dict[date, float]:
+        """Prices of selected nights, as part of the stay ``[check_in, check_out)``."""
+        nights = list(nights)
+        if not self.rules:
+            return {night: self.price(night) for night in nights}
+        multipliers = self.rules.night_multipliers(nights, check_in, check_out, today)
+        return {night: self.price(night) * multipliers[night] for night in nights}
+
+    def window_totals(self, nights: int, today: Optional[date] = None) -> List[float]:
+        """Total of every ``nights``-long stay starting on each loaded night."""
+        starts = range(len(self.prices) - nights + 1)
+        if self.rules:
+            return [
+                self.total(self.start + timedelta(days=i), self.start + timedelta(days=i + nights), today)
+                for i in starts
+            ]
+        sums = self.sums
+        return [sums[i + nights] - sums[i] for i in starts]
+
+
+def _slice_months(months: Dict[Any, array], rate_plan_id: uuid.UUID, start: date, end: date) -> array:
+    """Concatenate cached month arrays of a rate plan and cut them to ``[start, end)``."""
+    prices = array("d")
+    if end <= start:
+        return prices
+    for month in price_calendar_cache.months_between(start, end):
+        prices.extend(months[(rate_plan_id, month)])
+    offset = start.day - 1
+    return prices[offset:offset + (end - start).days]
+
+
+class PricingEngine:
+    """
+    Builds ``PriceCalendar``s for many rate plans.
+
+    Month prices come from :mod:`app.services.price_calendar_cache`; only
+    months missing from both cache tiers are queried, with one query.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def calendars(
+        self,
+        rate_plans: Iterable[RatePlan],
+        start: date,
+        end: date,
+    ) -> Dict[uuid.UUID, PriceCalendar]:
+        """Price calendars of ``rate_plans`` over ``[start, end)``."""
+        plans = list({plan.id: plan for plan in rate_plans}.values())
+        nights = max((end - start).days, 0)
+        months = price_calendar_cache.month_prices(self.session, plans, start, end) if nights else {}
+        prices = {plan.id: _slice_months(months, plan.id, start, end) for plan in plans}
+        rules = rate_plan_rules(self.session, plans) if plans else {}
+        return {
+            plan.id: PriceCalendar(plan.id, plan.currency, start, prices[plan.id], rules[plan.id])
+            for plan in plans
+        }
+
+    def calendar(self, rate_plan: RatePlan, start: date, end: date) -> PriceCalendar:
+        """Price calendar of a single rate plan."""
+        return self.calendars([rate_plan], start, end)[rate_plan.id]
+
+    def flat_calendar(
+        self,
+        property_id: uuid.UUID,
+        price: float,
+        currency: str,
+        start: date,
+        end: date,
+    ) -> PriceCalendar:
+        """Calendar of a room priced per night without a rate plan (property-wide rules)."""
+        return PriceCalendar(
+            None,
+            currency,
+            start,
+            array("d", [float(price)]) * max((end - start).days, 0),
+            property_rules(self.session, property_id),
+        )
+
+    def totals(
+        self,
+        stays: List[Tuple[RatePlan, date, date]],
+    ) -> List[float]:
+        """
+        Price many ``(rate_plan, check_in, check_out)`` stays at once.
+
+        Each rate plan is loaded once over the span of its stays, with a
+        single query for all of them.
+        """
+        if not stays:
+            return []
+        start = min(check_in for _, check_in, _ in stays)
+        end = max(check_out for _, _, check_out in stays)
+        calendars = self.calendars((plan for plan, _, _ in stays), start, end)
+        return [
+            calendars[plan.id].total(check_in, check_out)
+            for plan, check_in, check_out in stays
+        ]
+
+    def quote(
+        self,
+        rate_plan: RatePlan,
+        check_in: date,
+        check_out: date,
+        calendar: Optional[PriceCalendar] = None,
+    ) -> Dict[str, Any]:
+        """
+        Price a stay on one rate plan, with a per-night breakdown.
+
+        Pass ``calendar`` to reuse one already loaded for the stay.
+        """
+        nights = (check_out - check_in).days
+        if nights <= 0:
+            raise HTTPException(status_code=400, detail="Invalid date range")
+        calendar = calendar or self.calendar(rate_plan, check_in, check_out)
+        nightly = calendar.nightly(check_in, check_out)
+        total_price = sum(nightly)
+        return {
+            "total_price": total_price,
+            "nights": nights,
+            "avg_price_per_night": total_price / nights,
+            "currency": rate_plan.currency,
+            "daily_breakdown": [
+                {"date": check_in + timedelta(days=i), "price": price}
+                for i, price in enumerate(nightly)
+            ],
+        }
@@ -0,0 +1,368 @@
+"""
+Rule-based price adjustments compiled into per-rate-plan interval indexes.
+
+``PricingRule`` rows (seasonal, day-of-week, length-of-stay, last-minute)
+are compiled once per rate plan into a ``RuleIndex``: the rules' date
+ranges cut the calendar into elementary segments, and each segment keeps
+the combined multiplier of its stay-independent rules per weekday plus the
+few stay-dependent rules (nights, lead time) that cover it.  Pricing a
+stay is then one binary search for the first night's segment and a walk
+forward, instead of testing every rule against every date.
+
+Compiled indexes are cached per process, keyed by ``(property_id,
+rate_plan_id)``; ``rate_plan_id`` is ``None`` for rooms priced without a
+rate plan, which only get property-wide rules.  Entries are dropped when
+a ``PricingRule`` or ``RatePlan`` of the property changes (see
+:mod:`app.services.change_tracking`) and expire after
+``RULE_INDEX_TTL_SECONDS`` so other processes pick up edits too.
+
+:func:`seed_peak_season_rules` creates the peak-season surcharge that
+used to be hard-coded for rooms priced without a rate plan.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from bisect import bisect_right
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlmodel import Session, and_, or_, select
+
+from app.models.pricing_rule import PricingRule
+from app.models.property import Property
+from app.models.rate_plan import RatePlan
+from app.utils.enums import PricingRuleType
+from app.services.change_tracking import on_availability_change
+
+RULE_INDEX_TTL_SECONDS = 60
+
+# Mùa cao điểm trước đây được code cứng: 20/12 - 5/1 và tháng 7 - 8, +20%
+PEAK_SEASON_ADJUSTMENT_PERCENT = 20.0
+PEAK_SEASON_HORIZON_DAYS = 365
+
+ALL_WEEKDAYS = frozenset(range(7))
+
+_IndexKey = Tuple[uuid.UUID, Optional[uuid.UUID]]
+_cache: Dict[_IndexKey, Tuple[float, "RuleIndex"]] = {}
+
+
+# (min nights, max nights, min lead days, max lead days); None = unbounded
+_StayCondition = Tuple[Optional[int], Optional[int], Optional[int], Optional[int]]
+
+
+def _stay_condition(rule: PricingRule) -> Optional[_StayCondition]:
+    condition = (
+        rule.min_nights,
+        rule.max_nights,
+        rule.min_days_before_checkin,
+        rule.max_days_before_checkin,
+    )
+    return None if all(value is None for value in condition) else condition
+
+
+def _applies_to_stay(condition: _StayCondition, nights: int, lead_days: int) -> bool:
+    min_nights, max_nights, min_lead, max_lead = condition
+    return (
+        (min_nights is None or nights >= min_nights)
+        and (max_nights is None or nights <= max_nights)
+        and (min_lead is None or lead_days >= min_lead)
+        and (max_lead is None or lead_days <= max_lead)
+    )
+
+
+class RuleIndex:
+    """
+    Pricing rules of one rate plan, indexed by date segment and weekday.
+
+    Only plain values are kept, so a cached index outlives the session
+    its rules were loaded with.
+    """
+
+    def __init__(self, rules: Iterable[PricingRule]):
+        rules = [rule for rule in rules if rule.is_active]
+        self.rule_count = len(rules)
+
+        bounds: Set[int] = set()
+        for rule in rules:
+            if rule.start_date is not None:
+                bounds.add(rule.start_date.toordinal())
+            if rule.end_date is not None:
+                bounds.add(rule.end_date.toordinal() + 1)
+        # Segment i covers ordinals [bounds[i - 1], bounds[i])
+        self._bounds = sorted(bounds)
+        segments = len(self._bounds) + 1
+
+        self._static = [[1.0] * 7 for _ in range(segments)]
+        self._conditional: List[List[Tuple[int, float, frozenset]]] = [[] for _ in range(segments)]
+        self._stay_conditions: List[_StayCondition] = []
+
+        for rule in rules:
+            factor = 1 + rule.adjustment_percent / 100
+            weekdays = frozenset(rule.weekdays) if rule.weekdays else ALL_WEEKDAYS
+            first = 0 if rule.start_date is None else self._segment(rule.start_date.toordinal())
+            last = (
+                segments if rule.end_date is None
+                else self._segment(rule.end_date.toordinal() + 1)
+            )
+            condition = _stay_condition(rule)
+            if condition is not None:
+                position = len(self._stay_conditions)
+                self._stay_conditions.append(condition)
+                for segment in range(first, last):
+                    self._conditional[segment].append((position, factor, weekdays))
+            else:
+                for segment in range(first, last):
+                    multipliers = self._static[segment]
+                    for weekday in weekdays:
+                        multipliers[weekday] *= factor
+
+    def __bool__(self) -> bool:
+        return self.rule_count > 0
+
+    def _segment(self, ordinal: int) -> int:
+        return bisect_right(self._bounds, ordinal)
+
+    def _stay_matching(self, check_in: date, check_out: date, today: Optional[date]) -> List[bool]:
+        nights = (check_out - check_in).days
+        lead_days = (check_in - (today or date.today())).days
+        return [
+            _applies_to_stay(condition, nights, lead_days)
+            for condition in self._stay_conditions
+        ]
+
+    def stay_matches(
+        self,
+        check_in: date,
+        check_out: date,
+        today: Optional[date] = None,
+    ) -> Tuple[bool, ...]:
+        """Which stay-dependent rules (nights, lead time) a stay meets."""
+        return tuple(self._stay_matching(check_in, check_out, today))
+
+    def _multiplier(self, segment: int, weekday: int, matching: List[bool]) -> float:
+        multiplier = self._static[segment][weekday]
+        for position, factor, weekdays in self._conditional[segment]:
+            if matching[position] and weekday in weekdays:
+                multiplier *= factor
+        return multiplier
+
+    def multipliers(
+        self,
+        check_in: date,
+        check_out: date,
+        today: Optional[date] = None,
+    ) -> List[float]:
+        """Price multiplier of each night of a stay booked on ``today``."""
+        nights = (check_out - check_in).days
+        if not self:
+            return [1.0] * max(nights, 0)
+
+        matching = self._stay_matching(check_in, check_out, today)
+        bounds = self._bounds
+        ordinal = check_in.toordinal()
+        weekday = check_in.weekday()
+        segment = self._segment(ordinal)
+        result = []
+        for _ in range(nights):
+            while segment < len(bounds) and ordinal >= bounds[segment]:
+                segment += 1
+            result.append(self._multiplier(segment, weekday, matching))
+            ordinal += 1
+            weekday = (weekday + 1) % 7
+        return result
+
+    def night_bounds(self, start: date, end: date) -> Tuple[List[float], List[float]]:
+        """
+        Lowest and highest multiplier each night of ``[start, end)`` can get.
+
+        Stay-dependent rules may or may not apply to a given stay, so the
+        lower bound takes only their discounts and the upper bound only
+        their surcharges.
+        """
+        nights = max((end - start).days, 0)
+        if not self:
+            return [1.0] * nights, [1.0] * nights
+
+        bounds = self._bounds
+        ordinal = start.toordinal()
+        weekday = start.weekday()
+        segment = self._segment(ordinal)
+        lows: List[float] = []
+        highs: List[float] = []
+        for _ in range(nights):
+            while segment < len(bounds) and ordinal >= bounds[segment]:
+                segment += 1
+            low = high = self._static[segment][weekday]
+            for _, factor, weekdays in self._conditional[segment]:
+                if weekday not in weekdays:
+                    continue
+                if factor < 1:
+                    low *= factor
+                else:
+                    high *= factor
+            lows.append(low)
+            highs.append(high)
+            ordinal += 1
+            weekday = (weekday + 1) % 7
+        return lows, highs
+
+    def night_multipliers(
+        self,
+        nights: Iterable[date],
+        check_in: date,
+        check_out: date,
+        today: Optional[date] = None,
+    ) -> Dict[date, float]:
+        """Multipliers of selected nights of the stay ``[check_in, check_out)``."""
+        if not self:
+            return {night: 1.0 for night in nights}
+        matching = self._stay_matching(check_in, check_out, today)
+        return {
+            night: self._multiplier(self._segment(night.toordinal()), night.weekday(), matching)
+            for night in nights
+        }
+
+
+def rule_indexes(
+    session: Session,
+    keys: Iterable[_IndexKey],
+) -> Dict[_IndexKey, RuleIndex]:
+    """
+    Compiled rule indexes for ``(property_id, rate_plan_id)`` keys.
+
+    Cached entries are reused; the rest are loaded with one query.
+    """
+    now = time.monotonic()
+    found: Dict[_IndexKey, RuleIndex] = {}
+    missing: List[_IndexKey] = []
+    for key in dict.fromkeys(keys):
+        cached = _cache.get(key)
+        if cached and cached[0] > now:
+            found[key] = cached[1]
+        else:
+            missing.append(key)
+    if not missing:
+        return found
+
+    property_ids = {property_id for property_id, _ in missing}
+    rate_plan_ids = {rate_plan_id for _, rate_plan_id in missing if rate_plan_id}
+    rules = session.exec(
+        select(PricingRule).where(
+            and_(
+                PricingRule.property_id.in_(property_ids),
+                PricingRule.is_active == True,
+                or_(
+                    PricingRule.rate_plan_id.is_(None),
+                    PricingRule.rate_plan_id.in_(rate_plan_ids)
+                )
+            )
+        )
+    ).all()
+
+    expires_at = now + RULE_INDEX_TTL_SECONDS
+    for key in missing:
+        property_id, rate_plan_id = key
+        index = RuleIndex(
+            rule for rule in rules
+            if rule.property_id == property_id
+            and rule.rate_plan_id in (None, rate_plan_id)
+            and (rate_plan_id is None or rule.applies_to_rate_plans)
+        )
+        _cache[key] = (expires_at, index)
+        found[key] = index
+    return found
+
+
+def rate_plan_rules(session: Session, rate_plans: Iterable[RatePlan]) -> Dict[uuid.UUID, RuleIndex]:
+    """Compiled rule index of each rate plan, keyed by rate plan id."""
+    rate_plans = list(rate_plans)
+    indexes = rule_indexes(session, ((plan.property_id, plan.id) for plan in rate_plans))
+    return {plan.id: indexes[(plan.property_id, plan.id)] for plan in rate_plans}
+
+
+def property_rules(session: Session, property_id: uuid.UUID) -> RuleIndex:
+    """Property-wide rules, for rooms priced without a rate plan."""
+    return rule_indexes(session, [(property_id, None)])[(property_id, None)]
+
+
+def invalidate(
+    property_ids: Iterable[uuid.UUID] = (),
+    rate_plan_ids: Iterable[uuid.UUID] = (),
+) -> None:
+    """Drop cached indexes of the given properties and rate plans."""
+    property_ids = set(property_ids)
+    rate_plan_ids = set(rate_plan_ids)
+    for key in list(_cache):
+        if key[0] in property_ids or key[1] in rate_plan_ids:
+            _cache.pop(key, None)
+
+
+def _peak_seasons(year: int) -> List[Tuple[str, date, date]]:
+    """``(name, start, end)`` of the peak seasons starting in ``year`` (end inclusive)."""
+    return [
+        (f"Peak season: summer {year}", date(year, 7, 1), date(year, 8, 31)),
+        (f"Peak season: holidays {year}/{year + 1}", date(year, 12, 20), date(year + 1, 1, 5)),
+    ]
+
+
+def seed_peak_season_rules(session: Session, today: Optional[date] = None) -> int:
+    """
+    Create the default peak-season surcharge rules of every property.
+
+    Seasons overlapping the next ``PEAK_SEASON_HORIZON_DAYS`` days get a
+    property-wide +20% ``SEASONAL`` rule limited to rooms priced without a
+    rate plan, as the former hard-coded surcharge was.  Rules are matched
+    by name, so running this again only adds missing seasons; deactivate
+    a rule (``is_active``) rather than deleting it to opt out.  Returns
+    the number of rules created.
+    """
+    today = today or date.today()
+    horizon = today + timedelta(days=PEAK_SEASON_HORIZON_DAYS)
+    seasons = [
+        season
+        for year in range(today.year - 1, horizon.year + 1)
+        for season in _peak_seasons(year)
+        if season[2] >= today and season[1] <= horizon
+    ]
+    property_ids = session.exec(select(Property.id)).all()
+    if not seasons or not property_ids:
+        return 0
+
+    existing = {
+        (property_id, name)
+        for property_id, name in session.exec(
+            select(PricingRule.property_id, PricingRule.name).where(
+                and_(
+                    PricingRule.rate_plan_id.is_(None),
+                    PricingRule.name.in_([name for name, _, _ in seasons])
+                )
+            )
+        ).all()
+    }
+    created = 0
+    for property_id in property_ids:
+        for name, start, end in seasons:
+            if (property_id, name) in existing:
+                continue
+            session.add(
+                PricingRule(
+                    property_id=property_id,
+                    name=name,
+                    rule_type=PricingRuleType.SEASONAL,
+                    adjustment_percent=PEAK_SEASON_ADJUSTMENT_PERCENT,
+                    start_date=start,
+                    end_date=end,
+                    applies_to_rate_plans=False,
+                )
+            )
+            created += 1
+    if created:
+        session.commit()
+    return created
+
+
+@on_availability_change
+def _invalidate_changed_rules(changes: Dict[str, Set[uuid.UUID]]) -> None:
+    invalidate(changes.get("pricing_property_ids", ()), changes.get("rate_plan_ids", ()))
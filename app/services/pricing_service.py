@@ -4,15 +4,18 @@ Pricing Service for Hotel Booking System.
 This service handles all pricing calculations including:
 - Base room pricing
 - Guest-based pricing
-- Seasonal pricing
+- Seasonal and rule-based pricing (see app.services.pricing_rules)
 - Tax calculations
 - Discount applications
 """
 
 from datetime import date
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from decimal import Decimal, ROUND_HALF_UP
 
+from app.services.pricing_rules import RuleIndex
+from app.utils.money import Money, exact_ratio
+
 
 class PricingService:
     """Service for calculating room pricing with various factors."""
@@ -30,11 +33,16 @@ class PricingService:
         guests: int,
         room_capacity: int,
         check_in: date,
-        check_out: date
+        check_out: date,
+        lean: bool = False
     ) -> Dict[str, Any]:
         """
         Calculate comprehensive room pricing.
         
+        Amounts are computed exactly as integer fractions and rounded half
+        up to cents once, as ``Money`` (see ``app.utils.money``), so results
+        match ``Decimal`` arithmetic without its per-call overhead.
+        
         Args:
             base_price_per_night: Base price per night for the room
             nights: Number of nights
@@ -42,6 +50,8 @@ class PricingService:
             room_capacity: Maximum capacity of the room
             check_in: Check-in date
             check_out: Check-out date
+            lean: Skip the human-readable ``breakdown_summary`` (for search
+                and bulk quoting, which only need the amounts)
             
         Returns:
             Dictionary with detailed pricing breakdown
@@ -52,121 +62,106 @@ class PricingService:
         
         if nights <= 0:
             raise ValueError("Number of nights must be positive")
-            
-        # Convert to Decimal for precise calculations
-        base_price = Decimal(str(base_price_per_night))
         
-        # Calculate base room cost
-        room_total = base_price * nights
+        # Exact fractions of the price and rates
+        price_num, price_den = exact_ratio(base_price_per_night)
+        extra_num, extra_den = exact_ratio(PricingService.EXTRA_GUEST_CHARGE_RATE)
+        fee_num, fee_den = exact_ratio(PricingService.SERVICE_FEE_RATE)
+        tax_num, tax_den = exact_ratio(PricingService.TAX_RATE)
         
-        # Calculate extra guest charges
         extra_guests = max(0, guests - PricingService.BASE_GUEST_CAPACITY)
-        extra_guest_charge_per_night = base_price * Decimal(str(PricingService.EXTRA_GUEST_CHARGE_RATE))
-        extra_guest_total = extra_guest_charge_per_night * extra_guests * nights
-        
-        # Calculate subtotal
-        subtotal = room_total + extra_guest_total
-        
-        # Calculate service fee
-        service_fee = subtotal * Decimal(str(PricingService.SERVICE_FEE_RATE))
-        
-        # Calculate taxes (on subtotal + service fee)
-        taxable_amount = subtotal + service_fee
-        taxes = taxable_amount * Decimal(str(PricingService.TAX_RATE))
         
-        # Calculate final total
-        total_price = subtotal + service_fee + taxes
+        # Each amount below is a numerator over the common denominator
+        # price_den * extra_den * fee_den * tax_den, so nothing is rounded
+        # until it is converted to Money.
+        denominator = price_den * extra_den * fee_den * tax_den
+        room_total = price_num * nights * extra_den
+        extra_guest_charge_per_night = price_num * extra_num
+        extra_guest_total = extra_guest_charge_per_night * extra_guests * nights
+        subtotal = room_total + extra_guest_total              # over price_den * extra_den
+        service_fee = subtotal * fee_num                       # over ... * fee_den
+        taxes = (subtotal * fee_den + service_fee) * tax_num   # over ... * tax_den
+        fee_tax = fee_den * tax_den
         
-        # Round all amounts to 2 decimal places
-        def round_decimal(amount: Decimal) -> float:
-            return float(amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+        def money(numerator: int, scale: int = 1) -> float:
+            return float(Money.from_ratio(numerator * scale, denominator))
         
-        return {
-            "base_price_per_night": round_decimal(base_price),
+        base_price = money(price_num, extra_den * fee_tax)
+        pricing = {
+            "base_price_per_night": base_price,
             "nights": nights,
             "guests": guests,
             "room_capacity": room_capacity,
-            "room_total": round_decimal(room_total),
+            "room_total": money(room_total, fee_tax),
             "extra_guests": extra_guests,
-            "extra_guest_charge_per_night": round_decimal(extra_guest_charge_per_night),
-            "extra_guest_total": round_decimal(extra_guest_total),
-            "subtotal": round_decimal(subtotal),
+            "extra_guest_charge_per_night": money(extra_guest_charge_per_night, fee_tax),
+            "extra_guest_total": money(extra_guest_total, fee_tax),
+            "subtotal": money(subtotal, fee_tax),
             "service_fee_rate": PricingService.SERVICE_FEE_RATE,
-            "service_fee": round_decimal(service_fee),
+            "service_fee": money(service_fee, tax_den),
             "tax_rate": PricingService.TAX_RATE,
-            "taxes": round_decimal(taxes),
-            "total_price": round_decimal(total_price),
-            "breakdown_summary": {
-                "room_cost": f"${round_decimal(base_price)} × {nights} nights = ${round_decimal(room_total)}",
-                "extra_guest_cost": f"{extra_guests} extra guests × ${round_decimal(extra_guest_charge_per_night)} × {nights} nights = ${round_decimal(extra_guest_total)}" if extra_guests > 0 else "No extra guests",
-                "service_fee_desc": f"Service fee ({PricingService.SERVICE_FEE_RATE*100}%) = ${round_decimal(service_fee)}",
-                "tax_desc": f"Taxes ({PricingService.TAX_RATE*100}%) = ${round_decimal(taxes)}",
-                "total_desc": f"Total = ${round_decimal(total_price)}"
-            }
+            "taxes": money(taxes),
+            "total_price": money(subtotal * fee_tax + service_fee * tax_den + taxes),
+        }
+        if lean:
+            return pricing
+        
+        pricing["breakdown_summary"] = {
+            "room_cost": f"${base_price} × {nights} nights = ${pricing['room_total']}",
+            "extra_guest_cost": f"{extra_guests} extra guests × ${pricing['extra_guest_charge_per_night']} × {nights} nights = ${pricing['extra_guest_total']}" if extra_guests > 0 else "No extra guests",
+            "service_fee_desc": f"Service fee ({PricingService.SERVICE_FEE_RATE*100}%) = ${pricing['service_fee']}",
+            "tax_desc": f"Taxes ({PricingService.TAX_RATE*100}%) = ${pricing['taxes']}",
+            "total_desc": f"Total = ${pricing['total_price']}"
         }
+        return pricing
+    
+    @staticmethod
+    def add_fees_and_taxes(subtotal: float, currency: str = "VND") -> Money:
+        """``subtotal`` plus the service fee and taxes charged by ``calculate_room_pricing``."""
+        amount = Money.of(subtotal, currency)
+        service_fee = amount.scale(PricingService.SERVICE_FEE_RATE)
+        taxes = (amount + service_fee).scale(PricingService.TAX_RATE)
+        return amount + service_fee + taxes
     
     @staticmethod
     def apply_seasonal_pricing(
         base_pricing: Dict[str, Any],
         check_in: date,
-        check_out: date
+        check_out: date,
+        rules: Optional[RuleIndex] = None,
+        today: Optional[date] = None
     ) -> Dict[str, Any]:
         """
-        Apply seasonal pricing adjustments.
+        Apply seasonal and other rule-based pricing adjustments.
         
         Args:
             base_pricing: Base pricing calculation result
             check_in: Check-in date
             check_out: Check-out date
+            rules: Compiled pricing rules of the property / rate plan
+                (see ``app.services.pricing_rules``)
+            today: Booking date for last-minute rules (defaults to today)
             
         Returns:
-            Updated pricing with seasonal adjustments
+            Updated pricing with rule adjustments
         """
-        # Determine if dates fall in peak season
-        is_peak_season = PricingService._is_peak_season(check_in, check_out)
-        
-        if is_peak_season:
-            # Apply 20% peak season surcharge
-            peak_multiplier = Decimal('1.20')
-            original_total = Decimal(str(base_pricing['total_price']))
-            peak_surcharge = original_total * (peak_multiplier - 1)
-            new_total = original_total + peak_surcharge
-            
-            base_pricing.update({
-                'is_peak_season': True,
-                'peak_season_surcharge': float(peak_surcharge.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)),
-                'total_price': float(new_total.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)),
-                'original_total': float(original_total)
-            })
-        else:
+        multipliers = rules.multipliers(check_in, check_out, today) if rules else []
+        if not multipliers or all(multiplier == 1.0 for multiplier in multipliers):
             base_pricing.update({
-                'is_peak_season': False,
-                'peak_season_surcharge': 0.0
+                'rule_multiplier': 1.0,
+                'rule_adjustment': 0.0
             })
-            
-        return base_pricing
-    
-    @staticmethod
-    def _is_peak_season(check_in: date, check_out: date) -> bool:
-        """
-        Determine if the booking dates fall in peak season.
+            return base_pricing
         
-        Peak seasons:
-        - December 20 - January 5 (Holiday season)
-        - July 1 - August 31 (Summer season)
-        """
-        # Holiday season (Dec 20 - Jan 5)
-        for single_date in PricingService._date_range(check_in, check_out):
-            if (single_date.month == 12 and single_date.day >= 20) or \
-               (single_date.month == 1 and single_date.day <= 5) or \
-               (single_date.month in [7, 8]):  # Summer season
-                return True
-        return False
-    
-    @staticmethod
-    def _date_range(start_date: date, end_date: date):
-        """Generate date range between start and end dates."""
-        current_date = start_date
-        while current_date < end_date:
-            yield current_date
-            current_date = date.fromordinal(current_date.toordinal() + 1)
+        # Base price is the same every night, so the total scales by the average multiplier
+        average_multiplier = Decimal(str(sum(multipliers) / len(multipliers)))
+        original_total = Decimal(str(base_pricing['total_price']))
+        new_total = original_total * average_multiplier
+        
+        base_pricing.update({
+            'rule_multiplier': float(average_multiplier),
+            'rule_adjustment': float((new_total - original_total).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)),
+            'total_price': float(new_total.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)),
+            'original_total': float(original_total)
+        })
+        return base_pricing
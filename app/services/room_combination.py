@@ -0,0 +1,127 @@
+"""
+Cheapest room combinations for multi-room searches.
+
+Given a property's room types as ``(capacity, price, available)`` options
+(``price`` is the stay price of one room), these solvers pick how many
+rooms of each type to book:
+
+* :func:`cheapest_combination` - exactly ``rooms`` rooms whose total
+  capacity covers ``guests`` ("3 rooms for 7 adults").  Bounded knapsack
+  over (rooms used, guests covered); stock is split into power-of-two
+  bundles so the DP is O(options * log(rooms) * rooms * guests).
+* :func:`cheapest_assignment` - one room per party ("2 + 2 + 3 adults").
+  Rooms able to host a party form a transversal matroid with nested
+  eligibility, so taking room units cheapest-first while they can still
+  be matched to distinct parties is optimal.
+
+Both return a list of room counts aligned with ``options``, or ``None``
+when no feasible combination exists.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Tuple
+
+# (capacity, price, available) of one room type
+RoomOption = Tuple[int, float, int]
+
+_INFINITY = float("inf")
+
+
+def _bundles(options: Sequence[RoomOption], max_count: int) -> List[Tuple[int, int]]:
+    """Split each option's usable stock into power-of-two ``(option, size)`` bundles."""
+    bundles = []
+    for index, (_, _, available) in enumerate(options):
+        remaining = min(available, max_count)
+        size = 1
+        while remaining > 0:
+            take = min(size, remaining)
+            bundles.append((index, take))
+            remaining -= take
+            size *= 2
+    return bundles
+
+
+def cheapest_combination(
+    options: Sequence[RoomOption],
+    rooms: int,
+    guests: int,
+) -> Optional[List[int]]:
+    """Cheapest ``rooms`` rooms with a total capacity of at least ``guests``."""
+    if rooms <= 0 or guests < 0:
+        return None
+
+    bundles = _bundles(options, rooms)
+    # layers[b][r][g]: cheapest price using the first b bundles for r rooms
+    # covering g guests (capacity beyond ``guests`` is capped)
+    empty = [[_INFINITY] * (guests + 1) for _ in range(rooms + 1)]
+    empty[0][0] = 0.0
+    layers = [empty]
+
+    for index, size in bundles:
+        capacity, price, _ = options[index]
+        previous = layers[-1]
+        current = [row[:] for row in previous]
+        for r in range(size, rooms + 1):
+            source = previous[r - size]
+            target = current[r]
+            for g, base in enumerate(source):
+                if base == _INFINITY:
+                    continue
+                covered = min(guests, g + capacity * size)
+                candidate = base + price * size
+                if candidate < target[covered]:
+                    target[covered] = candidate
+        layers.append(current)
+
+    if layers[-1][rooms][guests] == _INFINITY:
+        return None
+
+    # Walk the layers backwards, recovering which bundles were taken
+    counts = [0] * len(options)
+    r, g = rooms, guests
+    for b in range(len(bundles), 0, -1):
+        value = layers[b][r][g]
+        if value == layers[b - 1][r][g]:
+            continue
+        index, size = bundles[b - 1]
+        capacity, price, _ = options[index]
+        source = layers[b - 1][r - size]
+        for previous_g in range(guests + 1):
+            if (
+                min(guests, previous_g + capacity * size) == g
+                and source[previous_g] + price * size == value
+            ):
+                break
+        counts[index] += size
+        r, g = r - size, previous_g
+    return counts
+
+
+def cheapest_assignment(
+    options: Sequence[RoomOption],
+    occupancies: Sequence[int],
+) -> Optional[List[int]]:
+    """Cheapest set of rooms hosting each party in ``occupancies`` in its own room."""
+    if not occupancies:
+        return None
+
+    parties = sorted(occupancies)
+    units = sorted(
+        (price, capacity, index)
+        for index, (capacity, price, available) in enumerate(options)
+        for _ in range(min(available, len(parties)))
+        if capacity >= parties[0]
+    )
+
+    counts = [0] * len(options)
+    chosen: List[int] = []  # capacities of chosen rooms, ascending
+    for price, capacity, index in units:
+        candidate = sorted(chosen + [capacity])
+        # Rooms (ascending) can take the smallest parties (ascending) one-to-one
+        if all(room >= party for room, party in zip(candidate, parties)):
+            chosen = candidate
+            counts[index] += 1
+            if len(chosen) == len(parties):
+                return counts
+    return None
@@ -0,0 +1,126 @@
+"""
+Redis-backed cache for property search results.
+
+Search results are keyed by the normalized query parameters.  Every
+cached entry is also registered in a per-property index set, so when a
+``Booking``, ``Inventory`` row, ``DailyPrice`` or ``RatePlan`` for one of
+that property's room types changes, exactly the searches that included
+the property are dropped.
+
+Pages that were narrowed with the availability summary prefilter may
+leave out properties that become eligible later, so they are also
+indexed under ``SUMMARY_SCOPE`` and dropped whenever summary rows are
+refreshed.
+
+Invalidation is driven by :mod:`app.services.change_tracking`: the
+matching cache entries are deleted once the writing transaction commits.
+Importing this module registers the subscriber.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import uuid
+from datetime import date
+from typing import Any, Dict, Iterable, Optional, Set
+
+import redis
+
+from app.core.logger import logger
+from app.core.redis import redis_main
+from app.services.change_tracking import on_availability_change
+
+SEARCH_CACHE_TTL = 300  # seconds
+SEARCH_CACHE_PREFIX = "search:v1"
+PROPERTY_INDEX_PREFIX = "search:property"
+SCOPE_INDEX_PREFIX = "search:scope"
+SUMMARY_SCOPE = "availability_summary"
+
+
+def build_search_key(scope: str, **params: Any) -> str:
+    """
+    Build a cache key from search parameters.
+
+    ``None`` values are dropped and strings are case/whitespace normalized
+    (the city filter is a case-insensitive match), so equivalent queries
+    share an entry.
+    """
+    normalized: Dict[str, Any] = {}
+    for name, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = " ".join(value.split()).lower()
+        elif isinstance(value, (date, uuid.UUID)):
+            value = str(value)
+        normalized[name] = value
+    digest = hashlib.sha1(
+        json.dumps(normalized, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f"{SEARCH_CACHE_PREFIX}:{scope}:{digest}"
+
+
+def get_cached_search(key: str) -> Optional[Dict[str, Any]]:
+    """Return a cached search result, or ``None`` on miss or Redis error."""
+    try:
+        cached = redis_main.get(key)
+    except redis.RedisError as exc:
+        logger.warning(f"Search cache read failed: {exc}")
+        return None
+    return json.loads(cached) if cached else None
+
+
+def store_search(
+    key: str,
+    result: Dict[str, Any],
+    property_ids: Iterable[uuid.UUID],
+    ttl: int = SEARCH_CACHE_TTL,
+    scopes: Iterable[str] = (),
+) -> None:
+    """
+    Cache a search result and index it under every property it covered.
+
+    ``scopes`` are extra index names (e.g. ``SUMMARY_SCOPE``) under which
+    the entry can be dropped with :func:`invalidate_scopes`.
+    """
+    index_keys = [f"{PROPERTY_INDEX_PREFIX}:{property_id}" for property_id in set(property_ids)]
+    index_keys += [f"{SCOPE_INDEX_PREFIX}:{scope}" for scope in set(scopes)]
+    try:
+        pipe = redis_main.pipeline()
+        pipe.setex(key, ttl, json.dumps(result, default=str))
+        for index_key in index_keys:
+            pipe.sadd(index_key, key)
+            # Shared index sets must outlive the longest-lived entry in them
+            pipe.expire(index_key, max(ttl, SEARCH_CACHE_TTL))
+        pipe.execute()
+    except redis.RedisError as exc:
+        logger.warning(f"Search cache write failed: {exc}")
+
+
+def _invalidate_indexes(index_keys: Iterable[str]) -> None:
+    try:
+        for index_key in set(index_keys):
+            keys = redis_main.smembers(index_key)
+            pipe = redis_main.pipeline()
+            if keys:
+                pipe.delete(*keys)
+            pipe.delete(index_key)
+            pipe.execute()
+    except redis.RedisError as exc:
+        logger.warning(f"Search cache invalidation failed: {exc}")
+
+
+def invalidate_properties(property_ids: Iterable[uuid.UUID]) -> None:
+    """Drop every cached search that included one of the given properties."""
+    _invalidate_indexes(f"{PROPERTY_INDEX_PREFIX}:{property_id}" for property_id in property_ids)
+
+
+def invalidate_scopes(scopes: Iterable[str]) -> None:
+    """Drop every cached search stored under one of the given scopes."""
+    _invalidate_indexes(f"{SCOPE_INDEX_PREFIX}:{scope}" for scope in scopes)
+
+
+@on_availability_change
+def _invalidate_changed_properties(changes: Dict[str, Set[uuid.UUID]]) -> None:
+    invalidate_properties(changes["property_ids"])
@@ -9,20 +9,42 @@ from __future__ import annotations
 
 import uuid
 from datetime import date, datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any
 from decimal import Decimal
 
+from sqlalchemy import case, distinct, tuple_
 from sqlmodel import Session, select, and_, or_, func
 from fastapi import HTTPException
 
+from app.models.amenity import Amenity, PropertyAmenity
 from app.models.property import Property
 from app.models.room_type import RoomType
-from app.models.room import Room
 from app.models.rate_plan import RatePlan
-from app.models.daily_price import DailyPrice
-from app.models.booking import Booking, BookingStatus
-from app.models.inventory import Inventory
 from app.models.organization import Organization
+from app.services.availability_engine import AvailabilityEngine, UNRESTRICTED_INVENTORY
+from app.services.availability_summary import summary_prefilter
+from app.services.room_combination import cheapest_assignment, cheapest_combination
+from app.services.search_cache import (
+    SUMMARY_SCOPE,
+    build_search_key,
+    get_cached_search,
+    store_search,
+)
+from app.utils.helpers import sliding_window_min
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.geo import (
+    cover_bounding_box,
+    haversine_km,
+    radius_bounding_box,
+    split_longitudes,
+)
+
+# Lower bounds of the price facet buckets (lowest base price per night)
+PRICE_FACET_BUCKETS = [0, 50, 100, 200, 500, 1000]
+
+FACET_CACHE_TTL = 60  # seconds
+
+STREAM_CHUNK_SIZE = 10  # properties resolved per round trip when streaming
 
 
 class SearchService:
@@ -42,79 +64,780 @@ class SearchService:
         max_price: Optional[float] = None,
         organization_id: Optional[uuid.UUID] = None,
         limit: int = 20,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Search for available properties based on criteria.
         
-        Returns properties with available room types and pricing.
+        Returns properties with available room types and pricing.  Results
+        are served from the search cache when an identical query was
+        answered recently and none of the listed properties changed since.
+        
+        Pages are ordered by property name.  Pass the returned
+        ``next_cursor`` back as ``cursor`` for keyset pagination: the next
+        page is a single index range scan and the total counted on the
+        first page is carried along instead of being recounted.
         """
-        # Base query for properties
-        query = select(Property).where(Property.is_active == True)
+        cache_key = build_search_key(
+            "properties",
+            city=city,
+            check_in=check_in,
+            check_out=check_out,
+            guests=guests,
+            property_type=property_type,
+            min_price=min_price,
+            max_price=max_price,
+            organization_id=organization_id,
+            limit=limit,
+            offset=offset,
+            cursor=cursor
+        )
+        if use_cache:
+            cached = get_cached_search(cache_key)
+            if cached is not None:
+                return cached
+        
+        filters = self._search_filters(
+            city=city,
+            check_in=check_in,
+            check_out=check_out,
+            guests=guests,
+            property_type=property_type,
+            min_price=min_price,
+            max_price=max_price,
+            organization_id=organization_id
+        )
+        
+        query = select(Property).where(*filters).order_by(Property.name, Property.id)
+        
+        if cursor:
+            # Keyset pagination: continue after the last property of the previous page
+            state = decode_cursor(cursor)
+            try:
+                last_key = (state["name"], uuid.UUID(state["id"]))
+                total = int(state["total"])
+            except (KeyError, TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid pagination cursor") from None
+            query = query.where(tuple_(Property.name, Property.id) > last_key)
+        else:
+            # Get total count for pagination (first page only)
+            total = self.session.exec(
+                select(func.count(Property.id)).where(*filters)
+            ).first()
+            query = query.offset(offset)
+        
+        # Get properties (one extra row tells whether another page exists)
+        properties = self.session.exec(query.limit(limit + 1)).all()
+        has_more = len(properties) > limit
+        properties = properties[:limit]
+        
+        # Resolve availability for the whole page in a fixed number of queries
+        available_by_property = self.get_available_room_types_bulk(
+            property_ids=[property.id for property in properties],
+            check_in=check_in,
+            check_out=check_out,
+            guests=guests,
+            min_price=min_price,
+            max_price=max_price
+        )
+        
+        results = []
+        for property in properties:
+            available_rooms = available_by_property.get(property.id, [])
+            
+            if available_rooms:  # Only include properties with available rooms
+                results.append(self._format_property_result(property, available_rooms))
+        
+        next_cursor = None
+        if has_more and properties:
+            last = properties[-1]
+            next_cursor = encode_cursor({"name": last.name, "id": last.id, "total": total})
+        
+        response = {
+            "properties": results,
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "has_more": has_more,
+            "next_cursor": next_cursor
+        }
+        
+        if use_cache:
+            store_search(
+                cache_key,
+                response,
+                [property.id for property in properties],
+                scopes=self._summary_scopes(check_in, check_out, min_price, max_price)
+            )
+        
+        return response
+    
+    def iter_search_properties(
+        self,
+        city: Optional[str] = None,
+        check_in: Optional[date] = None,
+        check_out: Optional[date] = None,
+        guests: int = 2,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        organization_id: Optional[uuid.UUID] = None,
+        limit: int = 100,
+        chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield matching properties as soon as their availability is resolved.
+        
+        Same filters and order as :meth:`search_properties`, but candidates
+        are read in keyset chunks of ``chunk_size`` and each chunk is
+        resolved and yielded before the next one is queried.  Closing the
+        generator early (e.g. on client disconnect) skips the remaining
+        work.  Stops after ``limit`` properties.
+        """
+        filters = self._search_filters(
+            city=city,
+            check_in=check_in,
+            check_out=check_out,
+            guests=guests,
+            property_type=property_type,
+            min_price=min_price,
+            max_price=max_price,
+            organization_id=organization_id
+        )
+        
+        remaining = limit
+        last_key = None
+        while remaining > 0:
+            query = select(Property).where(*filters)
+            if last_key:
+                query = query.where(tuple_(Property.name, Property.id) > last_key)
+            properties = self.session.exec(
+                query.order_by(Property.name, Property.id).limit(chunk_size)
+            ).all()
+            if not properties:
+                return
+            last_key = (properties[-1].name, properties[-1].id)
+            
+            available_by_property = self.get_available_room_types_bulk(
+                property_ids=[property.id for property in properties],
+                check_in=check_in,
+                check_out=check_out,
+                guests=guests,
+                min_price=min_price,
+                max_price=max_price
+            )
+            for property in properties:
+                available_rooms = available_by_property.get(property.id, [])
+                if available_rooms:
+                    yield self._format_property_result(property, available_rooms)
+                    remaining -= 1
+                    if remaining <= 0:
+                        return
+            
+            if len(properties) < chunk_size:
+                return
+    
+    @staticmethod
+    def _summary_scopes(
+        check_in: Optional[date],
+        check_out: Optional[date],
+        min_price: Optional[float],
+        max_price: Optional[float]
+    ) -> List[str]:
+        """Cache scopes of a search that may use the summary prefilter."""
+        if check_in and check_out and (min_price or max_price):
+            return [SUMMARY_SCOPE]
+        return []
+    
+    def _search_filters(
+        self,
+        city: Optional[str] = None,
+        check_in: Optional[date] = None,
+        check_out: Optional[date] = None,
+        guests: int = 2,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        organization_id: Optional[uuid.UUID] = None
+    ) -> List[Any]:
+        """Property-level WHERE clauses shared by search and facet counts."""
+        # Base filters for properties
+        filters = [Property.is_active == True]
         
         # Filter by organization (multi-tenancy)
         if organization_id:
-            query = query.where(Property.organization_id == organization_id)
+            filters.append(Property.organization_id == organization_id)
         
         # Filter by city
         if city:
-            query = query.where(Property.city.ilike(f"%{city}%"))
+            filters.append(Property.city.ilike(f"%{city}%"))
         
         # Filter by property type
         if property_type:
-            query = query.where(Property.property_type == property_type)
+            filters.append(Property.property_type == property_type)
         
-        # Get properties
-        properties = self.session.exec(query.offset(offset).limit(limit)).all()
+        # Push price and occupancy filters into SQL (before pagination) using
+        # the precomputed availability summary; exact pricing still runs later
+        if check_in and check_out and (min_price or max_price):
+            prefilter = summary_prefilter(
+                Property.id, check_in, check_out, guests, min_price, max_price
+            )
+            if prefilter is not None:
+                filters.append(prefilter)
+        
+        return filters
+    
+    def search_facets(
+        self,
+        city: Optional[str] = None,
+        check_in: Optional[date] = None,
+        check_out: Optional[date] = None,
+        guests: int = 2,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        organization_id: Optional[uuid.UUID] = None,
+        price_buckets: List[float] = PRICE_FACET_BUCKETS,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Filter-sidebar counts for the current search filters.
+        
+        Property type, star rating, price bucket (property's lowest rate
+        plan base price) and amenity counts come from one aggregate query:
+        the filtered properties are joined to their amenities once and
+        grouped with ``GROUPING SETS``, counting distinct properties per
+        set.  ``price_buckets`` are ascending lower bounds of the buckets.
+        """
+        cache_key = build_search_key(
+            "facets",
+            city=city,
+            check_in=check_in,
+            check_out=check_out,
+            guests=guests,
+            property_type=property_type,
+            min_price=min_price,
+            max_price=max_price,
+            organization_id=organization_id,
+            price_buckets=list(price_buckets)
+        )
+        if use_cache:
+            cached = get_cached_search(cache_key)
+            if cached is not None:
+                return cached
+        
+        filters = self._search_filters(
+            city=city,
+            check_in=check_in,
+            check_out=check_out,
+            guests=guests,
+            property_type=property_type,
+            min_price=min_price,
+            max_price=max_price,
+            organization_id=organization_id
+        )
+        
+        lowest_rate = (
+            select(func.min(RatePlan.base_price))
+            .where(RatePlan.property_id == Property.id)
+            .correlate(Property)
+            .scalar_subquery()
+        )
+        filtered = (
+            select(
+                Property.id,
+                Property.property_type,
+                Property.star_rating,
+                lowest_rate.label("lowest_rate")
+            )
+            .where(*filters)
+            .cte("filtered_properties")
+        )
+        
+        # Bucket index: number of lower bounds at or below the lowest rate
+        bucket = case(
+            *[
+                (filtered.c.lowest_rate >= bound, index)
+                for index, bound in reversed(list(enumerate(price_buckets)))
+            ],
+            else_=None
+        ).label("price_bucket")
+        
+        rows = self.session.exec(
+            select(
+                filtered.c.property_type,
+                filtered.c.star_rating,
+                bucket,
+                Amenity.id,
+                Amenity.name,
+                func.grouping(filtered.c.property_type).label("by_type"),
+                func.grouping(filtered.c.star_rating).label("by_rating"),
+                func.grouping(bucket).label("by_price"),
+                func.grouping(Amenity.id).label("by_amenity"),
+                func.count(distinct(filtered.c.id)).label("count")
+            )
+            .select_from(filtered)
+            .outerjoin(PropertyAmenity, PropertyAmenity.property_id == filtered.c.id)
+            .outerjoin(Amenity, Amenity.id == PropertyAmenity.amenity_id)
+            .group_by(
+                func.grouping_sets(
+                    tuple_(),
+                    tuple_(filtered.c.property_type),
+                    tuple_(filtered.c.star_rating),
+                    tuple_(bucket),
+                    tuple_(Amenity.id, Amenity.name)
+                )
+            )
+        ).all()
+        
+        total = 0
+        property_types, star_ratings, prices, amenities = [], [], [], []
+        for row in rows:
+            if not row.by_type:
+                property_types.append({"type": row.property_type, "count": row.count})
+            elif not row.by_rating:
+                if row.star_rating is not None:
+                    star_ratings.append({"star_rating": row.star_rating, "count": row.count})
+            elif not row.by_price:
+                if row.price_bucket is not None:
+                    index = row.price_bucket
+                    prices.append({
+                        "min_price": price_buckets[index],
+                        "max_price": price_buckets[index + 1] if index + 1 < len(price_buckets) else None,
+                        "count": row.count
+                    })
+            elif not row.by_amenity:
+                if row.id is not None:
+                    amenities.append({"id": row.id, "name": row.name, "count": row.count})
+            else:
+                total = row.count
+        
+        response = {
+            "total": total,
+            "property_types": sorted(property_types, key=lambda item: -item["count"]),
+            "star_ratings": sorted(star_ratings, key=lambda item: -item["star_rating"]),
+            "price_ranges": sorted(prices, key=lambda item: item["min_price"]),
+            "amenities": sorted(amenities, key=lambda item: (-item["count"], item["name"]))
+        }
+        
+        if use_cache:
+            # Not tied to individual properties; a short TTL keeps counts fresh
+            store_search(
+                cache_key,
+                response,
+                [],
+                ttl=FACET_CACHE_TTL,
+                scopes=self._summary_scopes(check_in, check_out, min_price, max_price)
+            )
+        
+        return response
+    
+    def search_flexible_dates(
+        self,
+        earliest_check_in: date,
+        latest_check_in: date,
+        nights: int,
+        city: Optional[str] = None,
+        guests: int = 2,
+        property_type: Optional[str] = None,
+        organization_id: Optional[uuid.UUID] = None,
+        check_in_weekdays: Optional[List[int]] = None,
+        windows_per_property: int = 3,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Find the cheapest stays of ``nights`` nights starting in a date range.
+        
+        ``check_in_weekdays`` (0=Monday … 6=Sunday) restricts start days, e.g.
+        ``[4]`` with ``nights=2`` searches every weekend.  Per-night
+        availability and prices for the whole span are loaded once; each
+        candidate window is then scored with a sliding-window minimum over
+        availability and prefix sums over prices, so no query runs per
+        window.  Returns the best ``windows_per_property`` windows for each
+        property, cheapest first.
+        """
+        if nights <= 0 or latest_check_in < earliest_check_in:
+            raise HTTPException(status_code=400, detail="Invalid date range")
+        
+        filters = self._search_filters(
+            city=city,
+            property_type=property_type,
+            organization_id=organization_id
+        )
+        
+        properties = self.session.exec(
+            select(Property).where(*filters)
+            .order_by(Property.name, Property.id)
+            .offset(offset).limit(limit)
+        ).all()
+        if not properties:
+            return {"properties": [], "nights": nights, "limit": limit, "offset": offset}
+        
+        room_types = self.session.exec(
+            select(RoomType).where(
+                and_(
+                    RoomType.property_id.in_([property.id for property in properties]),
+                    RoomType.is_active == True,
+                    RoomType.max_occupancy >= guests
+                )
+            )
+        ).all()
+        
+        span_start = earliest_check_in
+        span_end = latest_check_in + timedelta(days=nights)
+        engine = AvailabilityEngine(self.session)
+        room_type_ids = [room_type.id for room_type in room_types]
+        availability = engine.nightly_availability(room_type_ids, span_start, span_end)
+        rate_plans = engine.rate_plans(room_type_ids)
+        default_plans = {rt_id: plans[0] for rt_id, plans in rate_plans.items() if plans}
+        prices = engine.nightly_prices(list(default_plans.values()), span_start, span_end)
+        
+        window_count = (latest_check_in - earliest_check_in).days + 1
+        start_days = [
+            i for i in range(window_count)
+            if check_in_weekdays is None
+            or (earliest_check_in + timedelta(days=i)).weekday() in check_in_weekdays
+        ]
+        
+        # Cheapest room type for each candidate window, per property
+        best: Dict[uuid.UUID, Dict[int, Dict[str, Any]]] = {}
+        for room_type in room_types:
+            plan = default_plans.get(room_type.id)
+            if plan is None:
+                continue
+            window_min = sliding_window_min(availability[room_type.id], nights)
+            totals = prices[plan.id].window_totals(nights)
+            for i in start_days:
+                if window_min[i] <= 0:
+                    continue
+                total_price = totals[i]
+                current = best.setdefault(room_type.property_id, {}).get(i)
+                if current is None or total_price < current["total_price"]:
+                    best[room_type.property_id][i] = {
+                        "check_in": earliest_check_in + timedelta(days=i),
+                        "check_out": earliest_check_in + timedelta(days=i + nights),
+                        "total_price": total_price,
+                        "avg_price_per_night": total_price / nights,
+                        "currency": plan.currency,
+                        "room_type_id": room_type.id,
+                        "room_type_name": room_type.name,
+                        "available_count": window_min[i]
+                    }
         
         results = []
         for property in properties:
-            # Get available room types for this property
-            available_rooms = self.get_available_room_types(
-                property_id=property.id,
+            windows = sorted(
+                best.get(property.id, {}).values(),
+                key=lambda window: (window["total_price"], window["check_in"])
+            )[:windows_per_property]
+            if not windows:
+                continue
+            results.append({
+                "id": property.id,
+                "name": property.name,
+                "city": property.city,
+                "country": property.country,
+                "property_type": property.property_type,
+                "star_rating": property.star_rating,
+                "main_image_url": property.main_image_url,
+                "best_windows": windows,
+                "min_price": windows[0]["total_price"],
+                "currency": property.currency
+            })
+        
+        return {"properties": results, "nights": nights, "limit": limit, "offset": offset}
+    
+    def search_multi_room(
+        self,
+        check_in: date,
+        check_out: date,
+        rooms: int,
+        guests: Optional[int] = None,
+        occupancies: Optional[List[int]] = None,
+        city: Optional[str] = None,
+        property_type: Optional[str] = None,
+        organization_id: Optional[uuid.UUID] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Search for properties that can host a party across several rooms.
+        
+        Either ``guests`` in total over ``rooms`` rooms, or ``occupancies``
+        listing the guests of each room.  For every property the cheapest
+        feasible set of room types (within available inventory) is found
+        with :mod:`app.services.room_combination`; properties without one
+        are left out.
+        """
+        if occupancies:
+            rooms = len(occupancies)
+        elif not guests:
+            raise HTTPException(status_code=400, detail="Either guests or occupancies is required")
+        
+        filters = self._search_filters(
+            city=city,
+            property_type=property_type,
+            organization_id=organization_id
+        )
+        properties = self.session.exec(
+            select(Property).where(*filters)
+            .order_by(Property.name, Property.id)
+            .offset(offset).limit(limit)
+        ).all()
+        
+        room_types = self.session.exec(
+            select(RoomType).where(
+                and_(
+                    RoomType.property_id.in_([property.id for property in properties]),
+                    RoomType.is_active == True
+                )
+            )
+        ).all() if properties else []
+        evaluated = AvailabilityEngine(self.session).evaluate(
+            [room_type.id for room_type in room_types], check_in, check_out
+        )
+        
+        # Room types without a rate plan have no price (0.0) and would always win
+        room_types_by_property: Dict[uuid.UUID, List[RoomType]] = {}
+        for room_type in room_types:
+            if (
+                evaluated[room_type.id]["available_count"] > 0
+                and evaluated[room_type.id]["pricing"]["rate_plans"]
+            ):
+                room_types_by_property.setdefault(room_type.property_id, []).append(room_type)
+        
+        results = []
+        for property in properties:
+            candidates = room_types_by_property.get(property.id, [])
+            options = [
+                (
+                    room_type.max_occupancy,
+                    evaluated[room_type.id]["pricing"]["total_price"],
+                    evaluated[room_type.id]["available_count"]
+                )
+                for room_type in candidates
+            ]
+            if occupancies:
+                counts = cheapest_assignment(options, occupancies)
+            else:
+                counts = cheapest_combination(options, rooms, guests)
+            if not counts:
+                continue
+            
+            combination = []
+            for room_type, count in zip(candidates, counts):
+                if not count:
+                    continue
+                pricing = evaluated[room_type.id]["pricing"]
+                combination.append({
+                    "room_type_id": room_type.id,
+                    "name": room_type.name,
+                    "max_occupancy": room_type.max_occupancy,
+                    "rooms": count,
+                    "price_per_room": pricing["total_price"],
+                    "price": pricing["total_price"] * count,
+                    "currency": pricing["currency"]
+                })
+            results.append({
+                "id": property.id,
+                "name": property.name,
+                "location": property.address,
+                "city": property.city,
+                "country": property.country,
+                "property_type": property.property_type,
+                "star_rating": property.star_rating,
+                "main_image_url": property.main_image_url,
+                "room_combination": combination,
+                "total_price": sum(item["price"] for item in combination),
+                "currency": property.currency
+            })
+        
+        return {
+            "properties": results,
+            "rooms": rooms,
+            "guests": sum(occupancies) if occupancies else guests,
+            "limit": limit,
+            "offset": offset
+        }
+    
+    def search_nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float = 10.0,
+        check_in: Optional[date] = None,
+        check_out: Optional[date] = None,
+        guests: int = 2,
+        property_type: Optional[str] = None,
+        organization_id: Optional[uuid.UUID] = None,
+        limit: int = 20
+    ) -> Dict[str, Any]:
+        """
+        Find properties within ``radius_km`` of a point, nearest first.
+        
+        Candidates come from geohash prefix scans covering the circle's
+        bounding box; exact distances are then computed only for those.
+        When dates are given, properties are resolved in distance order
+        until ``limit`` available ones are found.
+        """
+        south, west, north, east = radius_bounding_box(latitude, longitude, radius_km)
+        candidates = self.session.exec(
+            self._geo_query(
+                select(Property.id, Property.latitude, Property.longitude),
+                south, west, north, east, property_type, organization_id
+            )
+        ).all()
+        
+        ranked = sorted(
+            (distance, property_id)
+            for property_id, distance in (
+                (pid, haversine_km(latitude, longitude, lat, lng))
+                for pid, lat, lng in candidates
+            )
+            if distance <= radius_km
+        )
+        
+        results = []
+        for start in range(0, len(ranked), limit):
+            chunk = ranked[start:start + limit]
+            properties = {
+                p.id: p for p in self.session.exec(
+                    select(Property).where(Property.id.in_([pid for _, pid in chunk]))
+                ).all()
+            }
+            available_by_property = self.get_available_room_types_bulk(
+                property_ids=list(properties),
                 check_in=check_in,
                 check_out=check_out,
-                guests=guests,
-                min_price=min_price,
-                max_price=max_price
+                guests=guests
             )
-            
-            if available_rooms:  # Only include properties with available rooms
-                property_data = {
-                    "id": property.id,
-                    "name": property.name,
-                    "location": property.location,
-                    "city": property.city,
-                    "country": property.country,
-                    "property_type": property.property_type,
-                    "star_rating": property.star_rating,
-                    "main_image_url": property.main_image_url,
-                    "description": property.description,
-                    "available_room_types": available_rooms,
-                    "min_price": min(room["price"] for room in available_rooms),
-                    "currency": property.currency
-                }
+            for distance, property_id in chunk:
+                available_rooms = available_by_property.get(property_id, [])
+                if not available_rooms:
+                    continue
+                property_data = self._format_property_result(
+                    properties[property_id], available_rooms
+                )
+                property_data["distance_km"] = round(distance, 3)
                 results.append(property_data)
+                if len(results) >= limit:
+                    break
+            if len(results) >= limit:
+                break
+        
+        return {
+            "properties": results,
+            "center": {"latitude": latitude, "longitude": longitude},
+            "radius_km": radius_km,
+            "candidates": len(ranked)
+        }
+    
+    def search_in_bounds(
+        self,
+        south: float,
+        west: float,
+        north: float,
+        east: float,
+        property_type: Optional[str] = None,
+        organization_id: Optional[uuid.UUID] = None,
+        limit: int = 200
+    ) -> Dict[str, Any]:
+        """
+        List properties inside a map viewport.
+        
+        ``west > east`` denotes a viewport crossing the antimeridian.
+        Returns lightweight marker data; ``truncated`` is set when more
+        than ``limit`` properties fall inside the viewport.
+        """
+        properties = self.session.exec(
+            self._geo_query(
+                select(Property), south, west, north, east, property_type, organization_id
+            )
+            .order_by(Property.star_rating.desc().nulls_last(), Property.id)
+            .limit(limit + 1)
+        ).all()
+        
+        markers = [
+            {
+                "id": property.id,
+                "name": property.name,
+                "latitude": property.latitude,
+                "longitude": property.longitude,
+                "city": property.city,
+                "property_type": property.property_type,
+                "star_rating": property.star_rating,
+                "main_image_url": property.main_image_url,
+                "currency": property.currency
+            }
+            for property in properties[:limit]
+        ]
         
-        # Get total count for pagination
-        total_query = select(func.count(Property.id)).where(
-            Property.is_active == True
+        return {
+            "properties": markers,
+            "bounds": {"south": south, "west": west, "north": north, "east": east},
+            "truncated": len(properties) > limit
+        }
+    
+    def _geo_query(
+        self,
+        query,
+        south: float,
+        west: float,
+        north: float,
+        east: float,
+        property_type: Optional[str] = None,
+        organization_id: Optional[uuid.UUID] = None
+    ):
+        """Restrict a property query to a bounding box using the geohash index."""
+        query = query.where(
+            and_(
+                Property.is_active == True,
+                Property.latitude.between(south, north),
+                or_(*[
+                    Property.longitude.between(span_west, span_east)
+                    for span_west, span_east in split_longitudes(west, east)
+                ])
+            )
         )
-        if organization_id:
-            total_query = total_query.where(Property.organization_id == organization_id)
-        if city:
-            total_query = total_query.where(Property.city.ilike(f"%{city}%"))
-        if property_type:
-            total_query = total_query.where(Property.property_type == property_type)
         
-        total = self.session.exec(total_query).first()
+        prefixes = cover_bounding_box(south, west, north, east)
+        if prefixes:
+            # Rows not yet backfilled (geohash NULL) fall back to the lat/lng box
+            query = query.where(
+                or_(
+                    Property.geohash.is_(None),
+                    *[Property.geohash.like(f"{prefix}%") for prefix in prefixes]
+                )
+            )
         
+        if organization_id:
+            query = query.where(Property.organization_id == organization_id)
+        if property_type:
+            query = query.where(Property.property_type == property_type)
+        return query
+    
+    def _format_property_result(
+        self,
+        property: Property,
+        available_rooms: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Format a property with its available room types for search results."""
         return {
-            "properties": results,
-            "total": total,
-            "limit": limit,
-            "offset": offset,
-            "has_more": offset + limit < total
+            "id": property.id,
+            "name": property.name,
+            "location": property.address,
+            "city": property.city,
+            "country": property.country,
+            "property_type": property.property_type,
+            "star_rating": property.star_rating,
+            "main_image_url": property.main_image_url,
+            "description": property.description,
+            "available_room_types": available_rooms,
+            "min_price": min(room["price"] for room in available_rooms),
+            "currency": property.currency
         }
     
     def get_available_room_types(
@@ -127,35 +850,57 @@ class SearchService:
         max_price: Optional[float] = None
     ) -> List[Dict[str, Any]]:
         """Get available room types for a property with pricing."""
+        return self.get_available_room_types_bulk(
+            property_ids=[property_id],
+            check_in=check_in,
+            check_out=check_out,
+            guests=guests,
+            min_price=min_price,
+            max_price=max_price
+        ).get(property_id, [])
+    
+    def get_available_room_types_bulk(
+        self,
+        property_ids: List[uuid.UUID],
+        check_in: Optional[date] = None,
+        check_out: Optional[date] = None,
+        guests: int = 2,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None
+    ) -> Dict[uuid.UUID, List[Dict[str, Any]]]:
+        """
+        Get available room types with pricing for many properties at once.
         
-        # Get room types for this property
+        Availability and pricing for every candidate room type are resolved
+        by ``AvailabilityEngine`` in a fixed number of grouped queries.
+        """
+        if not property_ids:
+            return {}
+        
+        # Get candidate room types for all properties
         room_types = self.session.exec(
             select(RoomType).where(
                 and_(
-                    RoomType.property_id == property_id,
+                    RoomType.property_id.in_(property_ids),
                     RoomType.is_active == True,
                     RoomType.max_occupancy >= guests
                 )
             )
         ).all()
         
-        available_room_types = []
+        evaluated = AvailabilityEngine(self.session).evaluate(
+            [room_type.id for room_type in room_types], check_in, check_out
+        )
+        
+        available_by_property: Dict[uuid.UUID, List[Dict[str, Any]]] = {}
         
         for room_type in room_types:
-            # Check availability if dates provided
-            if check_in and check_out:
-                available_count = self.get_room_type_availability(
-                    room_type.id, check_in, check_out
-                )
-                if available_count <= 0:
-                    continue
-            else:
-                available_count = self.get_total_rooms_for_type(room_type.id)
+            available_count = evaluated[room_type.id]["available_count"]
+            pricing = evaluated[room_type.id]["pricing"]
             
-            # Get pricing
-            pricing = self.calculate_room_type_pricing(
-                room_type.id, check_in, check_out
-            )
+            # Check availability if dates provided
+            if check_in and check_out and available_count <= 0:
+                continue
             
             # Apply price filters
             if min_price and pricing["total_price"] < min_price:
@@ -175,9 +920,9 @@ class SearchService:
                 "nights": pricing["nights"],
                 "rate_plans": pricing["rate_plans"]
             }
-            available_room_types.append(room_type_data)
+            available_by_property.setdefault(room_type.property_id, []).append(room_type_data)
         
-        return available_room_types
+        return available_by_property
     
     def get_room_type_availability(
         self,
@@ -186,42 +931,13 @@ class SearchService:
         check_out: date
     ) -> int:
         """Check how many rooms of this type are available for the date range."""
-        
-        # Get total rooms of this type
-        total_rooms = self.get_total_rooms_for_type(room_type_id)
-        
-        # Get booked rooms for the date range
-        booked_rooms = self.session.exec(
-            select(func.count(Booking.id)).where(
-                and_(
-                    Booking.room_type_id == room_type_id,
-                    Booking.status.in_([BookingStatus.CONFIRMED, BookingStatus.PENDING]),
-                    or_(
-                        and_(Booking.check_in <= check_in, Booking.check_out > check_in),
-                        and_(Booking.check_in < check_out, Booking.check_out >= check_out),
-                        and_(Booking.check_in >= check_in, Booking.check_out <= check_out)
-                    )
-                )
-            )
-        ).first() or 0
-        
-        # Check inventory restrictions if any
-        inventory_available = self.check_inventory_availability(
-            room_type_id, check_in, check_out
-        )
-        
-        return min(total_rooms - booked_rooms, inventory_available)
+        return AvailabilityEngine(self.session).evaluate(
+            [room_type_id], check_in, check_out
+        )[room_type_id]["available_count"]
     
     def get_total_rooms_for_type(self, room_type_id: uuid.UUID) -> int:
         """Get total number of rooms for a room type."""
-        return self.session.exec(
-            select(func.count(Room.id)).where(
-                and_(
-                    Room.room_type_id == room_type_id,
-                    Room.is_active == True
-                )
-            )
-        ).first() or 0
+        return AvailabilityEngine(self.session).total_rooms([room_type_id]).get(room_type_id, 0)
     
     def check_inventory_availability(
         self,
@@ -230,24 +946,9 @@ class SearchService:
         check_out: date
     ) -> int:
         """Check inventory-based availability restrictions."""
-        
-        # Get inventory records for the date range
-        inventory_records = self.session.exec(
-            select(Inventory).where(
-                and_(
-                    Inventory.room_type_id == room_type_id,
-                    Inventory.date >= check_in,
-                    Inventory.date < check_out
-                )
-            )
-        ).all()
-        
-        if not inventory_records:
-            # No inventory restrictions, return large number
-            return 999
-        
-        # Return minimum available across all dates
-        return min(record.available_rooms for record in inventory_records)
+        return AvailabilityEngine(self.session).inventory_minimums(
+            [room_type_id], check_in, check_out
+        ).get(room_type_id, UNRESTRICTED_INVENTORY)
     
     def calculate_room_type_pricing(
         self,
@@ -256,87 +957,9 @@ class SearchService:
         check_out: Optional[date] = None
     ) -> Dict[str, Any]:
         """Calculate pricing for a room type over a date range."""
-        
-        # Get rate plans for this room type
-        rate_plans = self.session.exec(
-            select(RatePlan).where(RatePlan.room_type_id == room_type_id)
-        ).all()
-        
-        if not rate_plans:
-            return {
-                "total_price": 0.0,
-                "avg_price_per_night": 0.0,
-                "currency": "USD",
-                "nights": 0,
-                "rate_plans": []
-            }
-        
-        # Use the first rate plan as default (could be enhanced to select best rate)
-        default_rate_plan = rate_plans[0]
-        
-        if not check_in or not check_out:
-            return {
-                "total_price": float(default_rate_plan.base_price),
-                "avg_price_per_night": float(default_rate_plan.base_price),
-                "currency": default_rate_plan.currency,
-                "nights": 1,
-                "rate_plans": [self._format_rate_plan(default_rate_plan)]
-            }
-        
-        # Calculate nights
-        nights = (check_out - check_in).days
-        if nights <= 0:
-            raise HTTPException(status_code=400, detail="Invalid date range")
-        
-        # Get daily prices if available
-        daily_prices = self.session.exec(
-            select(DailyPrice).where(
-                and_(
-                    DailyPrice.rate_plan_id == default_rate_plan.id,
-                    DailyPrice.date >= check_in,
-                    DailyPrice.date < check_out
-                )
-            )
-        ).all()
-        
-        # Calculate total price
-        total_price = 0.0
-        current_date = check_in
-        
-        while current_date < check_out:
-            # Check if there's a daily price for this date
-            daily_price = next(
-                (dp for dp in daily_prices if dp.date == current_date),
-                None
-            )
-            
-            if daily_price:
-                total_price += float(daily_price.price)
-            else:
-                total_price += float(default_rate_plan.base_price)
-            
-            current_date += timedelta(days=1)
-        
-        avg_price_per_night = total_price / nights
-        
-        return {
-            "total_price": total_price,
-            "avg_price_per_night": avg_price_per_night,
-            "currency": default_rate_plan.currency,
-            "nights": nights,
-            "rate_plans": [self._format_rate_plan(rp) for rp in rate_plans]
-        }
-    
-    def _format_rate_plan(self, rate_plan: RatePlan) -> Dict[str, Any]:
-        """Format rate plan for API response."""
-        return {
-            "id": rate_plan.id,
-            "name": rate_plan.name,
-            "base_price": float(rate_plan.base_price),
-            "currency": rate_plan.currency,
-            "is_refundable": rate_plan.is_refundable,
-            "cancellation_policy": rate_plan.cancellation_policy
-        }
+        return AvailabilityEngine(self.session).evaluate(
+            [room_type_id], check_in, check_out
+        )[room_type_id]["pricing"]
     
     def get_property_details(
         self,
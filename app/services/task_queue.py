@@ -16,3 +16,10 @@ def enqueue_invoice(to: str, booking_id: str, amount: float, transaction_code: s
         celery.send_task("tasks.send_invoice", args=[to, booking_id, amount, transaction_code])
     else:
         celery.send_task("tasks.send_invoice", args=[to, booking_id, amount])
+
+
+def enqueue_summary_rebuild():
+    """
+    Enqueue a full rebuild of the availability summary.
+    """
+    celery.send_task("tasks.rebuild_availability_summary")
@@ -0,0 +1,67 @@
+"""
+Optimistic concurrency for versioned models.
+
+Models whose ``version`` column is their mapper's ``version_id_col``
+(``Booking``, ``Inventory``) are written by the ORM as a compare-and-swap
+``UPDATE ... SET version = :old + 1 WHERE id = :id AND version = :old``.
+If another transaction changed the row since it was loaded, no row
+matches and the flush raises ``StaleDataError``, which
+:func:`conflict_on_stale` turns into a 409.  Set-based UPDATEs on these
+tables bump ``version`` themselves.
+
+Clients send the version they last read in an ``If-Match`` header so
+edits based on a stale copy are rejected as well.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import Column, Integer
+from sqlalchemy.orm.exc import StaleDataError
+from sqlmodel import Session
+
+
+def version_column() -> Column:
+    """Column to declare as both the ``version`` field and ``version_id_col``."""
+    return Column("version", Integer, nullable=False, server_default="1")
+
+
+def parse_if_match(value: Optional[str]) -> Optional[int]:
+    """Version from an ``If-Match`` header (``3``, ``"3"`` or ``W/"3"``)."""
+    if value is None:
+        return None
+    tag = value.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    try:
+        return int(tag.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="If-Match must be a version number") from None
+
+
+def check_version(instance: Any, expected_version: Optional[int]) -> None:
+    """Raise 409 if the client's ``expected_version`` is not the current one."""
+    if expected_version is not None and instance.version != expected_version:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "message": f"{type(instance).__name__} was modified by another request",
+                "current_version": instance.version,
+            }
+        )
+
+
+@contextmanager
+def conflict_on_stale(session: Session, name: str) -> Iterator[None]:
+    """Roll back and raise 409 if a versioned UPDATE inside the block lost the race."""
+    try:
+        yield
+    except StaleDataError:
+        session.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail=f"{name} was modified by another request, reload and try again"
+        ) from None
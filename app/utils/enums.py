@@ -19,10 +19,18 @@ class BookingStatus(str, Enum):
     PENDING = "PENDING"
     HOLD = "HOLD"
     CONFIRMED = "CONFIRMED"
+    COMPLETED = "COMPLETED"
     CANCELLED = "CANCELLED"
     EXPIRED = "EXPIRED"
 
 
+class PricingRuleType(str, Enum):
+    SEASONAL = "SEASONAL"              # theo khoảng ngày (mùa cao điểm, lễ tết)
+    DAY_OF_WEEK = "DAY_OF_WEEK"        # theo thứ trong tuần (cuối tuần)
+    LENGTH_OF_STAY = "LENGTH_OF_STAY"  # theo số đêm lưu trú
+    LAST_MINUTE = "LAST_MINUTE"        # theo số ngày đặt trước check-in
+
+
 class PaymentStatus(str, Enum):
     PENDING = "PENDING"
     SUCCESS = "SUCCESS"
@@ -0,0 +1,150 @@
+"""
+Geohash helpers for spatial property search.
+
+Properties store a geohash of their coordinates.  Because nearby points
+share geohash prefixes, a radius or map-viewport query becomes a handful
+of ``geohash LIKE 'prefix%'`` range scans on a B-tree index, followed by
+an exact distance check on the (small) candidate set.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import List, Optional, Tuple
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9  # ~5 m cells, plenty for hotels
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+# Upper bound on the number of prefixes used to cover a search area
+MAX_COVER_CELLS = 32
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Encode a coordinate as a geohash string."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # even bits encode longitude
+
+    while len(chars) < precision:
+        rng, value = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """Return ``(lat_degrees, lng_degrees)`` covered by one cell at a precision."""
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two coordinates in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lambda = math.radians(lng2 - lng1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def radius_bounding_box(
+    latitude: float, longitude: float, radius_km: float
+) -> Tuple[float, float, float, float]:
+    """
+    Bounding box ``(south, west, north, east)`` enclosing a circle.
+
+    Longitudes are not normalized, so ``west > east`` never happens here;
+    values outside [-180, 180] are folded by :func:`split_longitudes`.
+    """
+    d_lat = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    d_lng = min(radius_km / (KM_PER_DEGREE_LAT * cos_lat), 180.0)
+    return (
+        max(latitude - d_lat, -90.0),
+        longitude - d_lng,
+        min(latitude + d_lat, 90.0),
+        longitude + d_lng,
+    )
+
+
+def split_longitudes(west: float, east: float) -> List[Tuple[float, float]]:
+    """Split a longitude span into ranges inside [-180, 180]."""
+    if east - west >= 360.0:
+        return [(-180.0, 180.0)]
+    if west > east:  # viewport crossing the antimeridian
+        return [(west, 180.0), (-180.0, east)]
+    if west < -180.0:
+        return [(west + 360.0, 180.0), (-180.0, east)]
+    if east > 180.0:
+        return [(west, 180.0), (-180.0, east - 360.0)]
+    return [(west, east)]
+
+
+def _cells_for_span(start: float, end: float, origin: float, size: float) -> range:
+    first = int(math.floor((start - origin) / size))
+    last = int(math.floor((min(end, -origin) - origin) / size - 1e-12))
+    return range(first, max(first, last) + 1)
+
+
+def cover_bounding_box(
+    south: float,
+    west: float,
+    north: float,
+    east: float,
+    max_cells: int = MAX_COVER_CELLS,
+) -> Optional[List[str]]:
+    """
+    Geohash prefixes whose cells together cover a bounding box.
+
+    Picks the finest precision that needs at most ``max_cells`` prefixes.
+    Returns ``None`` when even single-character cells would exceed the
+    budget, in which case callers should fall back to plain lat/lng
+    range filtering.
+    """
+    south, north = max(south, -90.0), min(north, 90.0)
+    lng_spans = split_longitudes(west, east)
+
+    best: Optional[List[str]] = None
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        lat_size, lng_size = cell_size(precision)
+        lat_cells = _cells_for_span(south, north, -90.0, lat_size)
+        lng_cells = [
+            index
+            for span_west, span_east in lng_spans
+            for index in _cells_for_span(span_west, span_east, -180.0, lng_size)
+        ]
+        if len(lat_cells) * len(lng_cells) > max_cells:
+            break
+        best = sorted({
+            encode_geohash(
+                -90.0 + (i + 0.5) * lat_size,
+                -180.0 + (j + 0.5) * lng_size,
+                precision,
+            )
+            for i in lat_cells
+            for j in lng_cells
+        })
+    return best
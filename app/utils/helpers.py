@@ -1,4 +1,25 @@
+from collections import deque
 from datetime import date
 
 def nights_between(check_in: date, check_out: date) -> int:
     return (check_out - check_in).days
+
+
+def sliding_window_min(values: list, width: int) -> list:
+    """
+    Minimum of every contiguous window of ``width`` values, in O(n).
+
+    Uses a monotonic deque of indices; ``result[i]`` is ``min(values[i:i + width])``.
+    """
+    window: deque = deque()
+    result = []
+    for i, value in enumerate(values):
+        while window and values[window[-1]] >= value:
+            window.pop()
+        window.append(i)
+        if window[0] <= i - width:
+            window.popleft()
+        if i >= width - 1:
+            result.append(values[window[0]])
+    return result
+
@@ -0,0 +1,88 @@
+"""
+Exact money amounts as integer minor units (cents).
+
+Prices are stored as floats, so every conversion goes through
+``Decimal(str(value))`` once to recover the written value exactly; after
+that, arithmetic is on Python ints and rounding is an explicit half-up
+integer division.  This gives the same results as ``Decimal`` arithmetic
+followed by ``quantize(Decimal("0.01"), ROUND_HALF_UP)``, without
+creating ``Decimal`` objects on the hot path.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal
+from functools import lru_cache
+from typing import Tuple, Union
+
+MINOR_UNITS = 100  # minor units per major unit (2 decimal places)
+
+Number = Union[int, float, str, Decimal]
+
+
+@lru_cache(maxsize=4096)
+def exact_ratio(value: Number) -> Tuple[int, int]:
+    """``value`` as an exact ``(numerator, denominator)`` pair, floats read as written."""
+    return Decimal(str(value)).as_integer_ratio()
+
+
+def round_half_up(numerator: int, denominator: int) -> int:
+    """``numerator / denominator`` rounded half away from zero (``denominator > 0``)."""
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if 2 * remainder >= denominator:
+        quotient += 1
+    return quotient if numerator >= 0 else -quotient
+
+
+@dataclass(frozen=True, slots=True)
+class Money:
+    """An amount in integer minor units of ``currency``."""
+
+    minor: int
+    currency: str = "VND"
+
+    @classmethod
+    def of(cls, amount: Number, currency: str = "VND") -> "Money":
+        """Money for a major-unit amount, rounded half up to the minor unit."""
+        numerator, denominator = exact_ratio(amount)
+        return cls(round_half_up(numerator * MINOR_UNITS, denominator), currency)
+
+    @classmethod
+    def from_ratio(cls, numerator: int, denominator: int, currency: str = "VND") -> "Money":
+        """Money for the exact major-unit amount ``numerator / denominator``."""
+        return cls(round_half_up(numerator * MINOR_UNITS, denominator), currency)
+
+    def _check(self, other: "Money") -> None:
+        if other.currency != self.currency:
+            raise ValueError(f"Currency mismatch: {self.currency} and {other.currency}")
+
+    def __add__(self, other: "Money") -> "Money":
+        self._check(other)
+        return Money(self.minor + other.minor, self.currency)
+
+    def __sub__(self, other: "Money") -> "Money":
+        self._check(other)
+        return Money(self.minor - other.minor, self.currency)
+
+    def __neg__(self) -> "Money":
+        return Money(-self.minor, self.currency)
+
+    def __mul__(self, factor: int) -> "Money":
+        return Money(self.minor * factor, self.currency)
+
+    __rmul__ = __mul__
+
+    def scale(self, rate: Number) -> "Money":
+        """This amount times ``rate`` (e.g. a tax rate), rounded half up."""
+        numerator, denominator = exact_ratio(rate)
+        return Money(round_half_up(self.minor * numerator, denominator), self.currency)
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.minor).scaleb(-2)
+
+    def __float__(self) -> float:
+        return self.minor / MINOR_UNITS
+
+    def __str__(self) -> str:
+        return str(self.to_decimal())
@@ -0,0 +1,33 @@
+"""
+Opaque cursors for keyset pagination.
+
+A cursor carries the sort key of the last row on a page (plus any state
+worth reusing, such as the total counted on the first page) as
+URL-safe base64 JSON.  Clients treat it as an opaque token and pass it
+back to get the next page, so deep pages cost the same as the first one.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Dict
+
+from fastapi import HTTPException
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    """Serialize pagination state into an opaque cursor."""
+    raw = json.dumps(state, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Parse a cursor produced by :func:`encode_cursor`; 400 if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor") from None
+    if not isinstance(state, dict):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return state
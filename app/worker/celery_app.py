@@ -13,4 +13,39 @@ celery.conf.update(
     enable_utc=True,
 )
 
+celery.conf.beat_schedule = {
+    "auto-update-bookings": {
+        "task": "tasks.auto_update_bookings",
+        "schedule": crontab(minute=5),
+    },
+    "rebuild-destination-index": {
+        "task": "tasks.rebuild_destination_index",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "refresh-availability-summary": {
+        "task": "tasks.refresh_availability_summary",
+        "schedule": 60.0,
+    },
+    "relay-outbox": {
+        "task": "tasks.relay_outbox",
+        "schedule": 5.0,
+    },
+    "purge-outbox": {
+        "task": "tasks.purge_outbox",
+        "schedule": crontab(hour=4, minute=0),
+    },
+    "release-expired-holds": {
+        "task": "tasks.release_expired_holds",
+        "schedule": 30.0,
+    },
+    "seed-peak-season-rules": {
+        "task": "tasks.seed_peak_season_rules",
+        "schedule": crontab(hour=1, minute=0),
+    },
+    "rebuild-availability-summary": {
+        "task": "tasks.rebuild_availability_summary",
+        "schedule": crontab(hour=2, minute=30),
+    },
+}
+
 celery.autodiscover_tasks(["app.worker"])
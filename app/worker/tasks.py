@@ -1,11 +1,16 @@
-from datetime import datetime, date, timedelta
-from sqlmodel import Session, select
+from datetime import datetime, timedelta
+from sqlmodel import Session
 from .celery_app import celery
 from app.services.mail_service import send_mail
-from app.models.booking import Booking
 from app.models.payment import Payment
-from app.utils.enums import BookingStatus
 from app.core.database import engine
+import app.services.search_cache  # noqa: F401  (search cache invalidation listeners)
+from app.services.destination_index import rebuild_destination_index
+from app.services.availability_summary import rebuild_summary, refresh_dirty_room_types
+from app.services.booking_service import BookingService
+from app.services.hold_service import release_expired_holds
+from app.services.pricing_rules import seed_peak_season_rules
+from app.services.outbox import purge_processed_events, relay_outbox as relay_outbox_events
 
 @celery.task(name="tasks.send_email")
 def send_email(to: str, subject: str, html: str):
@@ -167,31 +172,79 @@ def auto_update_bookings():
     """
     Periodic task to automatically update booking statuses.
 
-    - Cancel bookings where check_in has passed and the status is pending or confirmed.
     - Complete bookings where check_out has passed and the status is confirmed.
+    - Cancel bookings where check_in has passed and the status is still pending,
+      returning their remaining nights to inventory.
+
+    Runs as chunked bulk UPDATEs (see ``BookingService.auto_update_statuses``)
+    and returns the counts and timing.
+    """
+    with Session(engine) as session:
+        return BookingService(session).auto_update_statuses()
+
+
+@celery.task(name="tasks.rebuild_destination_index")
+def rebuild_destination_index_task():
+    """
+    Periodic task to rebuild the destination autocomplete index.
+
+    Property changes are applied incrementally; this full rebuild picks up
+    ``Location`` edits and repairs any drift.
+    """
+    with Session(engine) as session:
+        return rebuild_destination_index(session)
+
+
+@celery.task(name="tasks.seed_peak_season_rules")
+def seed_peak_season_rules_task():
+    """
+    Daily task: add the default peak-season rules for seasons entering the
+    pricing horizon and for new properties.
+    """
+    with Session(engine) as session:
+        return seed_peak_season_rules(session)
+
+
+@celery.task(name="tasks.refresh_availability_summary")
+def refresh_availability_summary():
+    """
+    Frequent task: recompute summary rows for room types changed since the last run.
+    """
+    with Session(engine) as session:
+        return refresh_dirty_room_types(session)
+
+
+@celery.task(name="tasks.rebuild_availability_summary")
+def rebuild_availability_summary():
+    """
+    Nightly task: recompute the availability summary for every room type and
+    roll the horizon forward.
+    """
+    with Session(engine) as session:
+        return rebuild_summary(session)
+
+
+@celery.task(name="tasks.release_expired_holds")
+def release_expired_holds_task():
+    """
+    Frequent task: give back rooms of inventory holds past their expiry.
+    """
+    return release_expired_holds()
+
+
+@celery.task(name="tasks.relay_outbox")
+def relay_outbox():
+    """
+    Frequent task: hand committed outbox events (booking emails, ...) to their tasks.
+    """
+    with Session(engine) as session:
+        return relay_outbox_events(session)
+
+
+@celery.task(name="tasks.purge_outbox")
+def purge_outbox():
+    """
+    Nightly task: delete outbox events processed more than a week ago.
     """
-    today = date.today()
     with Session(engine) as session:
-        # Cancel overdue bookings
-        overdue = session.exec(
-            select(Booking).where(
-                Booking.status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]),
-                Booking.check_in < today,
-            )
-        ).all()
-        for b in overdue:
-            b.status = BookingStatus.CANCELLED
-            session.add(b)
-
-        # Complete finished bookings
-        completed = session.exec(
-            select(Booking).where(
-                Booking.status == BookingStatus.CONFIRMED,
-                Booking.check_out < today,
-            )
-        ).all()
-        for b in completed:
-            b.status = BookingStatus.COMPLETED
-            session.add(b)
-
-        session.commit()
+        return purge_processed_events(session)
@@ -0,0 +1,75 @@
+from array import array
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from app.services.availability_summary import nightly_rate_bounds
+from app.services.pricing_engine import PriceCalendar
+from app.services.pricing_rules import RuleIndex
+
+
+def _rule(adjustment_percent, **conditions):
+    fields = {
+        "is_active": True,
+        "start_date": None,
+        "end_date": None,
+        "weekdays": None,
+        "min_nights": None,
+        "max_nights": None,
+        "min_days_before_checkin": None,
+        "max_days_before_checkin": None,
+    }
+    fields.update(conditions)
+    return SimpleNamespace(adjustment_percent=adjustment_percent, **fields)
+
+
+START = date(2026, 11, 2)
+END = START + timedelta(days=30)
+
+
+def _calendar(price, rules=()):
+    return PriceCalendar(None, "VND", START, array("d", [price]) * 30, RuleIndex(rules))
+
+
+def _summed_bounds(calendars, check_in, check_out):
+    bounds = nightly_rate_bounds(calendars, START, END)
+    first, last = (check_in - START).days, (check_out - START).days
+    return (
+        sum(low for low, _ in bounds[first:last]),
+        sum(high for _, high in bounds[first:last]),
+    )
+
+
+def test_discounted_property_is_kept_under_max_price():
+    # 7+ nights: 30% off, so a week at 100/night costs 490
+    calendar = _calendar(100.0, [_rule(-30, min_nights=7)])
+    check_in, check_out = START + timedelta(days=3), START + timedelta(days=10)
+    max_price = 500.0
+
+    exact = calendar.total(check_in, check_out, today=START)
+    low, _ = _summed_bounds([calendar], check_in, check_out)
+
+    assert exact <= max_price
+    # The prefilter keeps a room type when the summed minimum fits
+    assert low <= exact <= max_price
+
+
+def test_surcharged_property_is_kept_under_min_price():
+    # Booked within 3 days of check-in: +50%
+    calendar = _calendar(100.0, [_rule(50, max_days_before_checkin=3)])
+    check_in, check_out = START + timedelta(days=1), START + timedelta(days=3)
+    min_price = 280.0
+
+    exact = calendar.total(check_in, check_out, today=START)
+    _, high = _summed_bounds([calendar], check_in, check_out)
+
+    assert exact >= min_price
+    assert high >= exact >= min_price
+
+
+def test_bounds_cover_every_rate_plan():
+    bounds = nightly_rate_bounds([_calendar(80.0), _calendar(120.0, [_rule(10)])], START, END)
+    assert bounds[0] == (80.0, 120.0 * 1.1)
+
+
+def test_room_type_without_rate_plan_prices_at_zero():
+    assert nightly_rate_bounds([], START, START + timedelta(days=2)) == [(0.0, 0.0), (0.0, 0.0)]
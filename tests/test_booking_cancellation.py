@@ -0,0 +1,18 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.booking_service import BookingService
+
+
+def test_other_users_stale_cancel_is_forbidden_without_version():
+    booking = SimpleNamespace(id=uuid.uuid4(), user_id=uuid.uuid4(), version=7)
+    session = SimpleNamespace(get=lambda model, key: booking)
+
+    with pytest.raises(HTTPException) as exc_info:
+        BookingService(session).cancel_booking(booking.id, user_id=uuid.uuid4(), expected_version=3)
+
+    assert exc_info.value.status_code == 403
+    assert "7" not in str(exc_info.value.detail)
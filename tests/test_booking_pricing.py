@@ -0,0 +1,61 @@
+import uuid
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import booking_service
+from app.services.booking_service import BookingService
+
+START = date(2026, 11, 2)
+END = START + timedelta(days=3)
+
+
+class FakeSession:
+    def __init__(self, cheapest_rate):
+        self.cheapest_rate = cheapest_rate
+
+    def get(self, model, key):
+        return None
+
+    def exec(self, statement):
+        return SimpleNamespace(first=lambda: self.cheapest_rate)
+
+
+class FakeEngine:
+    def __init__(self, session):
+        pass
+
+    def flat_calendar(self, property_id, price, currency, start, end):
+        return SimpleNamespace(price=price, currency=currency, start=start, end=end)
+
+
+@pytest.fixture(autouse=True)
+def engine(monkeypatch):
+    monkeypatch.setattr(booking_service, "PricingEngine", FakeEngine)
+
+
+def _guest_booking():
+    return SimpleNamespace(
+        rate_plan_id=None,
+        room_id=uuid.uuid4(),
+        room_type_id=uuid.uuid4(),
+        property_id=uuid.uuid4(),
+        currency="VND",
+    )
+
+
+def test_guest_booking_priced_at_room_type_rate():
+    calendar = BookingService(FakeSession(850000.0)).booking_calendar(_guest_booking(), START, END)
+
+    assert calendar.price == 850000.0
+    assert calendar.currency == "VND"
+    assert (calendar.start, calendar.end) == (START, END)
+
+
+def test_guest_booking_without_rate_plan_is_rejected():
+    with pytest.raises(HTTPException) as exc_info:
+        BookingService(FakeSession(None)).booking_calendar(_guest_booking(), START, END)
+
+    assert exc_info.value.status_code == 400
@@ -0,0 +1,42 @@
+import redis
+from types import SimpleNamespace
+
+from app.services import destination_index
+from app.services.destination_index import autocomplete_destinations
+
+
+class DownRedis:
+    def zrangebylex(self, *args, **kwargs):
+        raise redis.ConnectionError("Connection refused")
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    def exec(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(all=lambda: self.rows)
+
+
+def test_autocomplete_falls_back_to_database_when_redis_is_down(monkeypatch):
+    monkeypatch.setattr(destination_index, "redis_main", DownRedis())
+    session = FakeSession([("Đà Nẵng", "Vietnam", 12)])
+
+    suggestions = autocomplete_destinations("Đà", limit=5, session=session)
+
+    assert suggestions == [{
+        "type": "city",
+        "label": "Đà Nẵng, Vietnam",
+        "city": "Đà Nẵng",
+        "country": "Vietnam",
+        "property_count": 12,
+    }]
+    assert len(session.statements) == 1
+
+
+def test_autocomplete_without_session_is_empty_when_redis_is_down(monkeypatch):
+    monkeypatch.setattr(destination_index, "redis_main", DownRedis())
+
+    assert autocomplete_destinations("Đà") == []
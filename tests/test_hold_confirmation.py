@@ -0,0 +1,111 @@
+import uuid
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import booking_service
+from app.services.booking_service import BookingService
+
+USER_ID = uuid.uuid4()
+ROOM_TYPE_ID = uuid.uuid4()
+RATE_PLAN_ID = uuid.uuid4()
+CHECK_IN = date.today() + timedelta(days=10)
+CHECK_OUT = CHECK_IN + timedelta(days=2)
+HOLD = {
+    "id": "hold-1",
+    "room_type_id": str(ROOM_TYPE_ID),
+    "check_in": CHECK_IN.isoformat(),
+    "check_out": CHECK_OUT.isoformat(),
+    "nights": [CHECK_IN.isoformat(), (CHECK_IN + timedelta(days=1)).isoformat()],
+    "rooms": 3,
+    "user_id": str(USER_ID),
+    "expires_at": 0,
+}
+
+
+class FakeSession:
+    def __init__(self):
+        self.objects = {
+            ROOM_TYPE_ID: SimpleNamespace(id=ROOM_TYPE_ID, is_active=True, max_occupancy=2, property_id="p"),
+            "p": SimpleNamespace(id="p", is_active=True, organization_id=None),
+            RATE_PLAN_ID: SimpleNamespace(id=RATE_PLAN_ID, room_type_id=ROOM_TYPE_ID),
+        }
+        self.added = []
+
+    def get(self, model, key):
+        return self.objects.get(key)
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def commit(self):
+        pass
+
+    def refresh(self, obj):
+        pass
+
+    def rollback(self):
+        pass
+
+
+@pytest.fixture
+def service(monkeypatch):
+    calls = {"released": []}
+    monkeypatch.setattr(booking_service, "get_hold", lambda hold_id: dict(HOLD))
+    monkeypatch.setattr(booking_service, "release_hold", calls["released"].append)
+    monkeypatch.setattr(booking_service, "Booking", lambda **fields: SimpleNamespace(**fields))
+
+    service = BookingService(FakeSession())
+
+    def check(room_type_id, check_in, check_out, exclude_hold=None, rooms=1):
+        calls["available_for"] = rooms
+        return True
+
+    def reserve(room_type_id, check_in, check_out, rooms=1):
+        calls["reserved"] = rooms
+        return 2
+
+    monkeypatch.setattr(service, "check_room_type_availability", check)
+    monkeypatch.setattr(service, "reserve_inventory", reserve)
+    monkeypatch.setattr(
+        service, "calculate_booking_price",
+        lambda *args: {"total_price": 200.0, "currency": "VND"}
+    )
+    monkeypatch.setattr(service, "find_available_room", lambda *args: SimpleNamespace(id=uuid.uuid4()))
+    service.calls = calls
+    return service
+
+
+def test_confirming_multi_room_hold_books_every_room(service):
+    booking = service.create_booking(
+        user_id=USER_ID,
+        room_type_id=ROOM_TYPE_ID,
+        rate_plan_id=RATE_PLAN_ID,
+        check_in=CHECK_IN,
+        check_out=CHECK_OUT,
+        hold_id="hold-1",
+        rooms=3,
+    )
+
+    assert booking.rooms_count == 3
+    assert booking.total_price == 600.0
+    assert service.calls["available_for"] == 3
+    assert service.calls["reserved"] == 3
+    assert service.calls["released"] == ["hold-1"]
+
+
+def test_room_count_must_match_hold(service):
+    with pytest.raises(HTTPException) as exc_info:
+        service.create_booking(
+            user_id=USER_ID,
+            room_type_id=ROOM_TYPE_ID,
+            rate_plan_id=RATE_PLAN_ID,
+            check_in=CHECK_IN,
+            check_out=CHECK_OUT,
+            hold_id="hold-1",
+        )
+
+    assert exc_info.value.status_code == 400
+    assert service.calls["released"] == []
@@ -0,0 +1,47 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+from app.services import idempotency
+from app.services.idempotency import run_idempotent
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+class Out(BaseModel):
+    id: int
+    status: str
+
+
+@pytest.fixture
+def store(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(idempotency, "redis_main", fake)
+    return fake
+
+
+def test_replay_returns_response_model_body(store):
+    booking = SimpleNamespace(id=1, status="pending", internal_note="not for clients")
+    run_idempotent("bookings", "key-1", "user", {"a": 1}, lambda: booking, 201, response_model=Out)
+
+    replay = run_idempotent("bookings", "key-1", "user", {"a": 1}, lambda: None, 201, response_model=Out)
+
+    assert replay.status_code == 201
+    assert json.loads(replay.body) == {"id": 1, "status": "pending"}
@@ -0,0 +1,33 @@
+from app.services.room_combination import cheapest_assignment, cheapest_combination
+
+
+# (capacity, price, available)
+OPTIONS = [
+    (2, 100.0, 3),  # double
+    (3, 140.0, 1),  # triple
+    (4, 230.0, 2),  # family
+]
+
+
+def test_cheapest_assignment_mixed_occupancy():
+    # 2 + 2 + 3 adults: two doubles and the only triple
+    assert cheapest_assignment(OPTIONS, [2, 3, 2]) == [2, 1, 0]
+
+
+def test_cheapest_assignment_falls_back_to_larger_rooms():
+    # Two parties of 3 but only one triple: the other needs a family room
+    assert cheapest_assignment(OPTIONS, [3, 3]) == [0, 1, 1]
+
+
+def test_cheapest_assignment_infeasible():
+    assert cheapest_assignment(OPTIONS, [5]) is None
+    assert cheapest_assignment(OPTIONS, []) is None
+
+
+def test_cheapest_combination_covers_guests():
+    # 3 rooms for 7 adults: two doubles and the triple (340) beat any family room
+    assert cheapest_combination(OPTIONS, 3, 7) == [2, 1, 0]
+
+
+def test_cheapest_combination_infeasible():
+    assert cheapest_combination(OPTIONS, 1, 5) is None